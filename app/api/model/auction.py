@@ -0,0 +1,20 @@
+from pydantic import BaseModel, Field
+from typing import Any, Dict, List, Optional
+
+class SearchHit(BaseModel):
+    auction_id: str = Field(..., description="Номер аукциона")
+    name: Optional[str] = Field(None, description="Название закупки")
+    status: Optional[str] = Field(None, description="Статус аукциона")
+    file_id: str = Field(..., description="Идентификатор файла FileStorage")
+    filename: Optional[str] = Field(None, description="Имя файла")
+    page: int = Field(..., description="Номер страницы PDF (с нуля); для документов без страниц (DOCX, DOC, RTF) и архивов — номер фрагмента текста")
+    snippet: str = Field(..., description="Фрагмент текста, найденные слова выделены [скобками]")
+
+class StoredAuction(BaseModel):
+    auction_id: str = Field(..., description="Номер аукциона")
+    name: Optional[str] = Field(None, description="Название закупки")
+    status: Optional[str] = Field(None, description="Статус аукциона")
+    end_date: Optional[str] = Field(None, description="Дата окончания")
+    updated_at: float = Field(..., description="Время сохранения (unix time)")
+    criteria: Dict[int, Any] = Field(..., description="Данные карточки по номерам критериев")
+    documents: List[Dict[str, Any]] = Field(..., description="Вложения аукциона")
@@ -23,3 +23,15 @@ class ReportRequest(BaseModel):
 class ReportResponse(BaseModel):
     report_id: int = Field(..., description="Идентификатор сгенерированного отчета")
     message: str = Field(..., description="Сообщение о статусе генерации отчета")
+
+class JobSubmitResponse(BaseModel):
+    job_id: str = Field(..., description="Идентификатор задачи генерации отчета")
+    status: str = Field(..., description="Статус задачи")
+
+class JobStatusResponse(BaseModel):
+    job_id: str = Field(..., description="Идентификатор задачи генерации отчета")
+    status: str = Field(..., description="Статус задачи: queued, running, done, failed")
+    created_at: float = Field(..., description="Время создания (unix time)")
+    updated_at: float = Field(..., description="Время последнего события (unix time)")
+    events: int = Field(..., description="Количество событий прогресса")
+    error: Optional[str] = Field(None, description="Текст ошибки для упавшей задачи")
@@ -0,0 +1,33 @@
+from fastapi import APIRouter, HTTPException, Query
+from typing import List, Optional
+from api.model.auction import SearchHit, StoredAuction
+from core.auction_store import get_auction_store
+
+router = APIRouter()
+
+@router.get("/auctions/search", response_model=List[SearchHit])
+def search_auctions(
+    q: str = Query(..., description='Запрос FTS5, например: обеспечение NEAR(исполнения "5")'),
+    status: Optional[str] = Query(None, description="Только аукционы с этим статусом"),
+    contract_only: bool = Query(False, description="Искать только в проектах контракта"),
+    limit: int = Query(50, ge=1, le=1000),
+):
+    """
+    Полнотекстовый поиск по сохранённым аукционам: тексты документов по страницам.
+    Ничего не скачивает и не парсит заново.
+    """
+    try:
+        return get_auction_store().search(q, status=status, contract_only=contract_only, limit=limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
+
+
+@router.get("/auctions/{auction_id}", response_model=StoredAuction)
+def get_stored_auction(auction_id: str):
+    """
+    Сохранённый аукцион: критерии карточки и список документов.
+    """
+    auction = get_auction_store().get_auction(auction_id)
+    if auction is None:
+        raise HTTPException(status_code=404, detail="Аукцион не найден.")
+    return auction
@@ -1,38 +1,126 @@
 from fastapi import APIRouter, HTTPException
-from fastapi.responses import StreamingResponse
-from typing import List
-from io import BytesIO
-from api.model.report import ReportRequest, ReportResponse
+from fastapi.responses import Response, StreamingResponse
+from starlette.concurrency import run_in_threadpool
+from typing import Any, Dict, List
+import json
+import time
+import asyncio
+from api.model.report import ReportRequest, JobSubmitResponse, JobStatusResponse
+from core.jobs import FINAL_STATUSES, JobStore, get_job_store, submit_report_job
+from core.report import render_job_report, stream_report
 
 router = APIRouter()
 
-@router.post("/generate_report", response_model=ReportResponse)
-async def generate_report(report_request: ReportRequest):
+@router.post("/generate_report")
+def generate_report(report_request: ReportRequest):
     """
-    Эндпоинт для генерации PDF отчета на основе переданных чисел и идентификатора.
-    Пока что возвращает моковый PDF.
+    Генерирует PDF-отчет по аукционам.
+
+    Отчет отдается потоком: заголовок уходит сразу, раздел каждого аукциона —
+    как только завершена его обработка, поэтому скачивание большого отчета
+    начинается до окончания всей обработки, а память не растет с его размером.
     """
-    # Валидация входных данных уже выполняется Pydantic моделями
+    headers = {"Content-Disposition": "attachment; filename=report.pdf"}
+    return StreamingResponse(
+        stream_report(report_request.urls, report_request.criterion),
+        media_type="application/pdf",
+        headers=headers,
+    )
 
-    # Здесь должна быть логика генерации PDF на основе report_request.numbers и report_request.id
-    # Пока что создадим моковый PDF как байтовый поток
 
+def _job_store() -> JobStore:
     try:
-        # Создаем простой PDF в памяти
-        pdf_content = BytesIO()
-        pdf_content.write(b"%PDF-1.4\n%Mock PDF content\n")
-        pdf_content.seek(0)
+        store = get_job_store()
+        store.client.ping()
+    except Exception as e:
+        raise HTTPException(status_code=503, detail="Хранилище задач недоступно.") from e
+    return store
 
-        response = ReportResponse(
-            report_id=report_request.id,
-            message="Отчет успешно сгенерирован."
-        )
 
-        headers = {
-            "Content-Disposition": f"attachment; filename=report_{report_request.id}.pdf"
-        }
+def _get_job(store: JobStore, job_id: str) -> Dict[str, Any]:
+    job = store.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Задача не найдена.")
+    return job
 
-        return StreamingResponse(pdf_content, media_type="application/pdf", headers=headers)
 
-    except Exception as e:
-        raise HTTPException(status_code=500, detail="Ошибка при генерации отчета.") from e
+@router.post("/report_jobs", response_model=JobSubmitResponse, status_code=202)
+def submit_report_job_endpoint(report_request: ReportRequest):
+    """
+    Ставит генерацию отчета в очередь и сразу возвращает идентификатор задачи.
+    """
+    store = _job_store()
+    job_id = submit_report_job(store, report_request.urls, report_request.criterion)
+    return JobSubmitResponse(job_id=job_id, status=store.get(job_id)["status"])
+
+
+@router.get("/report_jobs/{job_id}", response_model=JobStatusResponse)
+def get_report_job(job_id: str):
+    """
+    Статус задачи генерации отчета.
+    """
+    job = _get_job(_job_store(), job_id)
+    return JobStatusResponse(**job)
+
+
+@router.get("/report_jobs/{job_id}/result")
+def get_report_job_result(job_id: str):
+    """
+    Результат обработки аукционов задачи. 409, пока задача не завершена успешно.
+    """
+    store = _job_store()
+    job = _get_job(store, job_id)
+    if job["status"] != "done":
+        raise HTTPException(status_code=409, detail=f"Задача в статусе {job['status']}.")
+    return store.get_result(job_id)
+
+
+@router.get("/report_jobs/{job_id}/report")
+def get_report_job_pdf(job_id: str):
+    """
+    PDF-отчет по результату задачи. 409, пока задача не завершена успешно.
+    """
+    store = _job_store()
+    job = _get_job(store, job_id)
+    if job["status"] != "done":
+        raise HTTPException(status_code=409, detail=f"Задача в статусе {job['status']}.")
+    pdf = render_job_report(job["request"]["urls"], store.get_result(job_id))
+    headers = {"Content-Disposition": "attachment; filename=report.pdf"}
+    return Response(pdf, media_type="application/pdf", headers=headers)
+
+
+@router.get("/report_jobs/{job_id}/events")
+def stream_report_job_events(job_id: str, last_event_id: int = 0):
+    """
+    Server-sent events с прогрессом задачи по аукционам и этапам.
+    Поток закрывается после завершения задачи; last_event_id позволяет переподключиться без повторов.
+    """
+    store = _job_store()
+    _get_job(store, job_id)
+
+    async def event_stream():
+        # Опрос Redis синхронный: в пуле потоков, чтобы не блокировать event loop,
+        # а ожидание между опросами не занимает поток
+        position = last_event_id
+        last_sent = time.monotonic()
+        while True:
+            events = await run_in_threadpool(store.events, job_id, position)
+            for event in events:
+                position += 1
+                yield f"id: {position}\nevent: progress\ndata: {json.dumps(event, ensure_ascii=False)}\n\n"
+                last_sent = time.monotonic()
+
+            job = await run_in_threadpool(store.get, job_id)
+            if job is None or (job["status"] in FINAL_STATUSES and job["events"] <= position):
+                status = job["status"] if job else "expired"
+                yield f"event: end\ndata: {json.dumps({'status': status})}\n\n"
+                return
+
+            # Комментарий раз в 15 секунд, чтобы прокси не закрыли простаивающее соединение
+            if time.monotonic() - last_sent > 15:
+                yield ": keep-alive\n\n"
+                last_sent = time.monotonic()
+            await asyncio.sleep(0.5)
+
+    headers = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    return StreamingResponse(event_stream(), media_type="text/event-stream", headers=headers)
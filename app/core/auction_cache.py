@@ -0,0 +1,132 @@
+import json
+import hashlib
+import logging
+from typing import Any, Dict, Optional, Tuple
+
+from core.metrics import CACHE_REQUESTS
+
+logger = logging.getLogger(__name__)
+
+
+class AuctionCache:
+    """
+    Общий для всех воркеров кэш ответов Auction/Get в Redis.
+
+    Ключи:
+        auction:{id}:payload — JSON ответа, живёт ttl секунд;
+        auction:{id}:hash — sha256 последнего полученного ответа (без TTL),
+            по нему определяется, изменился ли аукцион с прошлой проверки;
+        auction:{id}:result:{hash}[:{scope}] — результат обработки файлов для этой
+            версии аукциона (scope — вариант обработки, например набор критериев).
+    Ошибки Redis не прерывают обработку: кэш просто считается пустым.
+    """
+
+    def __init__(self, client: Any, ttl: int = 600, result_ttl: int = 7 * 24 * 3600):
+        self.client = client
+        self.ttl = ttl
+        self.result_ttl = result_ttl
+
+    @staticmethod
+    def payload_hash(payload: Dict[str, Any]) -> str:
+        encoded = json.dumps(payload, sort_keys=True, ensure_ascii=False).encode()
+        return hashlib.sha256(encoded).hexdigest()
+
+    def get(self, auction_id: str) -> Optional[Tuple[Dict[str, Any], str]]:
+        """
+        Возвращает закэшированный ответ и его хэш или None.
+        """
+        try:
+            payload, payload_hash = self.client.mget(
+                self.__key(auction_id, "payload"), self.__key(auction_id, "hash")
+            )
+        except Exception as e:
+            logger.warning(f"Auction cache is unavailable: {e}")
+            return None
+        if payload is None or payload_hash is None:
+            CACHE_REQUESTS.labels("auction", "miss").inc()
+            return None
+        CACHE_REQUESTS.labels("auction", "hit").inc()
+        return json.loads(payload), self.__decode(payload_hash)
+
+    def put(self, auction_id: str, payload: Dict[str, Any]) -> Tuple[str, bool]:
+        """
+        Сохраняет свежий ответ Auction/Get.
+
+        :return: Хэш ответа и признак того, что он отличается от предыдущего.
+        """
+        payload_hash = self.payload_hash(payload)
+        try:
+            previous = self.client.get(self.__key(auction_id, "hash"))
+            pipe = self.client.pipeline()
+            pipe.set(
+                self.__key(auction_id, "payload"),
+                json.dumps(payload, ensure_ascii=False),
+                ex=self.ttl,
+            )
+            pipe.set(self.__key(auction_id, "hash"), payload_hash)
+            pipe.execute()
+        except Exception as e:
+            logger.warning(f"Auction cache is unavailable: {e}")
+            return payload_hash, True
+        changed = previous is None or self.__decode(previous) != payload_hash
+        return payload_hash, changed
+
+    def get_result(
+        self, auction_id: str, payload_hash: str, scope: str = ""
+    ) -> Optional[Dict[int, Any]]:
+        """
+        Возвращает результат обработки файлов аукциона для данной версии ответа.
+        """
+        try:
+            raw = self.client.get(self.__result_key(auction_id, payload_hash, scope))
+        except Exception as e:
+            logger.warning(f"Auction cache is unavailable: {e}")
+            return None
+        if raw is None:
+            CACHE_REQUESTS.labels("auction_result", "miss").inc()
+            return None
+        CACHE_REQUESTS.labels("auction_result", "hit").inc()
+        # JSON превращает ключи в строки, а кортежи PDFParser — в списки
+        return {
+            int(j): tuple(value) if isinstance(value, list) else value
+            for j, value in json.loads(raw).items()
+        }
+
+    def put_result(
+        self, auction_id: str, payload_hash: str, files_data: Dict[int, Any], scope: str = ""
+    ) -> None:
+        try:
+            self.client.set(
+                self.__result_key(auction_id, payload_hash, scope),
+                json.dumps(files_data, ensure_ascii=False),
+                ex=self.result_ttl,
+            )
+        except Exception as e:
+            logger.warning(f"Auction cache is unavailable: {e}")
+
+    def __key(self, auction_id: str, *parts: str) -> str:
+        return ":".join(("auction", str(auction_id)) + parts)
+
+    def __result_key(self, auction_id: str, payload_hash: str, scope: str) -> str:
+        if scope:
+            return self.__key(auction_id, "result", payload_hash, scope)
+        return self.__key(auction_id, "result", payload_hash)
+
+    @staticmethod
+    def __decode(value: Any) -> str:
+        return value.decode() if isinstance(value, bytes) else value
+
+
+def create_auction_cache(
+    host: str, port: int, ttl: int, result_ttl: int = 7 * 24 * 3600
+) -> Optional[AuctionCache]:
+    """
+    Создаёт кэш аукционов поверх Redis. Возвращает None, если пакет redis не установлен.
+    """
+    try:
+        import redis
+    except ImportError:
+        logger.warning("Package 'redis' is not installed, auction cache is disabled")
+        return None
+    client = redis.Redis(host=host, port=port, socket_timeout=2, socket_connect_timeout=2)
+    return AuctionCache(client, ttl=ttl, result_ttl=result_ttl)
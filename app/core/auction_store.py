@@ -0,0 +1,334 @@
+import os
+import json
+import time
+import hashlib
+import sqlite3
+import threading
+from typing import Any, Dict, Iterable, List, Optional
+
+from core.config import Config
+from core.parser.parser_documents import PAGE_BREAK
+
+# Текст без разметки страниц (DOCX, DOC, RTF...) делится на фрагменты примерно
+# такого размера по границам строк: строка результата поиска — страница или фрагмент
+FRAGMENT_CHARS = 4000
+# Длина фрагмента текста вокруг найденных слов в результатах поиска, в словах
+SNIPPET_TOKENS = 16
+
+
+def split_pages(text: str, fragment_chars: int = FRAGMENT_CHARS) -> List[str]:
+    """
+    Страницы PDF по PAGE_BREAK: номер в списке — номер страницы с нуля (пустые
+    страницы остаются пустыми элементами). Текст без разрывов страниц — фрагментами
+    не длиннее fragment_chars (кроме одиночных длинных строк), номер — номер фрагмента.
+    """
+    if PAGE_BREAK in text:
+        return text.split(PAGE_BREAK)
+    pages, current, size = [], [], 0
+    for line in text.splitlines(keepends=True):
+        if current and size + len(line) > fragment_chars:
+            pages.append("".join(current))
+            current, size = [], 0
+        current.append(line)
+        size += len(line)
+    if current:
+        pages.append("".join(current))
+    return pages
+
+
+def auction_status(payload: Dict[str, Any]) -> Optional[str]:
+    """
+    Название статуса аукциона из ответа Auction/Get («Активная», «Завершена»...).
+    """
+    state = payload.get("state") or payload.get("status")
+    if isinstance(state, dict):
+        return state.get("name")
+    return state
+
+
+class AuctionStore:
+    """
+    Постоянное хранилище обработанных аукционов с полнотекстовым поиском (SQLite FTS5).
+
+    Таблицы:
+        auctions — ответ Auction/Get, название, статус и дата окончания;
+        criteria — данные критериев карточки (JSON) по номерам;
+        documents — вложения аукциона: id файла, имя, признак контракта и хэш текста;
+        pages — текст документов по страницам PDF или фрагментам (split_pages);
+            одинаковый текст (типовой контракт у многих аукционов) хранится
+            и индексируется один раз;
+        pages_fts — индекс FTS5 по pages, обновляется триггерами.
+
+    Повторное сохранение аукциона заменяет его критерии и документы; текст,
+    на который больше не ссылается ни один документ, удаляется. Сохраняется
+    только полный текст документов, без отбора страниц под критерии.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        # WAL: поиск из других процессов API не ждёт записи обработки
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS auctions (
+                auction_id TEXT PRIMARY KEY,
+                name TEXT,
+                status TEXT,
+                end_date TEXT,
+                payload_hash TEXT,
+                payload TEXT NOT NULL,
+                updated_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS auctions_status ON auctions (status);
+            CREATE TABLE IF NOT EXISTS criteria (
+                auction_id TEXT NOT NULL,
+                criterion INTEGER NOT NULL,
+                form TEXT,
+                PRIMARY KEY (auction_id, criterion)
+            );
+            CREATE TABLE IF NOT EXISTS documents (
+                auction_id TEXT NOT NULL,
+                file_id TEXT NOT NULL,
+                filename TEXT,
+                is_contract INTEGER NOT NULL DEFAULT 0,
+                text_hash TEXT,
+                PRIMARY KEY (auction_id, file_id)
+            );
+            CREATE INDEX IF NOT EXISTS documents_text_hash ON documents (text_hash);
+            CREATE TABLE IF NOT EXISTS pages (
+                id INTEGER PRIMARY KEY,
+                text_hash TEXT NOT NULL,
+                page INTEGER NOT NULL,
+                text TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS pages_text_hash ON pages (text_hash, page);
+            CREATE VIRTUAL TABLE IF NOT EXISTS pages_fts USING fts5(
+                text, content='pages', content_rowid='id',
+                tokenize='unicode61 remove_diacritics 2'
+            );
+            CREATE TRIGGER IF NOT EXISTS pages_ai AFTER INSERT ON pages BEGIN
+                INSERT INTO pages_fts (rowid, text) VALUES (new.id, new.text);
+            END;
+            CREATE TRIGGER IF NOT EXISTS pages_ad AFTER DELETE ON pages BEGIN
+                INSERT INTO pages_fts (pages_fts, rowid, text) VALUES ('delete', old.id, old.text);
+            END;
+            """
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def text_hash(text: str) -> str:
+        return hashlib.sha256(text.encode()).hexdigest()
+
+    def put_auction(
+        self,
+        auction_id: str,
+        payload: Dict[str, Any],
+        criteria: Dict[int, Any],
+        documents: Iterable[Dict[str, Any]],
+        payload_hash: Optional[str] = None,
+    ) -> None:
+        """
+        Сохраняет аукцион целиком, заменяя предыдущую версию.
+
+        :param auction_id: Номер аукциона на портале.
+        :param payload: Ответ Auction/Get.
+        :param criteria: {номер критерия: данные карточки}.
+        :param documents: Словари с ключами file_id, filename, is_contract и text.
+        :param payload_hash: Хэш ответа (AuctionCache.payload_hash), если известен.
+        """
+        auction_id = str(auction_id)
+        with self._lock, self._conn:
+            previous = {
+                row[0]
+                for row in self._conn.execute(
+                    "SELECT text_hash FROM documents WHERE auction_id = ?", (auction_id,)
+                )
+            }
+            self._conn.execute(
+                "INSERT OR REPLACE INTO auctions VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    auction_id,
+                    payload.get("name"),
+                    auction_status(payload),
+                    payload.get("endDate"),
+                    payload_hash,
+                    json.dumps(payload, ensure_ascii=False),
+                    time.time(),
+                ),
+            )
+            self._conn.execute("DELETE FROM criteria WHERE auction_id = ?", (auction_id,))
+            self._conn.executemany(
+                "INSERT INTO criteria VALUES (?, ?, ?)",
+                [
+                    (auction_id, criterion, json.dumps(form, ensure_ascii=False))
+                    for criterion, form in criteria.items()
+                ],
+            )
+            self._conn.execute("DELETE FROM documents WHERE auction_id = ?", (auction_id,))
+            for document in documents:
+                text = document.get("text") or ""
+                text_hash = self.text_hash(text) if text else None
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO documents VALUES (?, ?, ?, ?, ?)",
+                    (
+                        auction_id,
+                        str(document["file_id"]),
+                        document.get("filename"),
+                        int(bool(document.get("is_contract"))),
+                        text_hash,
+                    ),
+                )
+                if text_hash and self._conn.execute(
+                    "SELECT 1 FROM pages WHERE text_hash = ? LIMIT 1", (text_hash,)
+                ).fetchone() is None:
+                    self._conn.executemany(
+                        "INSERT INTO pages (text_hash, page, text) VALUES (?, ?, ?)",
+                        [
+                            (text_hash, page, page_text)
+                            for page, page_text in enumerate(split_pages(text))
+                            if page_text.strip()
+                        ],
+                    )
+            self.__delete_orphans(previous - {None})
+
+    def get_auction(self, auction_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Сохранённый аукцион: ответ Auction/Get, критерии и список документов.
+        """
+        auction_id = str(auction_id)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT name, status, end_date, payload_hash, payload, updated_at "
+                "FROM auctions WHERE auction_id = ?",
+                (auction_id,),
+            ).fetchone()
+            if row is None:
+                return None
+            criteria = self._conn.execute(
+                "SELECT criterion, form FROM criteria WHERE auction_id = ? ORDER BY criterion",
+                (auction_id,),
+            ).fetchall()
+            documents = self._conn.execute(
+                "SELECT file_id, filename, is_contract FROM documents WHERE auction_id = ?",
+                (auction_id,),
+            ).fetchall()
+        name, status, end_date, payload_hash, payload, updated_at = row
+        return {
+            "auction_id": auction_id,
+            "name": name,
+            "status": status,
+            "end_date": end_date,
+            "payload_hash": payload_hash,
+            "payload": json.loads(payload),
+            "updated_at": updated_at,
+            "criteria": {criterion: json.loads(form) for criterion, form in criteria},
+            "documents": [
+                {"file_id": file_id, "filename": filename, "is_contract": bool(is_contract)}
+                for file_id, filename, is_contract in documents
+            ],
+        }
+
+    def search(
+        self,
+        query: str,
+        status: Optional[str] = None,
+        contract_only: bool = False,
+        limit: int = 50,
+    ) -> List[Dict[str, Any]]:
+        """
+        Полнотекстовый поиск по страницам документов, лучшие совпадения первыми (bm25).
+
+        :param query: Запрос FTS5: слова, "фразы", NEAR(...), AND/OR/NOT, префиксы слово*.
+        :param status: Только аукционы с этим статусом (например, «Активная»).
+        :param contract_only: Искать только в проектах контракта.
+        :param limit: Сколько совпадений вернуть.
+        :return: Совпадения: аукцион, документ, номер страницы PDF или фрагмента (с нуля) и текст,
+            найденные слова в котором выделены [скобками].
+        :raises ValueError: Ошибка синтаксиса запроса.
+        """
+        conditions = ["pages_fts MATCH ?"]
+        params: List[Any] = [query]
+        if status is not None:
+            conditions.append("a.status = ?")
+            params.append(status)
+        if contract_only:
+            conditions.append("d.is_contract = 1")
+        params.append(limit)
+        sql = f"""
+            SELECT a.auction_id, a.name, a.status, d.file_id, d.filename, p.page,
+                   snippet(pages_fts, 0, '[', ']', '…', {SNIPPET_TOKENS}),
+                   bm25(pages_fts) AS rank
+            FROM pages_fts
+            JOIN pages p ON p.id = pages_fts.rowid
+            JOIN documents d ON d.text_hash = p.text_hash
+            JOIN auctions a ON a.auction_id = d.auction_id
+            WHERE {" AND ".join(conditions)}
+            ORDER BY rank
+            LIMIT ?
+        """
+        try:
+            with self._lock:
+                rows = self._conn.execute(sql, params).fetchall()
+        except sqlite3.OperationalError as e:
+            raise ValueError(f"Некорректный поисковый запрос: {e}") from e
+        return [
+            {
+                "auction_id": auction_id,
+                "name": name,
+                "status": status,
+                "file_id": file_id,
+                "filename": filename,
+                "page": page,
+                "snippet": snippet,
+            }
+            for auction_id, name, status, file_id, filename, page, snippet, _ in rows
+        ]
+
+    def delete_auction(self, auction_id: str) -> None:
+        auction_id = str(auction_id)
+        with self._lock, self._conn:
+            previous = {
+                row[0]
+                for row in self._conn.execute(
+                    "SELECT text_hash FROM documents WHERE auction_id = ?", (auction_id,)
+                )
+            }
+            for table in ("documents", "criteria", "auctions"):
+                self._conn.execute(f"DELETE FROM {table} WHERE auction_id = ?", (auction_id,))
+            self.__delete_orphans(previous - {None})
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def __delete_orphans(self, text_hashes: Iterable[str]) -> None:
+        """
+        Удаляет страницы текста, на который больше не ссылается ни один документ.
+        """
+        for text_hash in text_hashes:
+            if self._conn.execute(
+                "SELECT 1 FROM documents WHERE text_hash = ? LIMIT 1", (text_hash,)
+            ).fetchone() is None:
+                self._conn.execute("DELETE FROM pages WHERE text_hash = ?", (text_hash,))
+
+
+_store: Optional[AuctionStore] = None
+_store_lock = threading.Lock()
+
+
+def get_auction_store() -> AuctionStore:
+    """
+    Возвращает общее хранилище процесса (путь из Config).
+    """
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = AuctionStore(Config.AUCTION_STORE_PATH)
+        return _store
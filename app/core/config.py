@@ -1,8 +1,88 @@
 import os
+import shutil
 from dotenv import load_dotenv
 
 load_dotenv()
 
 class Config:
     LLM_URL = os.getenv("LLM_URL", "http://llm:8000/")
-    
\ No newline at end of file
+    LLM_MODEL = os.getenv("LLM_MODEL", "default")
+    # Микро-батчи промптов: размер батча, ожидание добора (секунды), запросов одновременно
+    LLM_MAX_BATCH_SIZE = int(os.getenv("LLM_MAX_BATCH_SIZE", 8))
+    LLM_BATCH_WAIT = float(os.getenv("LLM_BATCH_WAIT", 0.05))
+    LLM_MAX_IN_FLIGHT = int(os.getenv("LLM_MAX_IN_FLIGHT", 4))
+    LLM_RETRIES = int(os.getenv("LLM_RETRIES", 3))
+    LLM_TIMEOUT = int(os.getenv("LLM_TIMEOUT", 120))
+    # Сколько символов текста документов попадает в один промпт
+    LLM_MAX_DOCUMENT_CHARS = int(os.getenv("LLM_MAX_DOCUMENT_CHARS", 20000))
+    # Дедупликация документов между аукционами перед LLM (точные повторы абзацев): размер блока.
+    # Выключена по умолчанию: запрос выдержки идёт на каждый уникальный блок и критерий,
+    # и на одиночных аукционах с длинными контрактами вызовов LLM становится в разы больше
+    LLM_DEDUP_ENABLED = os.getenv("LLM_DEDUP_ENABLED", "0") == "1"
+    LLM_BLOCK_CHARS = int(os.getenv("LLM_BLOCK_CHARS", 4000))
+    # Портал закупок (API аукционов и FileStorage)
+    ZAKUPKI_URL = os.getenv("ZAKUPKI_URL", "https://zakupki.mos.ru").rstrip("/")
+    # Максимум одновременных запросов GetAuctionItemAdditionalInfo на аукцион
+    ITEM_FETCH_WORKERS = int(os.getenv("ITEM_FETCH_WORKERS", 8))
+    # Кэш документов FileStorage (сырые байты + извлечённый текст)
+    DOCUMENT_CACHE_ENABLED = os.getenv("DOCUMENT_CACHE_ENABLED", "1") == "1"
+    DOCUMENT_CACHE_DIR = os.getenv("DOCUMENT_CACHE_DIR", os.path.join(os.getcwd(), "document_cache"))
+    DOCUMENT_CACHE_MAX_BYTES = int(os.getenv("DOCUMENT_CACHE_MAX_BYTES", 1024 ** 3))
+    # Хранилище обработанных аукционов с полнотекстовым поиском по документам (SQLite FTS5)
+    AUCTION_STORE_ENABLED = os.getenv("AUCTION_STORE_ENABLED", "1") == "1"
+    AUCTION_STORE_PATH = os.getenv("AUCTION_STORE_PATH", os.path.join(os.getcwd(), "auction_store.sqlite3"))
+    # Скачанные файлы больше порога буферизуются на диске, меньше — в памяти
+    DOWNLOAD_SPOOL_MAX_BYTES = int(os.getenv("DOWNLOAD_SPOOL_MAX_BYTES", 8 * 1024 * 1024))
+    # Формат файла определяется по первым байтам (запрос Range) до скачивания:
+    # файлы без подходящего парсера не скачиваются
+    DOWNLOAD_SNIFF_ENABLED = os.getenv("DOWNLOAD_SNIFF_ENABLED", "1") == "1"
+    # Скачивание файлов: таймауты соединения и чтения (секунды), повторы с паузой
+    # backoff * 2^попытка, лимиты байт на файл и на весь запуск (0 — без лимита)
+    DOWNLOAD_CONNECT_TIMEOUT = float(os.getenv("DOWNLOAD_CONNECT_TIMEOUT", 5))
+    DOWNLOAD_READ_TIMEOUT = float(os.getenv("DOWNLOAD_READ_TIMEOUT", 30))
+    DOWNLOAD_RETRIES = int(os.getenv("DOWNLOAD_RETRIES", 3))
+    DOWNLOAD_BACKOFF = float(os.getenv("DOWNLOAD_BACKOFF", 0.5))
+    DOWNLOAD_MAX_FILE_BYTES = int(os.getenv("DOWNLOAD_MAX_FILE_BYTES", 512 * 1024 * 1024))
+    DOWNLOAD_BATCH_MAX_BYTES = int(os.getenv("DOWNLOAD_BATCH_MAX_BYTES", 0))
+    # Пул процессов для парсинга документов: 0 — по числу ядер, 1 — без пула
+    PARSE_WORKERS = int(os.getenv("PARSE_WORKERS", 0))
+    # Пул парсинга поднимает все процессы и загружает библиотеки разбора при старте API
+    PARSE_POOL_PREWARM = os.getenv("PARSE_POOL_PREWARM", "1") == "1"
+    # antiword для DOC: путь из окружения или из PATH; без него DOC разбираются чтением OLE
+    ANTIWORD_PATH = os.getenv("ANTIWORD_PATH") or shutil.which("antiword")
+    # Ограничение времени конвертации одного DOC-файла, секунды
+    DOC_TIMEOUT = float(os.getenv("DOC_TIMEOUT", 60))
+    # Redis: общий кэш ответов Auction/Get
+    REDIS_HOST = os.getenv("REDIS_HOST", "localhost")
+    REDIS_PORT = int(os.getenv("REDIS_PORT", 6379))
+    AUCTION_CACHE_ENABLED = os.getenv("AUCTION_CACHE_ENABLED", "1") == "1"
+    AUCTION_CACHE_TTL = int(os.getenv("AUCTION_CACHE_TTL", 600))
+    # Фоновые задачи генерации отчёта
+    JOB_WORKERS = int(os.getenv("JOB_WORKERS", 2))
+    JOB_TTL = int(os.getenv("JOB_TTL", 24 * 3600))
+    # Воркер API отмечает свои незавершённые задачи раз в JOB_HEARTBEAT_INTERVAL секунд;
+    # задача без отметки дольше JOB_HEARTBEAT_TTL считается упавшей вместе с воркером
+    JOB_HEARTBEAT_INTERVAL = int(os.getenv("JOB_HEARTBEAT_INTERVAL", 15))
+    JOB_HEARTBEAT_TTL = int(os.getenv("JOB_HEARTBEAT_TTL", 60))
+    # Конвейер обработки: рабочие потоки этапов и ёмкость очередей между ними
+    PIPELINE_METADATA_WORKERS = int(os.getenv("PIPELINE_METADATA_WORKERS", 4))
+    PIPELINE_PROBE_WORKERS = int(os.getenv("PIPELINE_PROBE_WORKERS", 8))
+    PIPELINE_DOWNLOAD_WORKERS = int(os.getenv("PIPELINE_DOWNLOAD_WORKERS", 8))
+    # Очередь скачивания упорядочена по размеру: чем она длиннее, тем точнее порядок
+    PIPELINE_DOWNLOAD_QUEUE_SIZE = int(os.getenv("PIPELINE_DOWNLOAD_QUEUE_SIZE", 256))
+    # 0 — по размеру пула процессов парсинга
+    PIPELINE_PARSE_WORKERS = int(os.getenv("PIPELINE_PARSE_WORKERS", 0))
+    PIPELINE_QUEUE_SIZE = int(os.getenv("PIPELINE_QUEUE_SIZE", 16))
+    # Из PDF извлекаются только страницы разделов под запрошенные критерии.
+    # Выключено по умолчанию: пропущенное при поиске ключевое слово означает
+    # пропущенный критерий, а текст документа в результате становится неполным
+    SECTION_LOCATOR_ENABLED = os.getenv("SECTION_LOCATOR_ENABLED", "0") == "1"
+    # Мониторинг аукционов (core.monitor): список id через запятую, период опроса (секунды),
+    # одновременных запросов Auction/Get, проверять ли изменившиеся критерии в LLM
+    MONITOR_AUCTIONS = os.getenv("MONITOR_AUCTIONS", "")
+    MONITOR_INTERVAL = float(os.getenv("MONITOR_INTERVAL", 300))
+    MONITOR_CONCURRENCY = int(os.getenv("MONITOR_CONCURRENCY", 4))
+    MONITOR_EVALUATE = os.getenv("MONITOR_EVALUATE", "1") == "1"
+    # PDF-отчёт: шрифт с кириллицей (без него — Helvetica с транслитерацией), проверка в LLM
+    REPORT_FONT_PATH = os.getenv("REPORT_FONT_PATH", "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf")
+    REPORT_EVALUATE = os.getenv("REPORT_EVALUATE", "1") == "1"
@@ -0,0 +1,117 @@
+import re
+import hashlib
+from typing import Any, Dict, Hashable, List, Tuple
+
+# Абзац заканчивается строкой с завершающим знаком препинания или пустой строкой.
+# Границы зависят только от текста, поэтому совпадают в разных документах
+PARAGRAPH_END = re.compile(r"[.;:!?»)]\s*$")
+
+
+def split_paragraphs(text: str) -> List[str]:
+    """
+    Делит извлечённый текст на абзацы, склеивая строки, перенесённые посреди предложения.
+    """
+    paragraphs = []
+    lines: List[str] = []
+    for line in text.splitlines():
+        stripped = line.strip()
+        if stripped:
+            lines.append(stripped)
+        if lines and (not stripped or PARAGRAPH_END.search(stripped)):
+            paragraphs.append(" ".join(lines))
+            lines = []
+    if lines:
+        paragraphs.append(" ".join(lines))
+    return paragraphs
+
+
+class ParagraphIndex:
+    """
+    Уникальные абзацы: точные повторы (тот же текст с точностью до пробелов)
+    находятся по хэшу и получают один id. Почти повторы не объединяются:
+    иначе аукцион проверялся бы по формулировкам другого аукциона
+    («улица Тверская» вместо «улица Арбат», «обязан» вместо «не обязан»).
+    """
+
+    def __init__(self):
+        self.paragraphs: List[str] = []
+        self.hashes: List[int] = []
+        self.stats = {"paragraphs": 0, "exact_duplicates": 0}
+        self._exact: Dict[str, int] = {}
+
+    def add(self, paragraph: str) -> int:
+        """
+        Регистрирует абзац и возвращает его id (общий с точными повторами).
+        """
+        self.stats["paragraphs"] += 1
+        digest = hashlib.sha1(" ".join(paragraph.split()).encode()).hexdigest()
+        paragraph_id = self._exact.get(digest)
+        if paragraph_id is not None:
+            self.stats["exact_duplicates"] += 1
+            return paragraph_id
+
+        paragraph_id = len(self.paragraphs)
+        self.paragraphs.append(paragraph)
+        self.hashes.append(int(digest[:8], 16))
+        self._exact[digest] = paragraph_id
+        return paragraph_id
+
+
+class BlockDeduplicator:
+    """
+    Делит документы на блоки из уникальных абзацев и хранит каждый блок один раз.
+
+    Границы блоков выбираются по содержимому (хэш абзаца), а не по смещению,
+    поэтому после отличающегося абзаца блоки разных документов снова совпадают.
+    occurrences — где встречается блок: ключи документов из add_document.
+    """
+
+    def __init__(self, max_block_chars: int = 4000, boundary: int = 8):
+        self.max_block_chars = max_block_chars
+        self.boundary = boundary
+        self.index = ParagraphIndex()
+        self.blocks: List[str] = []
+        self.occurrences: Dict[int, List[Hashable]] = {}
+        self._block_ids: Dict[Tuple[int, ...], int] = {}
+        self.stats = {"blocks": 0, "unique_blocks": 0, "chars": 0, "unique_chars": 0}
+
+    def add_document(self, key: Hashable, text: str) -> List[int]:
+        """
+        :param key: Ключ документа, например (аукцион, файл).
+        :return: id блоков документа по порядку.
+        """
+        block_ids = []
+        current: List[int] = []
+        size = 0
+        for paragraph in split_paragraphs(text):
+            paragraph_id = self.index.add(paragraph)
+            current.append(paragraph_id)
+            size += len(self.index.paragraphs[paragraph_id])
+            if size >= self.max_block_chars or (
+                size >= self.max_block_chars // 4
+                and self.index.hashes[paragraph_id] % self.boundary == 0
+            ):
+                block_ids.append(self.__block(key, current))
+                current, size = [], 0
+        if current:
+            block_ids.append(self.__block(key, current))
+        return block_ids
+
+    def __block(self, key: Hashable, paragraph_ids: List[int]) -> int:
+        text = "\n".join(self.index.paragraphs[paragraph_id] for paragraph_id in paragraph_ids)
+        self.stats["blocks"] += 1
+        self.stats["chars"] += len(text)
+        block_key = tuple(paragraph_ids)
+        block_id = self._block_ids.get(block_key)
+        if block_id is None:
+            block_id = self._block_ids[block_key] = len(self.blocks)
+            self.blocks.append(text)
+            self.stats["unique_blocks"] += 1
+            self.stats["unique_chars"] += len(text)
+        occurrences = self.occurrences.setdefault(block_id, [])
+        if key not in occurrences:
+            occurrences.append(key)
+        return block_id
+
+    def summary(self) -> Dict[str, Any]:
+        return {**self.stats, **self.index.stats}
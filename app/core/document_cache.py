@@ -0,0 +1,270 @@
+import os
+import json
+import time
+import shutil
+import hashlib
+import sqlite3
+import threading
+from typing import Any, BinaryIO, Dict, Optional, Union
+
+from core.metrics import CACHE_REQUESTS
+
+
+class DocumentCache:
+    """
+    Постоянный кэш скачанных и распарсенных документов FileStorage.
+
+    Сырые байты хранятся на диске по sha256 содержимого, поэтому одинаковые
+    вложения разных аукционов (типовые контракты и т.п.) занимают место один раз.
+    Индекс file_id -> sha256 и извлечённый текст лежат в SQLite рядом с данными.
+    При превышении max_bytes вытесняются давно не использованные документы (LRU).
+
+    scope отделяет результаты парсинга одного и того же содержимого, зависящие
+    от параметров (например, извлечение только разделов под критерии): такие
+    записи хранятся под ключами «id:scope» / «sha256:scope», байты файла общие.
+    """
+
+    def __init__(self, cache_dir: str, max_bytes: int = 1024 ** 3):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.stats = {"hits": 0, "hash_hits": 0, "misses": 0, "evictions": 0}
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.join(self.cache_dir, "blobs"), exist_ok=True)
+        self._conn = sqlite3.connect(
+            os.path.join(self.cache_dir, "index.sqlite3"), check_same_thread=False
+        )
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS files (
+                file_id TEXT PRIMARY KEY,
+                sha256 TEXT NOT NULL,
+                filename TEXT
+            );
+            CREATE TABLE IF NOT EXISTS blobs (
+                sha256 TEXT PRIMARY KEY,
+                size INTEGER NOT NULL,
+                parsed TEXT NOT NULL,
+                last_access REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS blobs_last_access ON blobs (last_access);
+            """
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def content_hash(content: bytes) -> str:
+        return hashlib.sha256(content).hexdigest()
+
+    def get(self, file_id: Any, scope: str = "") -> Optional[Dict[str, Any]]:
+        """
+        Ищет документ по id файла FileStorage.
+
+        :param file_id: Идентификатор файла на портале.
+        :param scope: Вариант результата парсинга.
+        :return: Словарь с filename, sha256 и parsed или None, если документа нет в кэше.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT f.filename, f.sha256, b.parsed FROM files f "
+                "JOIN blobs b ON b.sha256 = f.sha256 WHERE f.file_id = ?",
+                (self._key(file_id, scope),),
+            ).fetchone()
+            if row is None:
+                self.stats["misses"] += 1
+                CACHE_REQUESTS.labels("document", "miss").inc()
+                return None
+            self._touch(row[1])
+            self._conn.commit()
+            self.stats["hits"] += 1
+            CACHE_REQUESTS.labels("document", "hit").inc()
+        return {
+            "filename": row[0],
+            "sha256": self._content_sha256(row[1]),
+            "parsed": self._decode(row[2]),
+        }
+
+    def get_by_hash(
+        self, file_id: Any, sha256: str, filename: str, scope: str = ""
+    ) -> Optional[Any]:
+        """
+        Ищет результат парсинга по хэшу содержимого уже скачанного файла.
+        При попадании запоминает file_id, чтобы следующая проверка обошлась без сети.
+
+        :return: Результат парсинга или None.
+        """
+        key = self._key(sha256, scope)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT parsed FROM blobs WHERE sha256 = ?", (key,)
+            ).fetchone()
+            if row is None:
+                CACHE_REQUESTS.labels("document", "hash_miss").inc()
+                return None
+            self._link(self._key(file_id, scope), key, filename)
+            self._touch(key)
+            self._conn.commit()
+            self.stats["hash_hits"] += 1
+            CACHE_REQUESTS.labels("document", "hash_hit").inc()
+        return self._decode(row[0])
+
+    def put(
+        self,
+        file_id: Any,
+        filename: str,
+        content: Union[bytes, BinaryIO],
+        parsed: Any,
+        sha256: Optional[str] = None,
+        scope: str = "",
+    ) -> str:
+        """
+        Сохраняет сырые байты и результат парсинга документа.
+
+        :param file_id: Идентификатор файла на портале.
+        :param filename: Имя файла (нужно для повторного выбора парсера).
+        :param content: Содержимое файла в байтах или бинарный поток.
+        :param parsed: Результат DocumentParserFactory.parser_file.
+        :param sha256: Уже посчитанный хэш содержимого (обязателен для потока).
+        :param scope: Вариант результата парсинга.
+        :return: sha256 содержимого.
+        """
+        if sha256 is None:
+            sha256 = self.content_hash(content)
+        blob_path = self._blob_path(sha256)
+        with self._lock:
+            if not os.path.exists(blob_path):
+                os.makedirs(os.path.dirname(blob_path), exist_ok=True)
+                tmp_path = blob_path + ".tmp"
+                with open(tmp_path, "wb") as f:
+                    if isinstance(content, (bytes, bytearray)):
+                        f.write(content)
+                    else:
+                        content.seek(0)
+                        shutil.copyfileobj(content, f)
+                os.replace(tmp_path, blob_path)
+
+            encoded = json.dumps(parsed, ensure_ascii=False)
+            key = self._key(sha256, scope)
+            # Байты файла общие для всех вариантов и учитываются в размере одного из них
+            size = len(encoded.encode())
+            content_sha256 = self._content_sha256(sha256)
+            counted = self._conn.execute(
+                "SELECT 1 FROM blobs WHERE (sha256 = ? OR sha256 LIKE ?) AND sha256 != ? "
+                "AND size > length(CAST(parsed AS BLOB)) LIMIT 1",
+                (content_sha256, content_sha256 + ":%", key),
+            ).fetchone()
+            if counted is None:
+                size += os.path.getsize(blob_path)
+            self._conn.execute(
+                "INSERT OR REPLACE INTO blobs (sha256, size, parsed, last_access) "
+                "VALUES (?, ?, ?, ?)",
+                (key, size, encoded, time.time()),
+            )
+            self._link(self._key(file_id, scope), self._key(sha256, scope), filename)
+            self._evict()
+            self._conn.commit()
+        return sha256
+
+    def get_content(self, sha256: str) -> Optional[bytes]:
+        """
+        Возвращает сырые байты документа по хэшу или None.
+        """
+        try:
+            with open(self._blob_path(sha256), "rb") as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def total_size(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM blobs").fetchone()[0]
+
+    def hit_ratio(self) -> float:
+        lookups = self.stats["hits"] + self.stats["misses"]
+        if not lookups:
+            return 0.0
+        return (self.stats["hits"] + self.stats["hash_hits"]) / lookups
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def _blob_path(self, sha256: str) -> str:
+        sha256 = self._content_sha256(sha256)
+        return os.path.join(self.cache_dir, "blobs", sha256[:2], sha256)
+
+    @staticmethod
+    def _key(value: Any, scope: str) -> str:
+        return f"{value}:{scope}" if scope else str(value)
+
+    @staticmethod
+    def _content_sha256(key: str) -> str:
+        return key.split(":", 1)[0]
+
+    def _link(self, file_id: Any, sha256: str, filename: str) -> None:
+        self._conn.execute(
+            "INSERT OR REPLACE INTO files (file_id, sha256, filename) VALUES (?, ?, ?)",
+            (str(file_id), sha256, filename),
+        )
+
+    def _touch(self, sha256: str) -> None:
+        self._conn.execute(
+            "UPDATE blobs SET last_access = ? WHERE sha256 = ?", (time.time(), sha256)
+        )
+
+    def _evict(self) -> None:
+        """
+        Удаляет наименее востребованные документы, пока кэш больше max_bytes.
+        """
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM blobs").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        keys = [
+            row[0]
+            for row in self._conn.execute("SELECT sha256 FROM blobs ORDER BY last_access ASC")
+        ]
+        for sha256 in keys:
+            if total <= self.max_bytes:
+                break
+            # Размер читается заново: байты файла могли перейти к этой записи
+            size, content_size = self._conn.execute(
+                "SELECT size, size - length(CAST(parsed AS BLOB)) FROM blobs WHERE sha256 = ?",
+                (sha256,),
+            ).fetchone()
+            self._conn.execute("DELETE FROM blobs WHERE sha256 = ?", (sha256,))
+            self._conn.execute("DELETE FROM files WHERE sha256 = ?", (sha256,))
+            # Байты файла удаляются, когда на них не ссылается ни один вариант
+            holder = self._content_holder(sha256)
+            if holder is None:
+                try:
+                    os.remove(self._blob_path(sha256))
+                except OSError:
+                    pass
+            elif content_size > 0:
+                # Файл остаётся: его размер переходит к оставшемуся варианту
+                self._conn.execute(
+                    "UPDATE blobs SET size = size + ? WHERE sha256 = ?", (content_size, holder)
+                )
+                size -= content_size
+            total -= size
+            self.stats["evictions"] += 1
+
+    def _content_holder(self, sha256: str) -> Optional[str]:
+        """
+        Ключ оставшегося варианта результата для того же содержимого или None.
+        """
+        content_sha256 = self._content_sha256(sha256)
+        row = self._conn.execute(
+            "SELECT sha256 FROM blobs WHERE sha256 = ? OR sha256 LIKE ? LIMIT 1",
+            (content_sha256, content_sha256 + ":%"),
+        ).fetchone()
+        return row[0] if row else None
+
+    @staticmethod
+    def _decode(parsed: str) -> Any:
+        value = json.loads(parsed)
+        # PDFParser возвращает кортеж (text, info), JSON превращает его в список
+        if isinstance(value, list):
+            return tuple(value)
+        return value
@@ -0,0 +1,270 @@
+import time
+import random
+import hashlib
+import logging
+import tempfile
+import threading
+from typing import Optional, Tuple, Union
+
+import requests
+
+from core.metrics import DOWNLOAD_BYTES, DOWNLOAD_SECONDS, DOWNLOAD_SIZE
+from core.parser.sniff import SNIFF_BYTES
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 64 * 1024
+# Файлы меньше порога остаются в памяти, большие один раз сбрасываются во временный файл
+SPOOL_MAX_SIZE = 8 * 1024 * 1024
+# Ответы, после которых запрос имеет смысл повторить
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+# Потолок паузы между попытками, секунды
+MAX_BACKOFF = 30.0
+
+Timeout = Union[float, Tuple[float, float]]
+
+
+class DownloadBudgetError(Exception):
+    """
+    Файл не помещается в лимит байт на файл или на пакет.
+    """
+
+
+class ByteBudget:
+    """
+    Общий лимит скачанных байт на пакет (один запуск обработки), потокобезопасный.
+    """
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.used = 0
+        self._lock = threading.Lock()
+
+    def take(self, amount: int) -> bool:
+        """
+        Резервирует amount байт; False, если лимит будет превышен.
+        """
+        with self._lock:
+            if self.used + amount > self.limit:
+                return False
+            self.used += amount
+            return True
+
+    def release(self, amount: int) -> None:
+        with self._lock:
+            self.used = max(0, self.used - amount)
+
+
+def backoff_delay(attempt: int, backoff: float) -> float:
+    """
+    Пауза перед повтором: экспоненциальная с полным джиттером, чтобы параллельные
+    загрузки не повторяли запросы к порталу одновременно.
+    """
+    return random.uniform(0, min(MAX_BACKOFF, backoff * 2 ** attempt))
+
+
+def is_retryable(error: BaseException) -> bool:
+    if isinstance(error, requests.HTTPError):
+        return error.response is not None and error.response.status_code in RETRY_STATUSES
+    return isinstance(
+        error, (requests.ConnectionError, requests.Timeout, requests.exceptions.ChunkedEncodingError)
+    )
+
+
+def total_size(response: requests.Response) -> Optional[int]:
+    """
+    Полный размер файла из Content-Range (ответ 206) или Content-Length (ответ 200).
+    """
+    if response.status_code == 206:
+        total = response.headers.get("Content-Range", "").rpartition("/")[2]
+        return int(total) if total.isdigit() else None
+    length = response.headers.get("Content-Length", "")
+    return int(length) if length.isdigit() else None
+
+
+def stream_download(
+    session: requests.Session,
+    url: str,
+    timeout: Timeout = 10,
+    chunk_size: int = CHUNK_SIZE,
+    spool_max_size: int = SPOOL_MAX_SIZE,
+    retries: int = 0,
+    backoff: float = 0.5,
+    max_bytes: Optional[int] = None,
+    budget: Optional[ByteBudget] = None,
+    expected_size: Optional[int] = None,
+    head: bytes = b"",
+) -> Tuple[tempfile.SpooledTemporaryFile, requests.Response, str]:
+    """
+    Скачивает файл потоком в SpooledTemporaryFile, попутно считая sha256.
+
+    Оборванная передача продолжается запросом Range с уже полученного байта;
+    если сервер докачку не поддерживает, файл скачивается заново. Так же продолжается
+    файл, начало которого уже получено (head из fetch_head). Сетевые ошибки
+    и ответы 429/5xx повторяются до retries раз с паузой backoff_delay.
+
+    :param session: Сессия requests (keep-alive).
+    :param url: Адрес файла.
+    :param timeout: Таймаут соединения и чтения (или пара connect, read).
+    :param chunk_size: Размер читаемого блока.
+    :param spool_max_size: Порог, после которого буфер переносится на диск.
+    :param retries: Сколько раз повторять после временной ошибки.
+    :param backoff: Базовая пауза между повторами, секунды.
+    :param max_bytes: Лимит размера файла.
+    :param budget: Общий лимит байт пакета; известный размер резервируется заранее.
+    :param expected_size: Размер файла, если он уже известен (fetch_head).
+    :param head: Уже полученное начало файла (fetch_head): скачивание продолжается с его конца.
+    :return: Буфер, установленный в начало, ответ (для заголовков) и sha256 содержимого.
+    :raises DownloadBudgetError: Файл больше max_bytes или не помещается в budget.
+    """
+    if max_bytes is not None and expected_size is not None and expected_size > max_bytes:
+        raise DownloadBudgetError(f"File size {expected_size} exceeds limit {max_bytes}: {url}")
+    reserved = 0
+    if budget is not None and expected_size is not None:
+        if not budget.take(expected_size):
+            raise DownloadBudgetError(f"Batch download budget exhausted: {url}")
+        reserved = expected_size
+
+    buffer = tempfile.SpooledTemporaryFile(max_size=spool_max_size)
+    buffer.write(head)
+    digest = hashlib.sha256(head)
+    size = len(head)
+    transferred = 0
+    attempt = 0
+    started = time.perf_counter()
+    try:
+        while True:
+            headers = {"Range": f"bytes={size}-"} if size else None
+            try:
+                with session.get(url, timeout=timeout, stream=True, headers=headers) as response:
+                    response.raise_for_status()
+                    if size and not response.headers.get("Content-Range", "").startswith(
+                        f"bytes {size}-"
+                    ):
+                        # Сервер отдал файл целиком вместо продолжения
+                        buffer.seek(0)
+                        buffer.truncate()
+                        digest = hashlib.sha256()
+                        size = 0
+                    total = total_size(response)
+                    if max_bytes is not None and total is not None and total > max_bytes:
+                        raise DownloadBudgetError(f"File size {total} exceeds limit {max_bytes}: {url}")
+                    # Размер стал известен из заголовков: резервируем его до чтения тела
+                    if budget is not None and total is not None and total > reserved:
+                        if not budget.take(total - reserved):
+                            raise DownloadBudgetError(f"Batch download budget exhausted: {url}")
+                        reserved = total
+                    for chunk in response.iter_content(chunk_size=chunk_size):
+                        if not chunk:
+                            continue
+                        if max_bytes is not None and size + len(chunk) > max_bytes:
+                            raise DownloadBudgetError(f"File exceeds limit {max_bytes}: {url}")
+                        # Сверх зарезервированного размер берётся из лимита пакета по мере чтения
+                        extra = size + len(chunk) - max(reserved, size)
+                        if budget is not None and extra > 0:
+                            if not budget.take(extra):
+                                raise DownloadBudgetError(f"Batch download budget exhausted: {url}")
+                            reserved += extra
+                        buffer.write(chunk)
+                        digest.update(chunk)
+                        size += len(chunk)
+                        transferred += len(chunk)
+                    if total is not None and size < total:
+                        raise requests.exceptions.ChunkedEncodingError(
+                            f"Connection closed after {size} of {total} bytes"
+                        )
+                break
+            except requests.RequestException as e:
+                if attempt >= retries or not is_retryable(e):
+                    raise
+                delay = backoff_delay(attempt, backoff)
+                attempt += 1
+                logger.warning(
+                    f"Download of {url} interrupted at {size} bytes ({e}), "
+                    f"retry {attempt}/{retries} in {delay:.1f} s"
+                )
+                time.sleep(delay)
+    except BaseException:
+        buffer.close()
+        if budget is not None and reserved > size:
+            budget.release(reserved - size)
+        raise
+    finally:
+        DOWNLOAD_BYTES.inc(transferred)
+
+    if budget is not None and reserved > size:
+        budget.release(reserved - size)
+    DOWNLOAD_SECONDS.observe(time.perf_counter() - started)
+    DOWNLOAD_SIZE.observe(size)
+
+    buffer.seek(0)
+    return buffer, response, digest.hexdigest()
+
+
+def fetch_head(
+    session: requests.Session,
+    url: str,
+    size: int = SNIFF_BYTES,
+    timeout: Timeout = 10,
+    retries: int = 0,
+    backoff: float = 0.5,
+) -> Tuple[bytes, requests.Response, Optional[int]]:
+    """
+    Начало файла запросом Range: по нему формат определяется до полного скачивания,
+    а полный размер — из Content-Range. Если сервер игнорирует Range и отвечает 200,
+    читается только начало тела.
+
+    :param session: Сессия requests (keep-alive).
+    :param url: Адрес файла.
+    :param size: Сколько байт запросить.
+    :param timeout: Таймаут соединения и чтения.
+    :param retries: Сколько раз повторять после временной ошибки.
+    :param backoff: Базовая пауза между повторами, секунды.
+    :return: Начало файла, ответ (для заголовков) и полный размер файла, если он известен.
+        Файл получен целиком, если размер не больше длины начала.
+    """
+    started = time.perf_counter()
+    headers = {"Range": f"bytes=0-{size - 1}"}
+    attempt = 0
+    while True:
+        try:
+            with session.get(url, timeout=timeout, stream=True, headers=headers) as response:
+                response.raise_for_status()
+                # iter_content, а не raw.read: обрыв и таймаут чтения приходят
+                # исключениями requests и попадают в повторы
+                head = b""
+                for chunk in response.iter_content(chunk_size=size + 1):
+                    head += chunk
+                    if len(head) > size:
+                        break
+            break
+        except requests.RequestException as e:
+            if attempt >= retries or not is_retryable(e):
+                raise
+            time.sleep(backoff_delay(attempt, backoff))
+            attempt += 1
+    DOWNLOAD_BYTES.inc(len(head))
+
+    total = total_size(response)
+    if response.status_code != 206 and len(head) <= size:
+        # Тело без Range закончилось раньше запрошенного: это весь файл
+        total = len(head)
+    head = head[:size]
+    if total is not None and total <= len(head):
+        DOWNLOAD_SECONDS.observe(time.perf_counter() - started)
+        DOWNLOAD_SIZE.observe(len(head))
+    return head, response, total
+
+
+def spool_bytes(
+    content: bytes, spool_max_size: int = SPOOL_MAX_SIZE
+) -> Tuple[tempfile.SpooledTemporaryFile, str]:
+    """
+    Буфер того же вида, что у stream_download, для уже полученного содержимого.
+
+    :return: Буфер, установленный в начало, и sha256 содержимого.
+    """
+    buffer = tempfile.SpooledTemporaryFile(max_size=spool_max_size)
+    buffer.write(content)
+    buffer.seek(0)
+    return buffer, hashlib.sha256(content).hexdigest()
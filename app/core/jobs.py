@@ -0,0 +1,270 @@
+import json
+import time
+import uuid
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+from core.config import Config
+from core.metrics import JOBS_FINISHED, JOBS_IN_FLIGHT
+
+logger = logging.getLogger(__name__)
+
+STATUS_QUEUED = "queued"
+STATUS_RUNNING = "running"
+STATUS_DONE = "done"
+STATUS_FAILED = "failed"
+FINAL_STATUSES = (STATUS_DONE, STATUS_FAILED)
+# Ошибка задачи, воркер которой перестал отмечать её (перезапуск или падение процесса)
+LOST_WORKER_ERROR = "Воркер API, выполнявший задачу, остановлен"
+# Множество незавершённых задач, которые проверяет reap_lost
+ACTIVE_JOBS_KEY = "jobs:active"
+
+
+class JobStore:
+    """
+    Состояние задач генерации отчёта в Redis, общее для всех воркеров API.
+
+    Ключи:
+        job:{id} — hash со статусом, запросом, ошибкой и временем обновления;
+        job:{id}:events — список событий прогресса (JSON) в порядке поступления;
+        job:{id}:result — результат обработки (JSON);
+        job:{id}:alive — отметка воркера, выполняющего задачу (heartbeat);
+        jobs:active — множество незавершённых задач.
+    Все ключи задачи, кроме отметки, живут ttl секунд с момента последнего изменения;
+    отметка — heartbeat_ttl секунд. Незавершённые задачи без отметки переводит
+    в failed reap_lost (фоновый поток каждого процесса API): выполнявший их
+    процесс остановлен. Чтение состояния ничего не изменяет.
+    """
+
+    def __init__(self, client: Any, ttl: int = 24 * 3600, heartbeat_ttl: int = 60):
+        self.client = client
+        self.ttl = ttl
+        self.heartbeat_ttl = heartbeat_ttl
+
+    def create(self, request: Dict[str, Any]) -> str:
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        self.client.hset(
+            self.__key(job_id),
+            mapping={
+                "status": STATUS_QUEUED,
+                "request": json.dumps(request, ensure_ascii=False),
+                "created_at": now,
+                "updated_at": now,
+            },
+        )
+        self.client.expire(self.__key(job_id), self.ttl)
+        self.heartbeat([job_id])
+        self.client.sadd(ACTIVE_JOBS_KEY, job_id)
+        return job_id
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        raw = self.client.hgetall(self.__key(job_id))
+        if not raw:
+            return None
+        job = {self.__decode(k): self.__decode(v) for k, v in raw.items()}
+        job["job_id"] = job_id
+        job["request"] = json.loads(job["request"])
+        job["created_at"] = float(job["created_at"])
+        job["updated_at"] = float(job["updated_at"])
+        job["events"] = self.client.llen(self.__key(job_id, "events"))
+        return job
+
+    def set_status(self, job_id: str, status: str, error: Optional[str] = None) -> None:
+        mapping = {"status": status, "updated_at": time.time()}
+        if error is not None:
+            mapping["error"] = error
+        self.client.hset(self.__key(job_id), mapping=mapping)
+        if status in FINAL_STATUSES:
+            self.client.delete(self.__key(job_id, "alive"))
+            self.client.srem(ACTIVE_JOBS_KEY, job_id)
+
+        event = {"stage": "job", "status": status}
+        if error is not None:
+            event["error"] = error
+        self.add_event(job_id, event)
+
+    def add_event(self, job_id: str, event: Dict[str, Any]) -> None:
+        event = {"time": time.time(), **event}
+        pipe = self.client.pipeline()
+        pipe.rpush(self.__key(job_id, "events"), json.dumps(event, ensure_ascii=False))
+        pipe.hset(self.__key(job_id), "updated_at", event["time"])
+        for key in (self.__key(job_id), self.__key(job_id, "events")):
+            pipe.expire(key, self.ttl)
+        pipe.execute()
+
+    def events(self, job_id: str, start: int = 0) -> List[Dict[str, Any]]:
+        """
+        Возвращает события прогресса начиная с номера start.
+        """
+        return [
+            json.loads(event)
+            for event in self.client.lrange(self.__key(job_id, "events"), start, -1)
+        ]
+
+    def set_result(self, job_id: str, result: Any) -> None:
+        self.client.set(
+            self.__key(job_id, "result"), json.dumps(result, ensure_ascii=False), ex=self.ttl
+        )
+
+    def get_result(self, job_id: str) -> Optional[Any]:
+        raw = self.client.get(self.__key(job_id, "result"))
+        return json.loads(raw) if raw is not None else None
+
+    def heartbeat(self, job_ids: Iterable[str]) -> None:
+        """
+        Продлевает отметки воркера для задач, которые выполняет этот процесс.
+        """
+        pipe = self.client.pipeline()
+        for job_id in job_ids:
+            pipe.set(self.__key(job_id, "alive"), 1, ex=self.heartbeat_ttl)
+        pipe.execute()
+
+    def reap_lost(self) -> List[str]:
+        """
+        Переводит в failed незавершённые задачи без отметки воркера.
+        Статус меняется транзакцией WATCH: задача, которую воркер успел завершить
+        или отметить, не затрагивается, а при проверке из нескольких процессов
+        задача помечается один раз.
+
+        :return: Задачи, переведённые в failed.
+        """
+        from redis.exceptions import WatchError
+
+        lost = []
+        for raw in self.client.smembers(ACTIVE_JOBS_KEY):
+            job_id = self.__decode(raw)
+            with self.client.pipeline() as pipe:
+                try:
+                    pipe.watch(self.__key(job_id), self.__key(job_id, "alive"))
+                    status = pipe.hget(self.__key(job_id), "status")
+                    if status is None or self.__decode(status) in FINAL_STATUSES:
+                        # Задача истекла или уже завершена
+                        pipe.multi()
+                        pipe.srem(ACTIVE_JOBS_KEY, job_id)
+                        pipe.execute()
+                        continue
+                    if pipe.exists(self.__key(job_id, "alive")):
+                        continue
+                    pipe.multi()
+                    pipe.hset(
+                        self.__key(job_id),
+                        mapping={"status": STATUS_FAILED, "error": LOST_WORKER_ERROR, "updated_at": time.time()},
+                    )
+                    pipe.srem(ACTIVE_JOBS_KEY, job_id)
+                    pipe.execute()
+                except WatchError:
+                    continue
+            logger.warning(f"Report job {job_id} lost its worker")
+            self.add_event(job_id, {"stage": "job", "status": STATUS_FAILED, "error": LOST_WORKER_ERROR})
+            lost.append(job_id)
+        return lost
+
+    def __key(self, job_id: str, *parts: str) -> str:
+        return ":".join(("job", job_id) + parts)
+
+    @staticmethod
+    def __decode(value: Any) -> str:
+        return value.decode() if isinstance(value, bytes) else value
+
+
+def run_report_job(store: JobStore, job_id: str, urls: List[str], criteria: List[int]) -> None:
+    """
+    Выполняет обработку аукционов задачи, публикуя прогресс и результат в JobStore.
+    """
+    # Тяжёлые зависимости обработки нужны только воркеру, выполняющему задачу
+    from core.processing import LLMProcessingEntity
+
+    store.set_status(job_id, STATUS_RUNNING)
+    with JOBS_IN_FLIGHT.labels("job").track_inprogress():
+        try:
+            entity = LLMProcessingEntity(
+                urls, criteria, progress=lambda event: store.add_event(job_id, event)
+            )
+            result = entity.parse()
+            # Заключения LLM по критериям — для PDF-отчёта задачи (/report_jobs/{id}/report)
+            if Config.REPORT_EVALUATE:
+                store.add_event(job_id, {"stage": "evaluate", "status": "started"})
+                try:
+                    result["answers"] = entity.evaluate()
+                except Exception as e:
+                    logger.error(f"LLM evaluation failed for job {job_id}: {e}")
+                    result["answers"] = {}
+                store.add_event(job_id, {"stage": "evaluate", "status": "done"})
+            store.set_result(job_id, result)
+            store.set_status(job_id, STATUS_DONE)
+            JOBS_FINISHED.labels(STATUS_DONE).inc()
+        except Exception as e:
+            logger.exception(f"Report job {job_id} failed")
+            store.set_status(job_id, STATUS_FAILED, error=str(e))
+            JOBS_FINISHED.labels(STATUS_FAILED).inc()
+
+
+_job_store = None
+_executor = None
+_init_lock = threading.Lock()
+# Незавершённые задачи этого процесса, которым нужна отметка воркера
+_owned_jobs: Set[str] = set()
+_owned_lock = threading.Lock()
+
+
+def get_job_store() -> JobStore:
+    """
+    Возвращает общий JobStore процесса (Redis из Config).
+    Вместе с ним запускается фоновый поток: отметки задач процесса и проверка упавших воркеров.
+    """
+    global _job_store
+    if _job_store is None:
+        with _init_lock:
+            if _job_store is None:
+                import redis
+
+                client = redis.Redis(host=Config.REDIS_HOST, port=Config.REDIS_PORT)
+                store = JobStore(client, ttl=Config.JOB_TTL, heartbeat_ttl=Config.JOB_HEARTBEAT_TTL)
+                threading.Thread(
+                    target=_heartbeat_loop, args=(store,), name="report-job-heartbeat", daemon=True
+                ).start()
+                _job_store = store
+    return _job_store
+
+
+def submit_report_job(store: JobStore, urls: List[str], criteria: List[int]) -> str:
+    """
+    Регистрирует задачу и запускает её в фоновом пуле потоков процесса.
+    Пока задача в очереди или выполняется, процесс продлевает её отметку воркера.
+    """
+    global _executor
+    if _executor is None:
+        with _init_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=Config.JOB_WORKERS, thread_name_prefix="report-job"
+                )
+    job_id = store.create({"urls": urls, "criterion": criteria})
+    with _owned_lock:
+        _owned_jobs.add(job_id)
+    _executor.submit(_run_owned_job, store, job_id, urls, criteria)
+    return job_id
+
+
+def _run_owned_job(store: JobStore, job_id: str, urls: List[str], criteria: List[int]) -> None:
+    try:
+        run_report_job(store, job_id, urls, criteria)
+    finally:
+        with _owned_lock:
+            _owned_jobs.discard(job_id)
+
+
+def _heartbeat_loop(store: JobStore) -> None:
+    while True:
+        time.sleep(Config.JOB_HEARTBEAT_INTERVAL)
+        with _owned_lock:
+            job_ids = list(_owned_jobs)
+        try:
+            if job_ids:
+                store.heartbeat(job_ids)
+            store.reap_lost()
+        except Exception as e:
+            logger.warning(f"Report job heartbeat failed: {e}")
@@ -0,0 +1,282 @@
+import time
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import requests
+
+from core.config import Config
+from core.metrics import LLM_BATCH_SIZE, LLM_REQUEST_SECONDS
+from core.parser.parser_site_mos import create_session
+
+logger = logging.getLogger(__name__)
+
+# Общая часть промпта для каждого критерия. Запросы одного критерия уходят одним
+# батчем с одинаковым префиксом, и сервер переиспользует его KV-кэш (prefix caching)
+CRITERION_PROMPTS: Dict[int, str] = {
+    1: "Проверь, совпадает ли название закупки в карточке аукциона с предметом контракта "
+       "и технического задания.",
+    2: "Проверь, совпадает ли требование обеспечения исполнения контракта в карточке "
+       "аукциона с условиями проекта контракта.",
+    3: "Проверь, совпадают ли требования к сертификатам и лицензиям в карточке аукциона "
+       "с требованиями документации.",
+    4: "Проверь, совпадают ли график и место поставки в карточке аукциона с условиями "
+       "проекта контракта.",
+    5: "Проверь, совпадает ли тип цены (начальная или максимальная) в карточке аукциона "
+       "с проектом контракта.",
+    6: "Проверь, совпадают ли наименования, количество и характеристики товаров в "
+       "карточке аукциона со спецификацией и техническим заданием.",
+}
+PROMPT_SUFFIX = "\n\nОтветь «Да» или «Нет» и кратко обоснуй ответ."
+
+# Выдержки из фрагмента документа по критерию: фрагмент, общий для нескольких
+# аукционов, обрабатывается один раз (см. LLMProcessingEntity.evaluate)
+CRITERION_TOPICS: Dict[int, str] = {
+    1: "название и предмет закупки",
+    2: "обеспечение исполнения контракта",
+    3: "сертификаты, лицензии и декларации",
+    4: "сроки, график и место поставки",
+    5: "цена контракта и её тип (начальная или максимальная)",
+    6: "наименования, количество и характеристики товаров",
+}
+EXTRACT_PROMPTS: Dict[int, str] = {
+    criterion: f"Выпиши из фрагмента документа дословно всё, что относится к теме: {topic}. "
+               "Если ничего нет, ответь «Нет»."
+    for criterion, topic in CRITERION_TOPICS.items()
+}
+NO_EXTRACT = "нет"
+
+# Статусы, после которых запрос имеет смысл повторить
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+class LLMError(Exception):
+    pass
+
+
+class LLMClient:
+    """
+    Клиент LLM-сервиса с динамическими микро-батчами.
+
+    Промпты, пришедшие из разных аукционов почти одновременно, копятся в очереди
+    своего критерия и уходят одним запросом, когда набирается max_batch_size или
+    старейший ждёт дольше max_wait секунд. Одновременно выполняется не больше
+    max_in_flight HTTP-запросов через общую keep-alive сессию; ошибки соединения
+    и статусы 429/5xx повторяются с экспоненциальной задержкой.
+
+    Сервис должен поддерживать OpenAI-совместимый POST {url}/v1/completions
+    со списком промптов в поле prompt (vLLM, TGI и т.п.); ответы сопоставляются
+    по choices[].index.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        model: str = "default",
+        max_batch_size: int = 8,
+        max_wait: float = 0.05,
+        max_in_flight: int = 4,
+        retries: int = 3,
+        backoff: float = 0.5,
+        timeout: float = 120,
+        max_tokens: int = 512,
+        prompts: Dict[int, str] = CRITERION_PROMPTS,
+        extract_prompts: Dict[int, str] = EXTRACT_PROMPTS,
+        session: Optional[requests.Session] = None,
+    ):
+        self.url = url.rstrip("/") + "/v1/completions"
+        self.model = model
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max_wait
+        self.max_in_flight = max(1, max_in_flight)
+        self.retries = retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.max_tokens = max_tokens
+        self.prompts = {"check": prompts, "extract": extract_prompts}
+        self.session = session or create_session(self.max_in_flight)
+        self.stats = {"requests": 0, "prompts": 0, "retries": 0, "failures": 0}
+        self._stats_lock = threading.Lock()
+
+        # Очереди ожидающих промптов по (вид задачи, критерий): (время постановки, промпт, future)
+        self._pending: Dict[Tuple[str, int], List[Tuple[float, str, Future]]] = {}
+        self._condition = threading.Condition()
+        self._in_flight = threading.BoundedSemaphore(self.max_in_flight)
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_in_flight, thread_name_prefix="llm-request"
+        )
+        self._closed = False
+        self._dispatcher = threading.Thread(
+            target=self.__dispatch, name="llm-batcher", daemon=True
+        )
+        self._dispatcher.start()
+
+    def submit(self, criterion: int, prompt: str, kind: str = "check") -> "Future[str]":
+        """
+        Ставит промпт в очередь критерия.
+
+        :param criterion: Номер критерия (определяет общий префикс промпта).
+        :param prompt: Часть промпта с данными аукциона и документов.
+        :param kind: check — проверка критерия, extract — выдержки из фрагмента документа.
+        :return: Future с ответом модели.
+        """
+        future: Future = Future()
+        with self._condition:
+            if self._closed:
+                raise LLMError("LLM client is closed")
+            self._pending.setdefault((kind, criterion), []).append(
+                (time.monotonic(), prompt, future)
+            )
+            self._condition.notify()
+        return future
+
+    def complete(self, criterion: int, prompt: str) -> str:
+        return self.submit(criterion, prompt).result()
+
+    def complete_many(self, items: Sequence[Tuple[int, str]]) -> List[str]:
+        """
+        Отправляет пары (критерий, промпт) и возвращает ответы в том же порядке.
+        """
+        futures = [self.submit(criterion, prompt) for criterion, prompt in items]
+        return [future.result() for future in futures]
+
+    def close(self) -> None:
+        """
+        Отправляет оставшиеся промпты и останавливает клиент.
+        """
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+        self._dispatcher.join()
+        self._executor.shutdown(wait=True)
+        self.session.close()
+
+    def __enter__(self) -> "LLMClient":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def full_prompt(self, criterion: int, prompt: str, kind: str = "check") -> str:
+        prefix = self.prompts[kind].get(criterion, "")
+        suffix = PROMPT_SUFFIX if kind == "check" else ""
+        return f"{prefix}\n\n{prompt}{suffix}"
+
+    def __dispatch(self) -> None:
+        """
+        Поток-диспетчер: собирает батчи и отдаёт их в пул отправки.
+        """
+        while True:
+            # Сначала ждём свободный слот: пока все запросы заняты, очереди продолжают расти
+            self._in_flight.acquire()
+            with self._condition:
+                batch = self.__ready_batch()
+                while batch is None:
+                    if self._closed and not self._pending:
+                        self._in_flight.release()
+                        return
+                    self._condition.wait(timeout=self.__next_deadline())
+                    batch = self.__ready_batch()
+            self._executor.submit(self.__send_batch, *batch)
+
+    def __ready_batch(
+        self,
+    ) -> Optional[Tuple[Tuple[str, int], List[Tuple[float, str, Future]]]]:
+        now = time.monotonic()
+        for key, queue in self._pending.items():
+            if (
+                len(queue) >= self.max_batch_size
+                or now - queue[0][0] >= self.max_wait
+                or self._closed
+            ):
+                batch = queue[:self.max_batch_size]
+                del queue[:self.max_batch_size]
+                if not queue:
+                    del self._pending[key]
+                return key, batch
+        return None
+
+    def __next_deadline(self) -> Optional[float]:
+        if not self._pending:
+            return None
+        oldest = min(queue[0][0] for queue in self._pending.values())
+        return max(0.0, oldest + self.max_wait - time.monotonic())
+
+    def __send_batch(
+        self, key: Tuple[str, int], batch: List[Tuple[float, str, Future]]
+    ) -> None:
+        kind, criterion = key
+        LLM_BATCH_SIZE.labels(kind).observe(len(batch))
+        try:
+            with LLM_REQUEST_SECONDS.labels(kind).time():
+                answers = self.__post(
+                    [self.full_prompt(criterion, prompt, kind) for _, prompt, _ in batch]
+                )
+        except Exception as e:
+            self.__count("failures")
+            for _, _, future in batch:
+                future.set_exception(e)
+        else:
+            for (_, _, future), answer in zip(batch, answers):
+                future.set_result(answer)
+        finally:
+            self._in_flight.release()
+
+    def __post(self, prompts: List[str]) -> List[str]:
+        payload = {"model": self.model, "prompt": prompts, "max_tokens": self.max_tokens}
+        for attempt in range(self.retries + 1):
+            try:
+                response = self.session.post(self.url, json=payload, timeout=self.timeout)
+                if response.status_code not in RETRY_STATUSES:
+                    response.raise_for_status()
+                    self.__count("requests")
+                    self.__count("prompts", len(prompts))
+                    return self.__answers(response.json(), len(prompts))
+                error: Exception = LLMError(f"LLM service returned {response.status_code}")
+            except (requests.ConnectionError, requests.Timeout) as e:
+                error = e
+            if attempt == self.retries:
+                raise error
+            self.__count("retries")
+            delay = self.backoff * 2 ** attempt
+            logger.warning(f"LLM request failed ({error}), retry in {delay:.1f}s")
+            time.sleep(delay)
+
+    def __count(self, name: str, value: int = 1) -> None:
+        with self._stats_lock:
+            self.stats[name] += value
+
+    @staticmethod
+    def __answers(body: Dict[str, Any], count: int) -> List[str]:
+        answers: List[Optional[str]] = [None] * count
+        for choice in body.get("choices", []):
+            index = choice.get("index", 0)
+            if 0 <= index < count:
+                answers[index] = choice.get("text", "")
+        if any(answer is None for answer in answers):
+            raise LLMError("LLM response does not contain answers for all prompts")
+        return answers
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_llm_client() -> LLMClient:
+    """
+    Возвращает общий клиент процесса (параметры из Config).
+    """
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = LLMClient(
+                Config.LLM_URL,
+                model=Config.LLM_MODEL,
+                max_batch_size=Config.LLM_MAX_BATCH_SIZE,
+                max_wait=Config.LLM_BATCH_WAIT,
+                max_in_flight=Config.LLM_MAX_IN_FLIGHT,
+                retries=Config.LLM_RETRIES,
+                timeout=Config.LLM_TIMEOUT,
+            )
+    return _client
@@ -0,0 +1,46 @@
+from prometheus_client import Counter, Gauge, Histogram
+
+# Метрики пишутся в общий реестр prometheus_client процесса (REGISTRY): каждый воркер
+# uvicorn отдаёт свои значения; процессы пула парсинга метрики не пишут — их замеры
+# возвращаются в родительский процесс
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+BYTES_BUCKETS = tuple(1024 * 4 ** n for n in range(10))
+
+
+# Метрики этапов обработки
+HTTP_REQUEST_SECONDS = Histogram(
+    "http_request_seconds", "Latency of API requests", ["method", "route", "status"],
+    buckets=DEFAULT_BUCKETS,
+)
+AUCTION_API_SECONDS = Histogram(
+    "auction_api_request_seconds",
+    "Latency of zakupki.mos.ru API calls (Auction/Get, GetAuctionItemAdditionalInfo)",
+    ["endpoint"],
+    buckets=DEFAULT_BUCKETS,
+)
+DOWNLOAD_SECONDS = Histogram(
+    "download_seconds", "Duration of FileStorage downloads", buckets=DEFAULT_BUCKETS
+)
+DOWNLOAD_BYTES = Counter("download_bytes_total", "Bytes downloaded from FileStorage")
+DOWNLOAD_SIZE = Histogram("download_size_bytes", "Size of downloaded files", buckets=BYTES_BUCKETS)
+PARSE_SECONDS = Histogram(
+    "document_parse_seconds", "Document parsing time", ["type"], buckets=DEFAULT_BUCKETS
+)
+PARSE_PAGES = Counter(
+    "document_pages_parsed_total", "PDF pages extracted (pages per second = rate / parse seconds)", ["type"]
+)
+CACHE_REQUESTS = Counter(
+    "cache_requests_total", "Cache lookups by cache and result (hit, hash_hit, miss)", ["cache", "result"]
+)
+PIPELINE_STAGE_SECONDS = Histogram(
+    "pipeline_stage_seconds", "Time spent by a pipeline stage on one item", ["stage"],
+    buckets=DEFAULT_BUCKETS,
+)
+LLM_REQUEST_SECONDS = Histogram(
+    "llm_request_seconds", "Latency of LLM batch requests", ["kind"], buckets=DEFAULT_BUCKETS
+)
+LLM_BATCH_SIZE = Histogram(
+    "llm_batch_size", "Prompts per LLM request", ["kind"], buckets=(1, 2, 4, 8, 16, 32, 64)
+)
+JOBS_IN_FLIGHT = Gauge("jobs_in_flight", "Report jobs and streamed reports in progress", ["kind"])
+JOBS_FINISHED = Counter("jobs_finished_total", "Finished report jobs by status", ["status"])
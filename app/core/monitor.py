@@ -0,0 +1,313 @@
+import json
+import time
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set
+
+from core.config import Config
+from core.auction_cache import AuctionCache
+from core.document_cache import DocumentCache
+from core.llm_client import LLMClient
+from core.parser.parser_site_mos import AuctionParser, create_session
+
+logger = logging.getLogger(__name__)
+
+
+def auction_id_from(url_or_id: Any) -> str:
+    return str(url_or_id).rstrip("/").split("/")[-1]
+
+
+class SnapshotStore:
+    """
+    Последние обработанные версии аукционов мониторинга.
+
+    Снимок аукциона: хэш ответа Auction/Get, хэши данных карточки по критериям,
+    распарсенные файлы по id FileStorage и ответы LLM по критериям.
+    С клиентом Redis снимки лежат в monitor:{id} и переживают перезапуск,
+    без него — в памяти процесса.
+    """
+
+    def __init__(self, client: Any = None):
+        self.client = client
+        self._memory: Dict[str, str] = {}
+
+    def get(self, auction_id: str) -> Optional[Dict[str, Any]]:
+        try:
+            raw = (
+                self.client.get(self.__key(auction_id))
+                if self.client is not None
+                else self._memory.get(auction_id)
+            )
+        except Exception as e:
+            logger.warning(f"Monitor snapshot store is unavailable: {e}")
+            return None
+        if raw is None:
+            return None
+        snapshot = json.loads(raw)
+        # JSON превращает ключи критериев в строки, а кортежи PDFParser — в списки
+        snapshot["criteria"] = {int(c): value for c, value in snapshot["criteria"].items()}
+        snapshot["answers"] = {int(c): value for c, value in snapshot["answers"].items()}
+        for file in snapshot["files"].values():
+            if isinstance(file["parsed"], list):
+                file["parsed"] = tuple(file["parsed"])
+        return snapshot
+
+    def put(self, auction_id: str, snapshot: Dict[str, Any]) -> None:
+        raw = json.dumps(snapshot, ensure_ascii=False)
+        if self.client is None:
+            self._memory[auction_id] = raw
+            return
+        try:
+            self.client.set(self.__key(auction_id), raw)
+        except Exception as e:
+            logger.warning(f"Monitor snapshot store is unavailable: {e}")
+
+    def delete(self, auction_id: str) -> None:
+        if self.client is None:
+            self._memory.pop(auction_id, None)
+            return
+        try:
+            self.client.delete(self.__key(auction_id))
+        except Exception as e:
+            logger.warning(f"Monitor snapshot store is unavailable: {e}")
+
+    @staticmethod
+    def __key(auction_id: str) -> str:
+        return f"monitor:{auction_id}"
+
+
+class AuctionMonitor:
+    """
+    Периодический мониторинг списка аукционов с инкрементальной обработкой.
+
+    Каждые interval секунд свежий ответ Auction/Get каждого аукциона (не больше
+    concurrency запросов одновременно) сравнивается со снимком прошлой обработки.
+    Для изменившихся аукционов скачиваются и парсятся только файлы с новыми id,
+    а в LLM заново проверяются только критерии, чьи входные данные изменились:
+    данные карточки по критерию или набор документов. Критерии без ответа
+    (новые или упавшие в прошлый раз) тоже проверяются.
+
+    on_change получает по каждому обработанному аукциону словарь с полями
+    auction_id, files_added, files_removed, criteria и answers.
+    """
+
+    def __init__(
+        self,
+        watch_list: Iterable[Any],
+        criteria: List[int],
+        interval: float = 300,
+        concurrency: int = 4,
+        store: Optional[SnapshotStore] = None,
+        cache: Optional[DocumentCache] = None,
+        client: Optional[LLMClient] = None,
+        evaluate: bool = True,
+        on_change: Optional[Callable[[Dict[str, Any]], None]] = None,
+    ):
+        self.watch: Set[str] = {auction_id_from(auction) for auction in watch_list}
+        self.criteria = sorted(set(criteria))
+        self.interval = interval
+        self.concurrency = max(1, concurrency)
+        self.store = store or SnapshotStore()
+        self.cache = cache
+        self.client = client
+        self.evaluate = evaluate
+        self.on_change = on_change
+        self.session = create_session(self.concurrency)
+        self.stats = {"polls": 0, "unchanged": 0, "changed": 0, "files_parsed": 0, "evaluated": 0}
+        self._stop = threading.Event()
+
+    def add(self, auction: Any) -> None:
+        self.watch.add(auction_id_from(auction))
+
+    def remove(self, auction: Any) -> None:
+        auction_id = auction_id_from(auction)
+        self.watch.discard(auction_id)
+        self.store.delete(auction_id)
+
+    def run(self) -> None:
+        """
+        Опрашивает аукционы до вызова stop(); интервал отсчитывается от начала опроса.
+        """
+        while not self._stop.is_set():
+            started = time.monotonic()
+            try:
+                self.poll()
+            except Exception:
+                logger.exception("Monitor poll failed")
+            self._stop.wait(max(0.0, self.interval - (time.monotonic() - started)))
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def poll(self) -> List[Dict[str, Any]]:
+        """
+        Один проход по списку наблюдения.
+
+        :return: Изменения по обработанным аукционам (как в on_change).
+        """
+        self.stats["polls"] += 1
+        auction_ids = sorted(self.watch)
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            payloads = list(executor.map(self.__fetch, auction_ids))
+
+        dirty = {}
+        for auction_id, payload in zip(auction_ids, payloads):
+            if payload is None:
+                continue
+            snapshot = self.store.get(auction_id)
+            if self.__is_dirty(snapshot, payload):
+                dirty[auction_id] = (payload, snapshot)
+            else:
+                self.stats["unchanged"] += 1
+        if not dirty:
+            return []
+        self.stats["changed"] += len(dirty)
+        return self.__process(dirty)
+
+    def __fetch(self, auction_id: str) -> Optional[Dict[str, Any]]:
+        # Без AuctionCache: нужен свежий ответ, а не сохранённый на время TTL
+        parser = AuctionParser(
+            auction_id, session=self.session, max_workers=1, base_url=Config.ZAKUPKI_URL
+        )
+        try:
+            return parser.fetch_payload()
+        except Exception as e:
+            logger.warning(f"Monitor failed to fetch auction {auction_id}: {e}")
+            return None
+
+    def __is_dirty(self, snapshot: Optional[Dict[str, Any]], payload: Dict[str, Any]) -> bool:
+        if snapshot is None or snapshot["payload_hash"] != AuctionCache.payload_hash(payload):
+            return True
+        if self.evaluate and any(snapshot["answers"].get(c) is None for c in self.criteria):
+            return True
+        # Файлы, которые не удалось скачать в прошлый раз
+        return any(
+            str(file["id"]) not in snapshot["files"]
+            for file in payload.get("files", [])
+            if file.get("id")
+        )
+
+    def __process(self, dirty: Dict[str, Any]) -> List[Dict[str, Any]]:
+        # Тяжёлые зависимости обработки нужны только при изменениях
+        from core.processing import LLMProcessingEntity
+
+        auction_ids = list(dirty)
+        payloads = {}
+        known_files = {}
+        for i, auction_id in enumerate(auction_ids):
+            payload, snapshot = dirty[auction_id]
+            payloads[i] = payload
+            if snapshot is not None:
+                known_files[i] = {
+                    file_id: file["parsed"] for file_id, file in snapshot["files"].items()
+                }
+
+        entity = LLMProcessingEntity(
+            [f"{Config.ZAKUPKI_URL}/auction/{auction_id}" for auction_id in auction_ids],
+            self.criteria,
+            cache=self.cache,
+            payloads=payloads,
+            known_files=known_files,
+        )
+        entity.parse()
+
+        snapshots = {}
+        to_evaluate = {}
+        changes = []
+        for i, auction_id in enumerate(auction_ids):
+            payload, previous = dirty[auction_id]
+            previous = previous or {"criteria": {}, "files": {}, "answers": {}}
+            files = {}
+            for j, file in enumerate(payload.get("files", [])):
+                parsed = entity.files_data.get(i, {}).get(j)
+                if file.get("id") and parsed is not None:
+                    files[str(file["id"])] = {"name": file.get("name"), "parsed": parsed}
+            criteria = {
+                c: AuctionCache.payload_hash(entity.criterions_data.get(i, {}).get(c))
+                for c in self.criteria
+            }
+            documents_changed = set(files) != set(previous["files"])
+            changed = [
+                c for c in self.criteria
+                if documents_changed
+                or criteria[c] != previous["criteria"].get(c)
+                or previous["answers"].get(c) is None
+            ]
+            answers = {c: a for c, a in previous["answers"].items() if c in self.criteria}
+            snapshots[auction_id] = {
+                "payload_hash": AuctionCache.payload_hash(payload),
+                "criteria": criteria,
+                "files": files,
+                "answers": answers,
+                "updated_at": time.time(),
+            }
+            if self.evaluate and changed:
+                to_evaluate[i] = changed
+            self.stats["files_parsed"] += len(set(files) - set(previous["files"]))
+            changes.append({
+                "auction_id": auction_id,
+                "files_added": sorted(set(files) - set(previous["files"])),
+                "files_removed": sorted(set(previous["files"]) - set(files)),
+                "criteria": changed,
+                "answers": answers,
+            })
+
+        if to_evaluate:
+            results = entity.evaluate(self.client, criteria=to_evaluate)
+            for i, answers in results.items():
+                snapshots[auction_ids[i]]["answers"].update(answers)
+                self.stats["evaluated"] += len(answers)
+
+        for change in changes:
+            self.store.put(change["auction_id"], snapshots[change["auction_id"]])
+            if self.on_change is not None:
+                self.on_change(change)
+        return changes
+
+
+def create_monitor(watch_list: Iterable[Any], criteria: List[int], **kwargs: Any) -> AuctionMonitor:
+    """
+    Монитор с параметрами из Config; снимки хранятся в Redis, если он доступен.
+    """
+    store = None
+    try:
+        import redis
+
+        client = redis.Redis(
+            host=Config.REDIS_HOST, port=Config.REDIS_PORT, socket_timeout=2, socket_connect_timeout=2
+        )
+        client.ping()
+        store = SnapshotStore(client)
+    except Exception as e:
+        logger.warning(f"Redis is unavailable, monitor snapshots are kept in memory: {e}")
+    cache = None
+    if Config.DOCUMENT_CACHE_ENABLED:
+        cache = DocumentCache(Config.DOCUMENT_CACHE_DIR, Config.DOCUMENT_CACHE_MAX_BYTES)
+    return AuctionMonitor(
+        watch_list,
+        criteria,
+        interval=Config.MONITOR_INTERVAL,
+        concurrency=Config.MONITOR_CONCURRENCY,
+        store=store,
+        cache=cache,
+        evaluate=Config.MONITOR_EVALUATE,
+        **kwargs,
+    )
+
+
+# Запуск из папки app: MONITOR_AUCTIONS=9869562,9864533 python -m core.monitor
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    monitor = create_monitor(
+        [auction for auction in Config.MONITOR_AUCTIONS.split(",") if auction.strip()],
+        [1, 2, 3, 4, 5, 6],
+        on_change=lambda change: logger.info(
+            f"Auction {change['auction_id']}: +{len(change['files_added'])} "
+            f"-{len(change['files_removed'])} files, criteria {change['criteria']}"
+        ),
+    )
+    try:
+        monitor.run()
+    except KeyboardInterrupt:
+        monitor.stop()
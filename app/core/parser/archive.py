@@ -0,0 +1,113 @@
+import os
+import shutil
+import logging
+import tempfile
+import threading
+import subprocess
+import zipfile
+from typing import BinaryIO, Iterator, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+# RAR и 7z распаковывает bsdtar (libarchive-tools), если он установлен
+BSDTAR_PATH = shutil.which("bsdtar")
+# Ограничение времени чтения одной записи архива, секунды
+ARCHIVE_TIMEOUT = 60
+# Флаг ZIP: имя записи в UTF-8; без него Windows пишет кириллицу в cp866
+ZIP_UTF8_FLAG = 0x800
+# В локали C bsdtar экранирует не-ASCII символы имён при выводе списка
+BSDTAR_ENV = {**os.environ, "LC_ALL": "C.UTF-8"}
+
+
+def can_expand(archive_format: str) -> bool:
+    """
+    ZIP читается модулем zipfile, RAR и 7z — только при установленном bsdtar.
+    """
+    return archive_format == "zip" or (archive_format in ("rar", "7z") and BSDTAR_PATH is not None)
+
+
+def iter_members(
+    source: Union[str, BinaryIO], archive_format: str, timeout: float = ARCHIVE_TIMEOUT
+) -> Iterator[Tuple[str, BinaryIO]]:
+    """
+    Записи архива по одной, без распаковки архива целиком.
+
+    Поток записи действителен до перехода к следующей: потребитель читает
+    начало, и если содержимое не нужно, переходит дальше — остаток записи
+    не распаковывается.
+
+    :param source: Путь или бинарный поток архива.
+    :param archive_format: zip, rar или 7z.
+    :return: Пары (имя записи, поток её содержимого); каталоги пропускаются.
+    """
+    if archive_format == "zip":
+        yield from _iter_zip(source)
+    elif can_expand(archive_format):
+        yield from _iter_bsdtar(source, timeout)
+    else:
+        raise ValueError(f"Распаковка {archive_format} недоступна: bsdtar не установлен")
+
+
+def _iter_zip(source: Union[str, BinaryIO]) -> Iterator[Tuple[str, BinaryIO]]:
+    with zipfile.ZipFile(source) as archive:
+        for info in archive.infolist():
+            if info.is_dir():
+                continue
+            name = info.filename
+            if not info.flag_bits & ZIP_UTF8_FLAG:
+                try:
+                    name = name.encode("cp437").decode("cp866")
+                except UnicodeError:
+                    pass
+            if info.flag_bits & 0x1:
+                logger.warning(f"Archive member {name} is encrypted, skipped")
+                continue
+            try:
+                stream = archive.open(info)
+            except (NotImplementedError, zipfile.BadZipFile) as e:
+                logger.warning(f"Archive member {name} is not readable, skipped: {e}")
+                continue
+            with stream:
+                yield name, stream
+
+
+def _iter_bsdtar(source: Union[str, BinaryIO], timeout: float) -> Iterator[Tuple[str, BinaryIO]]:
+    # 7z и RAR читаются с произвольным доступом, поэтому поток сохраняется на диск
+    if not isinstance(source, (str, os.PathLike)):
+        with tempfile.NamedTemporaryFile() as tmp:
+            source.seek(0)
+            shutil.copyfileobj(source, tmp)
+            tmp.flush()
+            yield from _iter_bsdtar(tmp.name, timeout)
+        return
+
+    listing = subprocess.run(
+        [BSDTAR_PATH, "-tf", source],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        timeout=timeout,
+        env=BSDTAR_ENV,
+    )
+    if listing.returncode != 0:
+        raise RuntimeError(f"Ошибка чтения архива: {listing.stderr.decode(errors='replace')}")
+    for member in listing.stdout.splitlines():
+        if not member or member.endswith(b"/"):
+            continue
+        # Имя передаётся байтами как есть: bsdtar сравнивает его с записями архива
+        process = subprocess.Popen(
+            [BSDTAR_PATH, "-xOf", os.fsencode(source), "--", member],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            env=BSDTAR_ENV,
+        )
+        timer = threading.Timer(timeout, process.kill)
+        timer.daemon = True
+        timer.start()
+        try:
+            yield os.fsdecode(member), process.stdout
+        finally:
+            timer.cancel()
+            # Запись прочитана не до конца: распаковка остатка не нужна
+            process.kill()
+            process.stdout.close()
+            process.wait()
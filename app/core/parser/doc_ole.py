@@ -0,0 +1,132 @@
+import struct
+from typing import BinaryIO, Iterator, List, Tuple, Union
+
+import olefile
+
+# Смещения в FIB (File Information Block) документа Word 97-2003
+FIB_IDENT = 0xA5EC
+FIB_WORD97 = 0x00C1
+FIB_FLAGS = 0x0A
+FLAG_ENCRYPTED = 0x0100
+FLAG_TABLE_1 = 0x0200
+FIB_CCP_TEXT = 0x4C
+FIB_FC_CLX = 0x01A2
+# Бит fc в PCD: фрагмент хранится однобайтовым текстом (cp1252) по адресу fc / 2
+FC_COMPRESSED = 0x40000000
+
+# Поля Word: код поля между 0x13 и 0x14 выбрасывается, результат (до 0x15) остаётся
+FIELD_BEGIN, FIELD_SEPARATOR, FIELD_END = "\x13", "\x14", "\x15"
+SPECIAL_CHARS = {
+    "\r": "\n",  # конец абзаца
+    "\x0b": "\n",  # разрыв строки
+    "\x0c": "\n",  # разрыв страницы или раздела
+    "\x07": "\t",  # конец ячейки или строки таблицы
+    "\x1e": "-",  # неразрывный дефис
+    "\x1f": "",  # мягкий перенос
+}
+
+
+def extract_doc_text(source: Union[str, bytes, BinaryIO]) -> str:
+    """
+    Текст основного потока документа Word 97-2003 без внешних утилит (см. iter_doc_paragraphs).
+
+    :param source: Путь, байты или бинарный поток .doc.
+    :return: Текст, абзацы разделены переводом строки.
+    """
+    return "".join(iter_doc_paragraphs(source))
+
+
+def iter_doc_paragraphs(source: Union[str, bytes, BinaryIO]) -> Iterator[str]:
+    """
+    Абзацы основного потока документа Word 97-2003 без внешних утилит.
+
+    Читает составной файл OLE, находит таблицу фрагментов (CLX) через FIB и
+    склеивает фрагменты текста по порядку CP. Колонтитулы, сноски, форматирование
+    и встроенные объекты пропускаются. Разрывы строк внутри абзаца (Shift+Enter)
+    остаются переводами строки в тексте абзаца.
+
+    :param source: Путь, байты или бинарный поток .doc.
+    :return: Абзацы по порядку, каждый с завершающим переводом строки (кроме, возможно, последнего).
+    """
+    with olefile.OleFileIO(source) as ole:
+        if not ole.exists("WordDocument"):
+            raise ValueError("Файл не является документом Word (нет потока WordDocument)")
+        word = ole.openstream("WordDocument").read()
+        ident, n_fib = struct.unpack_from("<HH", word, 0)
+        if ident != FIB_IDENT:
+            raise ValueError("Некорректный заголовок документа Word")
+        if n_fib < FIB_WORD97:
+            raise ValueError("Формат Word 6/95 не поддерживается без antiword")
+        flags = struct.unpack_from("<H", word, FIB_FLAGS)[0]
+        if flags & FLAG_ENCRYPTED:
+            raise ValueError("Документ Word зашифрован")
+
+        table_name = "1Table" if flags & FLAG_TABLE_1 else "0Table"
+        if not ole.exists(table_name):
+            raise ValueError(f"В документе Word нет потока {table_name}")
+        table = ole.openstream(table_name).read()
+
+    ccp_text = struct.unpack_from("<I", word, FIB_CCP_TEXT)[0]
+    fc_clx, lcb_clx = struct.unpack_from("<II", word, FIB_FC_CLX)
+    pieces = _read_pieces(table[fc_clx:fc_clx + lcb_clx])
+
+    parts = []
+    remaining = ccp_text
+    for cp_start, cp_end, fc in pieces:
+        if remaining <= 0:
+            break
+        count = min(cp_end - cp_start, remaining)
+        if fc & FC_COMPRESSED:
+            offset = (fc & ~FC_COMPRESSED) // 2
+            parts.append(word[offset:offset + count].decode("cp1252", errors="replace"))
+        else:
+            parts.append(word[fc:fc + 2 * count].decode("utf-16-le", errors="replace"))
+        remaining -= count
+    yield from _iter_paragraphs("".join(parts))
+
+
+def _read_pieces(clx: bytes) -> List[Tuple[int, int, int]]:
+    """
+    Разбирает CLX: пропускает блоки Prc и возвращает (cp начала, cp конца, fc) фрагментов.
+    """
+    position = 0
+    while position < len(clx) and clx[position] == 0x01:
+        position += 3 + struct.unpack_from("<H", clx, position + 1)[0]
+    if position >= len(clx) or clx[position] != 0x02:
+        raise ValueError("В документе Word не найдена таблица фрагментов текста")
+    size = struct.unpack_from("<I", clx, position + 1)[0]
+    plc = clx[position + 5:position + 5 + size]
+
+    # PlcPcd: n + 1 CP по 4 байта, затем n PCD по 8 байт
+    count = (len(plc) - 4) // 12
+    cps = struct.unpack_from(f"<{count + 1}I", plc, 0)
+    pieces = []
+    for n in range(count):
+        fc = struct.unpack_from("<I", plc, 4 * (count + 1) + 8 * n + 2)[0]
+        pieces.append((cps[n], cps[n + 1], fc))
+    return pieces
+
+
+def _iter_paragraphs(text: str) -> Iterator[str]:
+    result = []
+    # Для каждого открытого поля: видна ли сейчас его часть (код скрыт, результат виден)
+    fields: List[bool] = []
+    for char in text:
+        if char == FIELD_BEGIN:
+            fields.append(False)
+        elif char == FIELD_SEPARATOR:
+            if fields:
+                fields[-1] = True
+        elif char == FIELD_END:
+            if fields:
+                fields.pop()
+        elif all(fields):
+            mapped = SPECIAL_CHARS.get(char, char)
+            if mapped and (mapped >= " " or mapped in "\t\n"):
+                result.append(mapped)
+            # Состояние полей сохраняется: поле может продолжаться в следующем абзаце
+            if char == "\r":
+                yield "".join(result)
+                result = []
+    if result:
+        yield "".join(result)
@@ -1,87 +1,338 @@
 from abc import ABC, abstractmethod
-from typing import List, Any
-import pdfplumber
-import docx
+from typing import TYPE_CHECKING, List, Any, BinaryIO, Dict, Iterable, Iterator, NamedTuple, Optional, Tuple, Union
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+from io import BytesIO
 import subprocess
+import tempfile
+import threading
+import logging
+import asyncio
+import zipfile
+import shutil
+import time
 import os
-from pdfrw import PdfReader, PdfWriter
+import importlib.util
+from functools import lru_cache
 
+from core.config import Config
+from core.metrics import PARSE_PAGES, PARSE_SECONDS
+from core.parser.sniff import SNIFF_BYTES, ooxml_format, sniff_format
 
-class DocumentParserMeta(type(ABC), type):
+logger = logging.getLogger(__name__)
+
+# pdfplumber и python-docx импортируются при первом разборе файла своего типа:
+# модуль можно импортировать ради конвейера, не загружая тяжёлые библиотеки
+if TYPE_CHECKING:
+    import pdfplumber
+
+# Путь к файлу, содержимое в байтах или открытый бинарный поток
+DocumentSource = Union[str, bytes, BinaryIO]
+
+# PDF длиннее этого числа страниц делятся между процессами по диапазонам страниц
+PDF_PAGES_PER_TASK = 50
+# Разделитель страниц PDF в извлечённом тексте (как у pdftotext): по нему
+# хранилище аукционов индексирует текст постранично. Страница без текста даёт
+# пустой участок, поэтому номер участка совпадает с номером запрошенной страницы
+PAGE_BREAK = "\f"
+
+# Вложенные архивы разбираются не глубже ARCHIVE_MAX_DEPTH; записи и архивы
+# больше лимитов распакованного размера пропускаются (защита от zip-бомб)
+ARCHIVE_MAX_DEPTH = 2
+ARCHIVE_MAX_MEMBER_BYTES = 256 * 1024 * 1024
+ARCHIVE_MAX_TOTAL_BYTES = 1024 ** 3
+# Записи архива меньше порога распаковываются в память, большие — во временный файл
+ARCHIVE_SPOOL_BYTES = 8 * 1024 * 1024
+
+
+def open_source(source: DocumentSource) -> Union[str, BinaryIO]:
+    """
+    Приводит источник документа к виду, который принимают pdfplumber и python-docx.
+
+    :param source: Путь, байты или файловый объект.
+    :return: Путь без изменений либо поток, установленный в начало.
+    """
+    if isinstance(source, (str, os.PathLike)):
+        return source
+    if isinstance(source, (bytes, bytearray)):
+        return BytesIO(source)
+    source.seek(0)
+    return source
+
+
+class TextChunk(NamedTuple):
+    """
+    Фрагмент текста документа: страница PDF или абзац DOCX/DOC.
+    index — номер страницы или абзаца с нуля.
+    """
+
+    kind: str
+    index: int
+    text: str
+
+
+class UnsupportedFormatError(ValueError):
     pass
 
 
+class DocumentParserMeta(type(ABC), type):
+    """
+    Реестр парсеров: подкласс DocumentParser с атрибутом formats регистрируется
+    при объявлении, и DocumentParserFactory выбирает его без правок фабрики.
+    Имя формата совпадает с расширением файла, по которому он определяется,
+    если сигнатура содержимого не распознана.
+    """
+
+    registry: Dict[str, "DocumentParserMeta"] = {}
+
+    def __init__(cls, name, bases, namespace):
+        super().__init__(name, bases, namespace)
+        for file_format in namespace.get("formats", ()):
+            DocumentParserMeta.registry[file_format] = cls
+
+
 class DocumentParser(ABC, metaclass=DocumentParserMeta):
+    # Форматы (см. core.parser.sniff), которые разбирает парсер
+    formats: Tuple[str, ...] = ()
+
+    @classmethod
+    def supports(cls, file_format: str) -> bool:
+        """
+        Доступен ли разбор формата в этом окружении (например, установлена ли утилита).
+        """
+        return True
+
     @abstractmethod
-    def parse(self, file_path):
+    def parse(self, file_path: DocumentSource):
         pass
 
+    def iter_chunks(self, file_path: DocumentSource) -> Iterator[TextChunk]:
+        """
+        Отдаёт текст документа по частям по мере извлечения.
+        По умолчанию — весь результат parse одним фрагментом.
+        """
+        result = self.parse(file_path)
+        text = result[0] if isinstance(result, tuple) else result
+        if text:
+            yield TextChunk("document", 0, text)
+
+
+class GeometryGrid:
+    """
+    Равномерная сетка по странице для быстрого поиска объектов по bounding box.
+    Объект попадает во все ячейки, которые пересекает его bbox; запрос возвращает
+    объекты из ячеек, пересекающих bbox запроса (без точной проверки пересечения).
+    """
+
+    def __init__(self, width: float, height: float, cell_size: float = 32.0):
+        self.cell_size = cell_size
+        self.columns = max(1, int(width // cell_size) + 1)
+        self.rows = max(1, int(height // cell_size) + 1)
+        self.cells = {}
+
+    def add(self, bbox: tuple, item: Any) -> None:
+        for cell in self.__cells(bbox):
+            self.cells.setdefault(cell, []).append(item)
+
+    def query(self, bbox: tuple) -> List[Any]:
+        seen = set()
+        found = []
+        for cell in self.__cells(bbox):
+            for item in self.cells.get(cell, ()):
+                if id(item) not in seen:
+                    seen.add(id(item))
+                    found.append(item)
+        return found
+
+    def __cells(self, bbox: tuple):
+        x0, top, x1, bottom = bbox
+        first_column, last_column = self.__clamp(x0, self.columns), self.__clamp(x1, self.columns)
+        first_row, last_row = self.__clamp(top, self.rows), self.__clamp(bottom, self.rows)
+        for column in range(first_column, last_column + 1):
+            for row in range(first_row, last_row + 1):
+                yield column, row
+
+    def __clamp(self, coordinate: float, limit: int) -> int:
+        return min(max(int(coordinate // self.cell_size), 0), limit - 1)
+
 
 class PDFParser(DocumentParser):
-    def parse(self, file_path: str) -> str:
+    formats = ("pdf",)
+
+    def __init__(self):
+        # Сколько страниц разобрано этим экземпляром (для метрик)
+        self.pages_parsed = 0
+
+    def parse(self, file_path: DocumentSource) -> str:
         """
         Извлекает текст из PDF-файла без изменения ориентации.
 
-        :param file_path: Путь к PDF-файлу.
+        :param file_path: Путь к PDF-файлу, его байты или бинарный поток.
         :return: Извлечённый текст из PDF.
         """
-        text = ""
-        input_pdf = PdfReader(file_path)
-        output_pdf = PdfWriter()
+        text = self.extract_pages(file_path)
+
+        return (text, "parsed without rotation")
+
+    def page_count(self, file_path: DocumentSource) -> int:
+        """
+        Возвращает число страниц PDF без разбора их содержимого.
+        """
+        import pdfplumber
 
-        for i in range(0, len(input_pdf.pages) - 1):
-            page = input_pdf.pages[i]
-            next_page = input_pdf.pages[i + 1]
+        with pdfplumber.open(open_source(file_path)) as pdf:
+            return len(pdf.pages)
 
-            # Проверяем угол поворота next and curr
-            if int(next_page.inheritable.Rotate) == 90:
-                if int(page.inheritable.Rotate) == 0:
-                    page.Rotate = 90
-                    print("Страница с 0 поворота перед 90 повёрнута на 90.")
+    def extract_pages(
+        self,
+        file_path: DocumentSource,
+        first: int = 0,
+        last: Optional[int] = None,
+        pages: Optional[Iterable[int]] = None,
+    ) -> str:
+        """
+        Извлекает текст страниц PDF из диапазона [first, last).
+        Страница с 0 поворота перед страницей с поворотом 90 читается повёрнутой на 90,
+        документ при этом не переписывается.
 
-            output_pdf.addpage(input_pdf.pages[i])
+        :param file_path: Путь к PDF-файлу, его байты или бинарный поток.
+        :param first: Номер первой страницы (с нуля).
+        :param last: Номер страницы после последней; None — до конца документа.
+        :param pages: Номера отдельных страниц (с нуля) вместо диапазона.
+        :return: Текст страниц диапазона через PAGE_BREAK.
+        """
+        return PAGE_BREAK.join(
+            chunk.text for chunk in self.iter_pages(file_path, first, last, pages, keep_empty=True)
+        )
 
-        # Добавляем все остальные страницы без изменений
-        for j in range(i, len(input_pdf.pages)):
-            output_pdf.addpage(input_pdf.pages[j])
+    def iter_chunks(self, file_path: DocumentSource) -> Iterator[TextChunk]:
+        return self.iter_pages(file_path)
 
-        # Записываем результат
-        output_pdf.write(file_path)
+    def iter_pages(
+        self,
+        file_path: DocumentSource,
+        first: int = 0,
+        last: Optional[int] = None,
+        pages: Optional[Iterable[int]] = None,
+        keep_empty: bool = False,
+    ) -> Iterator[TextChunk]:
+        """
+        Отдаёт текст страниц из диапазона [first, last) по одной, как extract_pages.
+        Кэш объектов страницы сбрасывается сразу после её разбора, поэтому память
+        не растёт с числом страниц. Страницы без текста пропускаются, если не задан keep_empty.
+        """
+        import pdfplumber
 
-        with pdfplumber.open(file_path) as pdf:
-            for page in pdf.pages:
+        with pdfplumber.open(open_source(file_path)) as pdf:
+            all_pages = pdf.pages
+            for index in self.__page_numbers(len(all_pages), first, last, pages):
+                page = self.__normalized_page(all_pages, index)
                 page_text = page.extract_text()
+                page.close()
+                all_pages[index].close()
+                self.pages_parsed += 1
                 if page_text:
-                    text += page_text + "\n"
+                    yield TextChunk("page", index, page_text + "\n")
+                elif keep_empty:
+                    yield TextChunk("page", index, "")
 
-        return (text, "parsed without rotation")
+    def __page_numbers(
+        self, total: int, first: int, last: Optional[int], pages: Optional[Iterable[int]]
+    ) -> List[int]:
+        """
+        Номера страниц для разбора: явный список pages или диапазон [first, last).
+        """
+        if pages is not None:
+            return sorted(index for index in set(pages) if 0 <= index < total)
+        last = total if last is None else min(last, total)
+        return list(range(first, last))
+
+    def __normalized_page(
+        self, pages: List["pdfplumber.page.Page"], index: int
+    ) -> "pdfplumber.page.Page":
+        """
+        Возвращает страницу, при необходимости повёрнутую по соседней странице.
+        Поворот выставляется только для этой страницы перед разбором её содержимого.
 
-    def parse_with_rotation(self, file_path: str) -> str:
+        :param pages: Все страницы документа (по исходным углам поворота).
+        :param index: Номер страницы.
+        :return: Исходная или повёрнутая страница.
+        """
+        page = pages[index]
+        if index + 1 >= len(pages):
+            return page
+
+        # Проверяем угол поворота next and curr
+        if pages[index + 1].rotation == 90 and page.rotation == 0:
+            logger.debug("Страница с 0 поворота перед 90 повёрнута на 90.")
+            page.page_obj.attrs["Rotate"] = 90
+            page.page_obj.rotate = 90
+            from pdfplumber.page import Page
+
+            return Page(
+                page.pdf,
+                page.page_obj,
+                page_number=page.page_number,
+                initial_doctop=page.initial_doctop,
+            )
+        return page
+
+    def parse_with_rotation(
+        self,
+        file_path: DocumentSource,
+        first: int = 0,
+        last: Optional[int] = None,
+        pages: Optional[Iterable[int]] = None,
+    ) -> str:
         """
         Извлекает текст из PDF-файла, удаляет таблицы из общего текста и добавляет только перевёрнутые таблицы.
         Предполагается, что таблицы могут быть перевёрнуты, но страница остаётся вертикальной.
 
-        :param file_path: Путь к PDF-файлу.
+        :param file_path: Путь к PDF-файлу, его байты или бинарный поток.
+        :param first: Номер первой страницы (с нуля).
+        :param last: Номер страницы после последней; None — до конца документа.
+        :param pages: Номера отдельных страниц (с нуля) вместо диапазона.
         :return: Извлечённый текст из PDF с только перевёрнутыми таблицами.
         """
-        extracted_text = ""
-        with pdfplumber.open(file_path) as pdf:
-            for page in pdf.pages:
-                # Извлечение таблиц и их bounding boxes
-                tables = page.extract_tables()
-                table_bboxes = []
+        extracted_text = PAGE_BREAK.join(
+            chunk.text
+            for chunk in self.iter_pages_with_rotation(file_path, first, last, pages, keep_empty=True)
+        )
+        return (extracted_text, "parsed_with_rotation")
+
+    def iter_pages_with_rotation(
+        self,
+        file_path: DocumentSource,
+        first: int = 0,
+        last: Optional[int] = None,
+        pages: Optional[Iterable[int]] = None,
+        keep_empty: bool = False,
+    ) -> Iterator[TextChunk]:
+        """
+        Постраничный вариант parse_with_rotation: текст страницы без таблиц,
+        за ним перевёрнутые таблицы этой страницы.
+        """
+        import pdfplumber
+
+        with pdfplumber.open(open_source(file_path)) as pdf:
+            for index in self.__page_numbers(len(pdf.pages), first, last, pages):
+                page = pdf.pages[index]
+                # Символы страницы раскладываются по сетке один раз на страницу
+                chars_grid = GeometryGrid(page.width, page.height)
+                for char in page.chars:
+                    chars_grid.add((char["x0"], char["top"], char["x0"], char["top"]), char)
+
+                # Таблицы и их bounding boxes берутся из разметки pdfplumber
+                tables_grid = GeometryGrid(page.width, page.height)
                 rotated_tables_text = ""
 
-                for table in tables:
-                    if self.__is_table_rotated(page, table):
-                        rotated_table = self.__rotate_table_data(table)
+                for table in page.find_tables():
+                    if self.__is_table_rotated(chars_grid, table.bbox):
+                        rotated_table = self.__rotate_table_data(table.extract())
                         table_text = self.__convert_table_to_text(rotated_table)
                         rotated_tables_text += table_text + "\n"
 
-                        # Получение bounding box таблицы для удаления её из общего текста
-                        table_bbox = self.__get_table_bbox(page, table)
-                        if table_bbox:
-                            table_bboxes.append(table_bbox)
+                        # Запоминаем bounding box таблицы для удаления её из общего текста
+                        tables_grid.add(table.bbox, table.bbox)
 
                 # Извлечение слов на странице
                 words = page.extract_words()
@@ -93,22 +344,24 @@ class PDFParser(DocumentParser):
                         float(word["x1"]),
                         float(word["bottom"]),
                     )
-                    # Проверка, находится ли слово вне любых таблиц
+                    # Проверка, находится ли слово вне любых таблиц (только таблицы из соседних ячеек сетки)
                     if not any(
                         self.__is_bbox_overlap(word_bbox, table_bbox)
-                        for table_bbox in table_bboxes
+                        for table_bbox in tables_grid.query(word_bbox)
                     ):
                         page_text += word["text"] + " "
 
-                # Добавление текста страницы без таблиц
-                if page_text.strip():
-                    extracted_text += page_text.strip() + "\n"
-
-                # Добавление перевёрнутых таблиц
-                if rotated_tables_text.strip():
-                    extracted_text += rotated_tables_text.strip() + "\n"
+                page.close()
+                self.pages_parsed += 1
 
-        return (extracted_text, "parsed_with_rotation")
+                # Текст страницы без таблиц, затем перевёрнутые таблицы
+                parts = [
+                    part.strip() + "\n"
+                    for part in (page_text, rotated_tables_text)
+                    if part.strip()
+                ]
+                if parts or keep_empty:
+                    yield TextChunk("page", index, "".join(parts))
 
     def __is_bbox_overlap(self, bbox1: tuple, bbox2: tuple) -> bool:
         """
@@ -128,61 +381,23 @@ class PDFParser(DocumentParser):
             return False
         return True
 
-    def __get_table_bbox(
-        self, page: pdfplumber.page.Page, table: List[List[Any]]
-    ) -> tuple:
-        """
-        Определяет bounding box таблицы на основе расположения ячеек.
-
-        :param page: Объект страницы из pdfplumber.
-        :param table: Таблица в виде списка списков.
-        :return: Bounding box в виде (x0, top, x1, bottom).
-        """
-        x0, top, x1, bottom = float("inf"), float("inf"), 0, 0
-
-        for row in table:
-            for cell in row:
-                if not cell:
-                    continue
-                # Поиск всех символов, принадлежащих ячейке
-                cell_chars = [
-                    char
-                    for char in page.chars
-                    if char["text"].strip() and char["text"].strip() in cell
-                ]
-                for char in cell_chars:
-                    x0 = min(x0, char["x0"])
-                    top = min(top, char["top"])
-                    x1 = max(x1, char["x1"])
-                    bottom = max(bottom, char["bottom"])
-
-        if x0 == float("inf") or top == float("inf"):
-            return None
-
-        return (x0, top, x1, bottom)
-
-    def __is_table_rotated(
-        self, page: pdfplumber.page.Page, table: List[List[Any]]
-    ) -> bool:
+    def __is_table_rotated(self, chars_grid: "GeometryGrid", table_bbox: tuple) -> bool:
         """
         Определяет, перевёрнута ли таблица на основе ориентации текста в ячейках.
         Предполагается, что перевёрнутые таблицы имеют большинство ячеек с поворотом текста на 90 или 270 градусов.
 
-        :param page: Объект страницы из pdfplumber.
-        :param table: Таблица в виде списка списков.
+        :param chars_grid: Сетка символов страницы.
+        :param table_bbox: Bounding box таблицы в виде (x0, top, x1, bottom).
         :return: True, если таблица перевёрнута, иначе False.
         """
-        if not table:
-            return False
-
-        # Получение bounding box таблицы на основе координат ячеек
-        table_bbox = self.__get_table_bbox(page, table)
         if not table_bbox:
             return False
 
         # Извлечение символов внутри bounding box таблицы
         table_chars = [
-            char for char in page.chars if self.__is_char_in_bbox(char, table_bbox)
+            char
+            for char in chars_grid.query(table_bbox)
+            if self.__is_char_in_bbox(char, table_bbox)
         ]
 
         if not table_chars:
@@ -200,39 +415,6 @@ class PDFParser(DocumentParser):
         # Определение перевёрнутости таблицы по порогу (например, более 30% символов перевёрнуты)
         return rotated_ratio > 0.3
 
-    def __get_table_bbox(
-        self, page: pdfplumber.page.Page, table: List[List[Any]]
-    ) -> tuple:
-        """
-        Определяет bounding box таблицы на основе расположения ячеек.
-
-        :param page: Объект страницы из pdfplumber.
-        :param table: Таблица в виде списка списков.
-        :return: Bounding box в виде (x0, top, x1, bottom).
-        """
-        x0, top, x1, bottom = float("inf"), float("inf"), 0, 0
-
-        for row in table:
-            for cell in row:
-                if not cell:
-                    continue
-                # Поиск всех символов, принадлежащих ячейке
-                cell_chars = [
-                    char
-                    for char in page.chars
-                    if char["text"].strip() and char["text"].strip() in cell
-                ]
-                for char in cell_chars:
-                    x0 = min(x0, char["x0"])
-                    top = min(top, char["top"])
-                    x1 = max(x1, char["x1"])
-                    bottom = max(bottom, char["bottom"])
-
-        if x0 == float("inf") or top == float("inf"):
-            return None
-
-        return (x0, top, x1, bottom)
-
     def __is_char_in_bbox(self, char: dict, bbox: tuple) -> bool:
         """
         Проверяет, находится ли символ внутри заданного bounding box.
@@ -286,43 +468,738 @@ class PDFParser(DocumentParser):
 
 
 class DOCXParser(DocumentParser):
-    def parse(self, file_path):
-        text = ""
-        doc = docx.Document(file_path)
-        for paragraph in doc.paragraphs:
-            text += paragraph.text + "\n"
-        return text
+    formats = ("docx",)
+
+    def parse(self, file_path: DocumentSource):
+        return "".join(chunk.text for chunk in self.iter_chunks(file_path))
+
+    def iter_chunks(self, file_path: DocumentSource) -> Iterator[TextChunk]:
+        """
+        Отдаёт абзацы документа по одному (включая пустые, как parse).
+        """
+        import docx
+
+        doc = docx.Document(open_source(file_path))
+        for index, paragraph in enumerate(doc.paragraphs):
+            yield TextChunk("paragraph", index, paragraph.text + "\n")
 
 
 class DOCParser(DocumentParser):
-    def parse(self, file_path):
-        # Проверяем, установлена ли утилита antiword
-        if not os.system("which antiword > /dev/null 2>&1") == 0:
-            raise EnvironmentError(
-                "Утилита 'antiword' не установлена. Установите её для парсинга DOC-файлов."
-            )
+    formats = ("doc",)
+
+    def __init__(self, timeout: Optional[float] = None):
+        self.timeout = timeout if timeout is not None else Config.DOC_TIMEOUT
+
+    @classmethod
+    def supports(cls, file_format: str) -> bool:
+        """
+        DOC разбирается antiword, без него — чтением OLE, для которого нужен olefile.
+        """
+        return Config.ANTIWORD_PATH is not None or has_olefile()
+
+    def parse(self, file_path: DocumentSource):
+        if Config.ANTIWORD_PATH is None:
+            return self.__parse_ole(file_path)
+
+        # antiword читает только файлы на диске
+        if not isinstance(file_path, (str, os.PathLike)):
+            with tempfile.NamedTemporaryFile(suffix=".doc") as tmp:
+                shutil.copyfileobj(open_source(file_path), tmp)
+                tmp.flush()
+                return self.parse(tmp.name)
 
         # Используем antiword для извлечения текста из DOC
-        result = subprocess.run(
-            ["antiword", file_path], stdout=subprocess.PIPE, stderr=subprocess.PIPE
-        )
+        try:
+            result = subprocess.run(
+                [Config.ANTIWORD_PATH, file_path],
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                timeout=self.timeout,
+            )
+        except subprocess.TimeoutExpired:
+            raise TimeoutError(f"antiword не завершился за {self.timeout} с: {file_path}")
         if result.returncode != 0:
             raise RuntimeError(f"Ошибка при обработке файла: {result.stderr.decode()}")
 
         return result.stdout.decode()
 
+    def iter_chunks(self, file_path: DocumentSource) -> Iterator[TextChunk]:
+        """
+        Отдаёт абзацы по мере вывода antiword (абзацы разделены пустой строкой),
+        без antiword — абзацы документа из чтения OLE.
+        """
+        if Config.ANTIWORD_PATH is None:
+            from core.parser.doc_ole import iter_doc_paragraphs
+
+            for index, paragraph in enumerate(iter_doc_paragraphs(open_source(file_path))):
+                yield TextChunk("paragraph", index, paragraph)
+            return
+
+        if not isinstance(file_path, (str, os.PathLike)):
+            with tempfile.NamedTemporaryFile(suffix=".doc") as tmp:
+                shutil.copyfileobj(open_source(file_path), tmp)
+                tmp.flush()
+                yield from self.iter_chunks(tmp.name)
+            return
+
+        process = subprocess.Popen(
+            [Config.ANTIWORD_PATH, file_path], stdout=subprocess.PIPE, stderr=subprocess.PIPE
+        )
+        index = 0
+        paragraph = []
+        completed = False
+        try:
+            for line in process.stdout:
+                paragraph.append(line.decode())
+                if not line.strip():
+                    yield TextChunk("paragraph", index, "".join(paragraph))
+                    index += 1
+                    paragraph = []
+            completed = True
+        finally:
+            # Потребитель остановился раньше: antiword больше не нужен
+            if not completed:
+                process.kill()
+            process.stdout.close()
+            stderr = process.stderr.read()
+            process.stderr.close()
+            returncode = process.wait()
+
+        if returncode != 0:
+            raise RuntimeError(f"Ошибка при обработке файла: {stderr.decode()}")
+        if paragraph:
+            yield TextChunk("paragraph", index, "".join(paragraph))
+
+    @staticmethod
+    def __parse_ole(file_path: DocumentSource) -> str:
+        from core.parser.doc_ole import extract_doc_text
+
+        return extract_doc_text(open_source(file_path))
+
+
+class RTFParser(DocumentParser):
+    formats = ("rtf",)
+
+    def parse(self, file_path: DocumentSource):
+        from core.parser.rtf import extract_rtf_text
+
+        return extract_rtf_text(open_source(file_path))
+
+
+class XLSXParser(DocumentParser):
+    formats = ("xlsx",)
+
+    def parse(self, file_path: DocumentSource):
+        return "".join(chunk.text for chunk in self.iter_chunks(file_path))
+
+    def iter_chunks(self, file_path: DocumentSource) -> Iterator[TextChunk]:
+        """
+        Отдаёт листы книги по одному: имя листа и строки с ячейками через табуляцию.
+        """
+        from core.parser.xlsx import iter_xlsx_sheets
+
+        for index, (name, rows) in enumerate(iter_xlsx_sheets(open_source(file_path))):
+            lines = [f"Лист: {name}\n"] + ["\t".join(row) + "\n" for row in rows if row]
+            yield TextChunk("sheet", index, "".join(lines))
+
+
+class ArchiveParser(DocumentParser):
+    """
+    Документы из архивов ZIP, RAR и 7z.
+
+    Записи читаются по одной: формат определяется по первым байтам, и запись
+    без подходящего парсера пропускается, не распаковываясь дальше. Текст
+    каждого разобранного документа идёт под заголовком с именем записи.
+    """
+
+    formats = ("zip", "rar", "7z")
+
+    def __init__(
+        self,
+        criteria: Optional[List[int]] = None,
+        depth: int = 0,
+        max_member_bytes: int = ARCHIVE_MAX_MEMBER_BYTES,
+        max_total_bytes: int = ARCHIVE_MAX_TOTAL_BYTES,
+    ):
+        self.criteria = criteria
+        self.depth = depth
+        self.max_member_bytes = max_member_bytes
+        self.max_total_bytes = max_total_bytes
+        # Страницы PDF из записей архива (для метрик) и пропущенные записи
+        self.pages_parsed = 0
+        self.skipped: List[str] = []
+
+    @classmethod
+    def supports(cls, file_format: str) -> bool:
+        from core.parser.archive import can_expand
+
+        return can_expand(file_format)
+
+    def parse(self, file_path: DocumentSource):
+        return "".join(chunk.text for chunk in self.iter_chunks(file_path))
+
+    def iter_chunks(self, file_path: DocumentSource) -> Iterator[TextChunk]:
+        """
+        Отдаёт документы архива по одному в порядке записей.
+        """
+        from unidecode import unidecode
+
+        from core.parser.archive import iter_members
+
+        archive_format = DocumentParserFactory.detect_format("", file_path)
+        unpacked = 0
+        index = 0
+        for name, stream in iter_members(open_source(file_path), archive_format):
+            head = stream.read(SNIFF_BYTES)
+            file_format = DocumentParserFactory.sniff(name, head)
+            if not DocumentParserFactory.is_supported(file_format):
+                self.__skip(name, f"unsupported format {file_format or 'unknown'}")
+                continue
+            if file_format in self.formats and self.depth + 1 >= ARCHIVE_MAX_DEPTH:
+                self.__skip(name, "nested too deep")
+                continue
+
+            with tempfile.SpooledTemporaryFile(max_size=ARCHIVE_SPOOL_BYTES) as member:
+                size = len(head)
+                member.write(head)
+                while size <= self.max_member_bytes and unpacked + size <= self.max_total_bytes:
+                    block = stream.read(1024 * 1024)
+                    if not block:
+                        break
+                    size += len(block)
+                    member.write(block)
+                unpacked += size
+                if size > self.max_member_bytes or unpacked > self.max_total_bytes:
+                    self.__skip(name, "size limit exceeded")
+                    if unpacked > self.max_total_bytes:
+                        break
+                    continue
+
+                try:
+                    # Начала файла мало, чтобы отличить DOCX/XLSX от обычного ZIP
+                    file_format = DocumentParserFactory.detect_format(name, member)
+                    # PDF контракта узнаётся по транслитерированному имени, как у скачанных файлов
+                    result, pages, _ = DocumentParserFactory.parse_measured(
+                        unidecode(name),
+                        False,
+                        member,
+                        self.criteria,
+                        file_format=file_format,
+                        depth=self.depth + 1,
+                    )
+                except Exception as e:
+                    self.__skip(name, str(e))
+                    continue
+            self.pages_parsed += pages
+            text = result[0] if isinstance(result, tuple) else result
+            if text:
+                yield TextChunk("document", index, f"=== {name} ===\n{text}\n")
+                index += 1
+
+    def __skip(self, name: str, reason: str) -> None:
+        self.skipped.append(name)
+        logger.info(f"Archive member {name} skipped: {reason}")
+
+
+class DocConverterPool:
+    """
+    Конвертация DOC через antiword в asyncio-подпроцессах.
+
+    Event loop работает в отдельном потоке: одновременно запущено не больше
+    max_concurrency процессов antiword, каждый ограничен timeout секундами
+    (по истечении процесс убивается). Процессы пула парсинга при этом не
+    простаивают в ожидании antiword.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: Optional[int] = None,
+        timeout: Optional[float] = None,
+        antiword: Optional[str] = None,
+    ):
+        self.antiword = antiword or Config.ANTIWORD_PATH
+        if self.antiword is None:
+            raise EnvironmentError("Утилита 'antiword' не установлена.")
+        self.max_concurrency = max_concurrency or os.cpu_count() or 1
+        self.timeout = timeout if timeout is not None else Config.DOC_TIMEOUT
+        self._loop = asyncio.new_event_loop()
+        self._semaphore = None
+        self._thread = threading.Thread(
+            target=self._loop.run_forever, name="doc-converter", daemon=True
+        )
+        self._thread.start()
+
+    def submit(self, source: DocumentSource) -> "Future[str]":
+        """
+        Ставит файл в очередь конвертации.
+
+        :param source: Путь, байты или поток .doc.
+        :return: Future с текстом документа.
+        """
+        tmp_path = None
+        if not isinstance(source, (str, os.PathLike)):
+            with tempfile.NamedTemporaryFile(suffix=".doc", delete=False) as tmp:
+                shutil.copyfileobj(open_source(source), tmp)
+            source = tmp_path = tmp.name
+        return asyncio.run_coroutine_threadsafe(self.__convert(source, tmp_path), self._loop)
+
+    def convert(self, source: DocumentSource) -> str:
+        return self.submit(source).result()
+
+    def close(self) -> None:
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+
+    async def __convert(self, file_path: str, tmp_path: Optional[str]) -> str:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        try:
+            async with self._semaphore:
+                process = await asyncio.create_subprocess_exec(
+                    self.antiword,
+                    file_path,
+                    stdout=asyncio.subprocess.PIPE,
+                    stderr=asyncio.subprocess.PIPE,
+                )
+                started = time.perf_counter()
+                try:
+                    stdout, stderr = await asyncio.wait_for(process.communicate(), self.timeout)
+                except asyncio.TimeoutError:
+                    process.kill()
+                    await process.wait()
+                    raise TimeoutError(f"antiword не завершился за {self.timeout} с: {file_path}")
+                finally:
+                    PARSE_SECONDS.labels("doc").observe(time.perf_counter() - started)
+        finally:
+            if tmp_path is not None:
+                os.remove(tmp_path)
+        if process.returncode != 0:
+            raise RuntimeError(f"Ошибка при обработке файла: {stderr.decode()}")
+        return stdout.decode()
+
+
+_doc_pool = None
+_doc_pool_lock = threading.Lock()
+
+
+def get_doc_pool() -> Optional[DocConverterPool]:
+    """
+    Общий пул конвертации DOC процесса; None, если antiword не установлен.
+    """
+    global _doc_pool
+    if Config.ANTIWORD_PATH is None:
+        return None
+    with _doc_pool_lock:
+        if _doc_pool is None:
+            _doc_pool = DocConverterPool()
+    return _doc_pool
+
+
+@lru_cache(maxsize=1)
+def has_olefile() -> bool:
+    return importlib.util.find_spec("olefile") is not None
+
+
+def warm_up() -> None:
+    """
+    Инициализатор процессов пула парсинга: импортирует библиотеки разбора заранее,
+    чтобы первый файл каждого воркера не платил за их загрузку.
+    """
+    import pdfplumber  # noqa: F401
+    import pdfminer.layout  # noqa: F401
+    import docx  # noqa: F401
+    from core.parser import archive, rtf, xlsx  # noqa: F401
+    # Разбор DOC без antiword; без olefile недоступен только он (DOCParser.supports)
+    if Config.ANTIWORD_PATH is None and has_olefile():
+        from core.parser import doc_ole  # noqa: F401
+    from core.parser import section_locator
+
+    section_locator.text_collector()
+
+
+def _noop() -> None:
+    pass
+
+
+_parse_executor = None
+_parse_executor_lock = threading.Lock()
+
+
+def get_parse_executor(max_workers: int, prewarm: bool = True) -> ProcessPoolExecutor:
+    """
+    Общий пул процессов парсинга, создаётся один раз на процесс приложения.
+
+    Процессы ProcessPoolExecutor стартуют лениво; при prewarm пул сразу получает
+    max_workers пустых задач, и все воркеры поднимаются и выполняют warm_up
+    до первого реального файла. Сломанный пул (упавший воркер) пересоздаётся.
+    """
+    global _parse_executor
+    with _parse_executor_lock:
+        executor = _parse_executor
+        if executor is None or executor._broken or executor._max_workers != max_workers:
+            if executor is not None:
+                executor.shutdown(wait=False)
+            executor = _parse_executor = ProcessPoolExecutor(
+                max_workers=max_workers, initializer=warm_up
+            )
+            if prewarm:
+                for future in [executor.submit(_noop) for _ in range(max_workers)]:
+                    future.result()
+    return executor
+
+
+def shutdown_parse_executor() -> None:
+    """
+    Останавливает общий пул парсинга при завершении приложения.
+    """
+    global _parse_executor
+    with _parse_executor_lock:
+        if _parse_executor is not None:
+            _parse_executor.shutdown()
+            _parse_executor = None
+
 
 class DocumentParserFactory:
     @staticmethod
-    def parser_file(file_path: str, is_contract: bool):
-        if file_path.lower().endswith(".pdf") and "kontrakt" in file_path.lower():
-            # return PDFParser().parse_with_rotation(file_path)
-            return PDFParser().parse(file_path)
-        elif file_path.lower().endswith(".pdf"):
-            return PDFParser().parse(file_path)
-        elif file_path.lower().endswith(".docx"):
-            return DOCXParser().parse(file_path)
-        elif file_path.lower().endswith(".doc"):
-            return DOCParser().parse(file_path)
+    def parser_file(
+        file_path: str,
+        is_contract: bool,
+        source: DocumentSource = None,
+        criteria: Optional[List[int]] = None,
+        file_format: Optional[str] = None,
+    ):
+        """
+        Определяет формат по содержимому, выбирает парсер из реестра и извлекает текст.
+
+        :param file_path: Путь или имя файла (расширение — запасной признак формата).
+        :param is_contract: Является ли файл контрактом.
+        :param source: Содержимое файла (байты или поток); если не задано, читается file_path.
+        :param criteria: Номера критериев; если заданы, из PDF извлекаются только
+            относящиеся к ним страницы (см. SectionLocator).
+        :param file_format: Уже определённый формат (detect_format).
+        :return: Результат парсинга.
+        :raises UnsupportedFormatError: Для формата нет доступного парсера.
+        """
+        if file_format is None:
+            file_format = DocumentParserFactory.detect_format(file_path, source)
+        result, pages, seconds = DocumentParserFactory.parse_measured(
+            file_path, is_contract, source, criteria, file_format
+        )
+        observe_parse(file_format, seconds, pages)
+        return result
+
+    @staticmethod
+    def parse_measured(
+        file_path: str,
+        is_contract: bool,
+        source: DocumentSource = None,
+        criteria: Optional[List[int]] = None,
+        file_format: Optional[str] = None,
+        depth: int = 0,
+    ) -> Tuple[Any, int, float]:
+        """
+        parser_file без записи метрик: результат, число разобранных страниц PDF
+        и время разбора. Метрики записывает процесс, получивший замер (observe_parse).
+        depth — вложенность при разборе записей архива.
+        """
+        started = time.perf_counter()
+        if source is None:
+            source = file_path
+        if file_format is None:
+            file_format = DocumentParserFactory.detect_format(file_path, source)
+        parser_class = DocumentParserFactory.parser_class(file_path, file_format)
+        if issubclass(parser_class, PDFParser):
+            parser = parser_class()
+            pages = None
+            if criteria:
+                pages = DocumentParserFactory.locate_pages(source, criteria)
+            if DocumentParserFactory.is_contract_pdf(file_path, file_format):
+                result = parser.parse_with_rotation(source, pages=pages)
+            else:
+                result = (parser.extract_pages(source, pages=pages), "parsed without rotation")
+        elif issubclass(parser_class, ArchiveParser):
+            parser = parser_class(criteria, depth)
+            result = parser.parse(source)
         else:
-            raise ValueError(f"Unsupported file extension: {file_path}")
+            parser = parser_class()
+            result = parser.parse(source)
+        return result, getattr(parser, "pages_parsed", 0), time.perf_counter() - started
+
+    @staticmethod
+    def iter_file(
+        file_path: str, is_contract: bool, source: DocumentSource = None
+    ) -> Iterator[TextChunk]:
+        """
+        Потоковый вариант parser_file: фрагменты текста (страницы, абзацы) по мере извлечения.
+        Выбор парсера тот же, что в parser_file; ошибка формата возникает сразу.
+
+        :param file_path: Путь или имя файла (расширение — запасной признак формата).
+        :param is_contract: Является ли файл контрактом.
+        :param source: Содержимое файла (байты или поток); если не задано, читается file_path.
+        :return: Итератор TextChunk в порядке документа.
+        """
+        if source is None:
+            source = file_path
+        file_format = DocumentParserFactory.detect_format(file_path, source)
+        parser_class = DocumentParserFactory.parser_class(file_path, file_format)
+        if DocumentParserFactory.is_contract_pdf(file_path, file_format):
+            return parser_class().iter_pages_with_rotation(source)
+        elif issubclass(parser_class, PDFParser):
+            return parser_class().iter_pages(source)
+        return parser_class().iter_chunks(source)
+
+    @staticmethod
+    def sniff(file_path: str, head: bytes) -> Optional[str]:
+        """
+        Формат по началу файла, например полученному запросом Range до скачивания.
+        Если сигнатура не распознана, формат берётся из расширения.
+        """
+        file_format = sniff_format(head, file_path)
+        extension = os.path.splitext(file_path)[1].lower().lstrip(".")
+        if file_format is None and extension in DocumentParserMeta.registry:
+            return extension
+        # Начало DOCX/XLSX с крупной первой записью неотличимо от обычного ZIP
+        if file_format == "zip" and extension in ("docx", "xlsx", "pptx"):
+            return extension
+        return file_format
+
+    @staticmethod
+    def detect_format(file_path: str, source: DocumentSource = None) -> Optional[str]:
+        """
+        Формат файла по содержимому (см. sniff); ZIP уточняется по списку записей:
+        DOCX, XLSX или архив.
+        """
+        if source is None:
+            source = file_path
+        stream = open_source(source)
+        if isinstance(stream, (str, os.PathLike)):
+            with open(stream, "rb") as f:
+                head = f.read(SNIFF_BYTES)
+        else:
+            head = stream.read(SNIFF_BYTES)
+            stream.seek(0)
+        file_format = DocumentParserFactory.sniff(file_path, head)
+        if file_format == "zip":
+            try:
+                with zipfile.ZipFile(open_source(source)) as archive:
+                    file_format = ooxml_format(archive.namelist())
+            except zipfile.BadZipFile:
+                pass
+            if not isinstance(stream, (str, os.PathLike)):
+                stream.seek(0)
+        return file_format
+
+    @staticmethod
+    def is_supported(file_format: Optional[str]) -> bool:
+        parser_class = DocumentParserMeta.registry.get(file_format)
+        return parser_class is not None and parser_class.supports(file_format)
+
+    @staticmethod
+    def parser_class(file_path: str, file_format: Optional[str]) -> DocumentParserMeta:
+        if not DocumentParserFactory.is_supported(file_format):
+            raise UnsupportedFormatError(
+                f"Unsupported file format {file_format or 'unknown'}: {file_path}"
+            )
+        return DocumentParserMeta.registry[file_format]
+
+    @staticmethod
+    def locate_pages(source: DocumentSource, criteria: List[int]) -> Optional[List[int]]:
+        """
+        Страницы PDF, относящиеся к критериям; None — разбирать документ целиком.
+        """
+        from core.parser.section_locator import SectionLocator
+
+        return SectionLocator(criteria).locate(source)
+
+    @staticmethod
+    def is_contract_pdf(file_path: str, file_format: Optional[str] = None) -> bool:
+        """
+        PDF контракта парсится с поиском перевёрнутых таблиц спецификаций.
+        Без file_format формат берётся из расширения.
+        """
+        if file_format is None:
+            file_format = os.path.splitext(file_path)[1].lower().lstrip(".")
+        return file_format == "pdf" and "kontrakt" in file_path.lower()
+
+    @staticmethod
+    def parse_files(
+        files: List[Tuple[str, bool, DocumentSource]],
+        max_workers: Optional[int] = None,
+        pages_per_task: int = PDF_PAGES_PER_TASK,
+        executor: Optional[Executor] = None,
+        criteria: Optional[List[int]] = None,
+    ) -> List[Any]:
+        """
+        Параллельно парсит несколько файлов.
+
+        :param files: Список (имя файла, is_contract, содержимое).
+        :param max_workers: Размер пула процессов; None — по числу ядер.
+        :param pages_per_task: Сколько страниц большого PDF обрабатывает одна задача.
+        :param executor: Готовый пул; если не задан, создаётся на время вызова.
+        :param criteria: Извлекать из PDF только страницы этих критериев.
+        :return: Результаты парсинга в порядке files.
+        """
+        return ParallelDocumentParser(
+            max_workers, pages_per_task, executor, criteria
+        ).parse_files(files)
+
+
+def observe_parse(file_format: Optional[str], seconds: float, pages: int = 0) -> None:
+    """
+    Записывает время разбора файла и число страниц в метрики по формату файла.
+    """
+    file_type = file_format or "unknown"
+    PARSE_SECONDS.labels(file_type).observe(seconds)
+    if pages:
+        PARSE_PAGES.labels(file_type).inc(pages)
+
+
+# Задачи пула возвращают замеры вместе с результатом: метрики процессов пула
+# до API не доходят, их записывает родительский процесс
+def _parse_file_task(
+    file_path: str,
+    is_contract: bool,
+    source: DocumentSource,
+    criteria: Optional[List[int]],
+    file_format: Optional[str],
+) -> Tuple[Any, int, float]:
+    return DocumentParserFactory.parse_measured(file_path, is_contract, source, criteria, file_format)
+
+
+def _locate_pages_task(source: Union[str, bytes], criteria: List[int]) -> Optional[List[int]]:
+    return DocumentParserFactory.locate_pages(source, criteria)
+
+
+def _extract_pdf_pages_task(
+    source: Union[str, bytes], pages: List[int], with_rotation: bool
+) -> Tuple[str, float]:
+    started = time.perf_counter()
+    if with_rotation:
+        text = PDFParser().parse_with_rotation(source, pages=pages)[0]
+    else:
+        text = PDFParser().extract_pages(source, pages=pages)
+    return text, time.perf_counter() - started
+
+
+class ParallelDocumentParser:
+    """
+    Распределяет файлы и диапазоны страниц больших PDF по пулу процессов
+    и собирает текст обратно в порядке страниц.
+    """
+
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        pages_per_task: int = PDF_PAGES_PER_TASK,
+        executor: Optional[Executor] = None,
+        criteria: Optional[List[int]] = None,
+    ):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.pages_per_task = max(1, pages_per_task)
+        self.executor = executor
+        self.criteria = criteria
+
+    def parse_files(self, files: List[Tuple[str, bool, DocumentSource]]) -> List[Any]:
+        if not files:
+            return []
+
+        if self.executor is None and self.max_workers == 1:
+            # DOC-файлы конвертируются в пуле antiword, пока остальные парсятся здесь
+            doc_pool = get_doc_pool()
+            formats = [
+                DocumentParserFactory.detect_format(file_path, source) for file_path, _, source in files
+            ]
+            converting = {
+                n: doc_pool.submit(source)
+                for n, (_, _, source) in enumerate(files)
+                if doc_pool is not None and formats[n] == "doc"
+            }
+            return [
+                converting[n].result() if n in converting else DocumentParserFactory.parser_file(
+                    file_path, is_contract, source=source, criteria=self.criteria, file_format=formats[n]
+                )
+                for n, (file_path, is_contract, source) in enumerate(files)
+            ]
+
+        if self.executor is not None:
+            return self.__submit_all(self.executor, files)
+
+        with ProcessPoolExecutor(max_workers=self.max_workers) as executor:
+            return self.__submit_all(executor, files)
+
+    def __submit_all(
+        self, executor: Executor, files: List[Tuple[str, bool, DocumentSource]]
+    ) -> List[Any]:
+        # Для каждого файла: либо одна задача на весь файл, либо список задач по страницам
+        planned = []
+        doc_pool = get_doc_pool()
+        for file_path, is_contract, source in files:
+            content = self.__read_bytes(source)
+            file_format = DocumentParserFactory.detect_format(file_path, content)
+            # DOC конвертирует antiword в асинхронном пуле подпроцессов, без процесса пула;
+            # без antiword разбор OLE на Python выполняется в пуле как обычная задача
+            if doc_pool is not None and file_format == "doc":
+                planned.append((file_format, doc_pool.submit(content)))
+                continue
+            if file_format == "pdf":
+                page_count = PDFParser().page_count(content)
+                if page_count > self.pages_per_task:
+                    with_rotation = DocumentParserFactory.is_contract_pdf(file_path, file_format)
+                    # Дешёвый проход тоже в пуле, полное извлечение — только нужных страниц.
+                    # Поиск страниц ставится сразу для всех файлов, результат ждём ниже
+                    locating = None
+                    if self.criteria:
+                        locating = executor.submit(_locate_pages_task, content, self.criteria)
+                    planned.append((file_format, (content, page_count, with_rotation, locating)))
+                    continue
+            task = executor.submit(
+                _parse_file_task, file_path, is_contract, content, self.criteria, file_format
+            )
+            planned.append((file_format, task))
+
+        # Большие PDF делятся на задачи по страницам, когда известны нужные страницы
+        for n, (file_format, task) in enumerate(planned):
+            if isinstance(task, tuple):
+                content, page_count, with_rotation, locating = task
+                pages = locating.result() if locating is not None else None
+                if pages is None:
+                    pages = list(range(page_count))
+                chunks = [
+                    executor.submit(
+                        _extract_pdf_pages_task,
+                        content,
+                        pages[start:start + self.pages_per_task],
+                        with_rotation,
+                    )
+                    for start in range(0, len(pages), self.pages_per_task)
+                ]
+                planned[n] = (file_format, (chunks, with_rotation, len(pages)))
+
+        results = []
+        for file_format, task in planned:
+            if isinstance(task, tuple):
+                chunks, with_rotation, pages_count = task
+                info = "parsed_with_rotation" if with_rotation else "parsed without rotation"
+                parts = [chunk.result() for chunk in chunks]
+                observe_parse(file_format, sum(seconds for _, seconds in parts), pages_count)
+                # Каждая задача отдаёт участок на каждую свою страницу, включая пустые
+                results.append((PAGE_BREAK.join(text for text, _ in parts), info))
+            elif file_format == "doc" and doc_pool is not None:
+                # Время конвертации DOC пул antiword записывает сам
+                results.append(task.result())
+            else:
+                result, pages_count, seconds = task.result()
+                observe_parse(file_format, seconds, pages_count)
+                results.append(result)
+        return results
+
+    def __read_bytes(self, source: DocumentSource) -> Union[str, bytes]:
+        """
+        Потоки нельзя передать в другой процесс, поэтому читаем их в байты.
+        """
+        if isinstance(source, (str, os.PathLike, bytes)):
+            return source
+        if isinstance(source, bytearray):
+            return bytes(source)
+        return open_source(source).read()
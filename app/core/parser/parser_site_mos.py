@@ -1,10 +1,69 @@
 import requests
-from typing import Dict, Any
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from typing import Callable, Dict, Any, Iterable, List, NamedTuple, Optional, Tuple
+
+from core.config import Config
+from core.metrics import AUCTION_API_SECONDS
+
+REQUEST_TIMEOUT = 10
+# Адрес портала; в бенчмарках подменяется локальным сервером
+DEFAULT_BASE_URL = "https://zakupki.mos.ru"
+# Данные сверх ответа Auction/Get: характеристики товаров (GetAuctionItemAdditionalInfo)
+NEED_ITEMS = "items"
+
+
+class Criterion(NamedTuple):
+    """
+    Описание критерия: функция сборки данных и дополнительные данные, которые ей нужны.
+    """
+    number: int
+    build: Callable[["AuctionParser"], Any]
+    needs: Tuple[str, ...]
+
+
+# Реестр критериев: номер -> Criterion, заполняется декоратором criterion
+CRITERIA: Dict[int, Criterion] = {}
+
+
+def criterion(number: int, needs: Iterable[str] = ()) -> Callable:
+    """
+    Регистрирует метод AuctionParser, собирающий данные критерия number.
+    needs перечисляет данные, которые надо загрузить до сборки (NEED_ITEMS).
+    """
+    def register(build: Callable[["AuctionParser"], Any]) -> Callable[["AuctionParser"], Any]:
+        if number in CRITERIA:
+            raise ValueError(f"Criterion {number} is already registered")
+        CRITERIA[number] = Criterion(number, build, tuple(needs))
+        return build
+    return register
+
+
+def create_session(pool_size: Optional[int] = None) -> requests.Session:
+    """
+    Creates a keep-alive session whose connection pool fits the fetch concurrency
+    (Config.ITEM_FETCH_WORKERS by default).
+    """
+    pool_size = pool_size or Config.ITEM_FETCH_WORKERS
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
 
 class AuctionParser:
-    def __init__(self, url_auction: str):
+    def __init__(
+        self,
+        url_auction: str,
+        session: Optional[requests.Session] = None,
+        max_workers: Optional[int] = None,
+        cache: Optional[Any] = None,
+        base_url: str = DEFAULT_BASE_URL,
+    ):
         self.auction_id = url_auction.split("/")[-1]
-        self.url = "https://zakupki.mos.ru/newapi/api/Auction/Get"
+        self.base_url = base_url.rstrip("/")
+        self.url = f"{self.base_url}/newapi/api/Auction/Get"
         self.headers = {
             "accept": "application/json, text/plain, */*",
             "accept-language": "ru-RU,ru;q=0.9,en-US;q=0.8,en;q=0.7",
@@ -12,16 +71,41 @@ class AuctionParser:
         }
         self.params = {"auctionId": self.auction_id}
         self.files = {}
+        self.payload: Dict[str, Any] = {}
         self.auction_info = {}
-        self.criterion_forms = []
+        # Собранные критерии: номер -> данные; строятся только по запросу
+        self.criterion_forms: Dict[int, Any] = {}
+        self.items_info: Optional[List[Any]] = None
+        # Одна сессия на все запросы парсера: TCP+TLS рукопожатие выполняется один раз
+        # Ограничение на число одновременных запросов GetAuctionItemAdditionalInfo
+        self.max_workers = max(1, max_workers or Config.ITEM_FETCH_WORKERS)
+        self.session = session or create_session(self.max_workers)
+        # Общий кэш Auction/Get (AuctionCache); хэш ответа и признак его изменения
+        self.cache = cache
+        self.payload_hash = None
+        self.changed = True
 
     def _send_request(self) -> None:
         """
         Sends a request to the API to retrieve auction data.
+        A cached response is used while its TTL has not expired.
         """
-        response = requests.get(self.url, headers=self.headers, params=self.params)
+        if self.cache is not None:
+            cached = self.cache.get(self.auction_id)
+            if cached is not None:
+                data, self.payload_hash = cached
+                self.changed = False
+                return data
+
+        with AUCTION_API_SECONDS.labels("Auction/Get").time():
+            response = self.session.get(
+                self.url, headers=self.headers, params=self.params, timeout=REQUEST_TIMEOUT
+            )
         if response.status_code == 200:
-            return response.json()
+            data = response.json()
+            if self.cache is not None:
+                self.payload_hash, self.changed = self.cache.put(self.auction_id, data)
+            return data
         else:
             raise Exception(f"Request error: {response.status_code}")
         
@@ -29,13 +113,29 @@ class AuctionParser:
         """
         Получить подробную инфромацию о товаре
         """
-        item_url = "https://zakupki.mos.ru/newapi/api/Auction/GetAuctionItemAdditionalInfo"
+        item_url = f"{self.base_url}/newapi/api/Auction/GetAuctionItemAdditionalInfo"
         item_params = {"itemId": item_id}
-        response = requests.get(item_url, headers=self.headers, params=item_params)
+        with AUCTION_API_SECONDS.labels("GetAuctionItemAdditionalInfo").time():
+            response = self.session.get(
+                item_url, headers=self.headers, params=item_params, timeout=REQUEST_TIMEOUT
+            )
         if response.status_code == 200:
             return response.json()
         else:
             raise Exception(f"Request error: {response.status_code}")
+
+    def _get_items(self, item_ids: List[int]) -> List[Any]:
+        """
+        Получить подробную информацию о нескольких товарах.
+        Запросы выполняются параллельно (не более max_workers одновременно),
+        порядок результатов совпадает с порядком item_ids.
+        """
+        if self.max_workers == 1 or len(item_ids) <= 1:
+            return [self._get_item(item_id) for item_id in item_ids]
+
+        workers = min(self.max_workers, len(item_ids))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(self._get_item, item_ids))
     
     def _datetype_string_formating(self, delivery: Dict) -> Dict[str|int, Any]:
         """
@@ -80,65 +180,104 @@ class AuctionParser:
         name
         item_info
         """
+        self._load(NEED_ITEMS)
+        specifications = self.auction_info["specifications"]
         prepared_specifications = []
-        for specification in self.auction_info["specifications"]:
+        for specification, item in zip(specifications, self.items_info):
             prepared_specification = {
                 "Количество товаров": specification["currentValue"],
                 "Имя товара": specification["name"],
-                "Характеристики": self._get_item(specification["id"]).get("characteristics")
+                "Характеристики": item.get("characteristics")
             }
             prepared_specifications.append(prepared_specification)
 
         return prepared_specifications
 
-    def _criterion_forming(self) -> None:
+    def _load(self, need: str) -> None:
         """
-        Forms dicts for condition requests
+        Загружает дополнительные данные критерия один раз на аукцион.
         """
-        # Критерий 1.
-        self.criterion_forms.append({
-            "Название закупки": 
-                self.auction_info["name_category_auction"]
-            })
+        if need == NEED_ITEMS and self.items_info is None:
+            self.items_info = self._get_items(
+                [specification["id"] for specification in self.auction_info["specifications"]]
+            )
+
+    @criterion(1)
+    def _criterion_name(self) -> Dict[str, Any]:
+        return {"Название закупки": self.auction_info["name_category_auction"]}
 
-        # Критерий 2.
+    @criterion(2)
+    def _criterion_guarantee(self) -> Dict[str, Any]:
         if self.auction_info["is_contract_guarantee_req"]:
             is_guarantee_required = "Да"
         else:
             is_guarantee_required = "Нет"
-        self.criterion_forms.append({
-            "Требуется ли обеспечение исполнения контракта": is_guarantee_required
-            })
+        return {"Требуется ли обеспечение исполнения контракта": is_guarantee_required}
 
-        # Критерий 3. 
+    @criterion(3)
+    def _criterion_license(self) -> Dict[str, Any]:
         if self.auction_info["is_license_production"]:
             is_license_required = "Да"
         else:
             is_license_required = "Нет"
-        self.criterion_forms.append({
-            "Требуется ли наличие сертификатов/лицензий": is_license_required
-        })
+        return {"Требуется ли наличие сертификатов/лицензий": is_license_required}
 
-        # Критерий 4.
-        self.criterion_forms.append(self._prepare_delivery())
+    @criterion(4)
+    def _criterion_delivery(self) -> List[Dict[str, Any]]:
+        return self._prepare_delivery()
 
-        # Критерий 5.
+    @criterion(5)
+    def _criterion_price_type(self) -> Dict[str, Any]:
         purchase_type_dict = {
             1: "Указана начальная цена",
             2: "Указана максимальная цена"
         }
-        self.criterion_forms.append({
-            "Тип цены": purchase_type_dict[self.auction_info["purchase_type_id"]]
-        })
+        return {"Тип цены": purchase_type_dict[self.auction_info["purchase_type_id"]]}
+
+    @criterion(6, needs=(NEED_ITEMS,))
+    def _criterion_specifications(self) -> List[Dict[str, Any]]:
+        return self._prepare_specifications()
+
+    def criterion_form(self, number: int) -> Any:
+        """
+        Данные критерия number; собираются при первом обращении.
+        Для незарегистрированного номера возвращается None.
+        """
+        if number not in self.criterion_forms:
+            spec = CRITERIA.get(number)
+            if spec is None:
+                return None
+            for need in spec.needs:
+                self._load(need)
+            self.criterion_forms[number] = spec.build(self)
+        return self.criterion_forms[number]
 
-        # Критерий 6.
-        self.criterion_forms.append(self._prepare_specifications())
+    def _criterion_forming(self, criteria: Optional[Iterable[int]] = None) -> None:
+        """
+        Forms dicts for condition requests.
+        Only the requested criteria are built (all registered ones by default).
+        """
+        for number in sorted(CRITERIA) if criteria is None else criteria:
+            self.criterion_form(number)
+
+    def fetch_payload(self) -> Dict[str, Any]:
+        """
+        Returns the raw Auction/Get response (the cache is used as in parse_data).
+        """
+        return self._send_request()
 
-    def parse_data(self) -> None:
+    def parse_data(
+        self, data: Optional[Dict[str, Any]] = None, criteria: Optional[Iterable[int]] = None
+    ) -> None:
         """
         Parses API response and organizes auction data.
+        An already fetched response (fetch_payload) can be passed to skip the request.
+        criteria limits the criteria built now; item details are requested only
+        if a criterion that needs them is among them.
         """
-        data = self._send_request()
+        if data is None:
+            data = self._send_request()
+        self.payload = data
         deliveries = data.get("deliveries", [])
         self.files = data.get("files", [])
         # Extract key auction data
@@ -159,7 +298,9 @@ class AuctionParser:
             # При наличии ТЗ: наименование и значение характеристики спецификаии закупки
             "specifications": data.get("items", [])
         }
-        self._criterion_forming()
+        self.criterion_forms = {}
+        self.items_info = None
+        self._criterion_forming(criteria)
 
     def get_auction_info(self) -> Dict[str|int, Any]:
         """
@@ -170,35 +311,18 @@ class AuctionParser:
     def display_criterion_info(self, file: bool) -> None:
         if file:
             with open("report_criterion", "w") as f:
-                for criterion in self.criterion_forms:
+                for form in self.criterion_forms.values():
                     f.write("Данные для критерия:")
-                    f.write(str(criterion))
+                    f.write(str(form))
                     f.write("\n")
 
-        for criterion in self.criterion_forms:
+        for form in self.criterion_forms.values():
             print("Данные для критерия:")
-            print(criterion)
+            print(form)
             print("\n")
-        
-urls = [
-"https://zakupki.mos.ru/auction/9864533",
-"https://zakupki.mos.ru/auction/9864708",
-"https://zakupki.mos.ru/auction/9864771",
-"https://zakupki.mos.ru/auction/9864863",
-"https://zakupki.mos.ru/auction/9864870",
-"https://zakupki.mos.ru/auction/9864884",
-"https://zakupki.mos.ru/auction/9864977",
-"https://zakupki.mos.ru/auction/9862417",
-"https://zakupki.mos.ru/auction/9862374",
-"https://zakupki.mos.ru/auction/9862366"
-]
-"""
-for url in urls:
-    parser = AuctionParser(url)
-    parser.parse_data()
-    print(parser.criterion_forms[3])
-"""
-
-parser = AuctionParser("https://zakupki.mos.ru/auction/9867759")
-parser.parse_data()
-print(parser.criterion_forms[3])
\ No newline at end of file
+
+
+if __name__ == "__main__":
+    parser = AuctionParser("https://zakupki.mos.ru/auction/9867759")
+    parser.parse_data(criteria=[4])
+    print(parser.criterion_form(4))
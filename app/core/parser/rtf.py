@@ -0,0 +1,138 @@
+import re
+from typing import BinaryIO, Dict, List, Union
+
+# Управляющие слова, содержимое групп которых не является текстом документа
+SKIP_DESTINATIONS = {
+    "colortbl", "stylesheet", "listtable", "listoverridetable", "info",
+    "pict", "object", "objdata", "header", "headerl", "headerr", "headerf", "footer",
+    "footerl", "footerr", "footerf", "footnote", "annotation", "field-inst", "fldinst",
+    "themedata", "colorschememapping", "datastore", "latentstyles", "xmlnstbl",
+    "rsidtbl", "generator", "pgdsctbl", "revtbl", "bkmkstart", "bkmkend",
+}
+SPECIAL_WORDS = {
+    "par": "\n", "line": "\n", "sect": "\n", "page": "\n", "row": "\n",
+    "tab": "\t", "cell": "\t", "nestcell": "\t",
+    "emdash": "\u2014", "endash": "\u2013", "bullet": "\u2022",
+    "lquote": "\u2018", "rquote": "\u2019", "ldblquote": "\u201c", "rdblquote": "\u201d",
+    "~": "\u00a0", "-": "", "_": "-",
+}
+# \fcharset шрифта -> кодировка \'hh
+CHARSET_CODEPAGES = {0: "cp1252", 161: "cp1253", 162: "cp1254", 204: "cp1251", 238: "cp1250"}
+
+TOKEN = re.compile(
+    rb"\\([a-zA-Z]+)(-?\d+)? ?|\\'([0-9a-fA-F]{2})|\\([^a-zA-Z])|([{}])|[\r\n]+|([^\\{}\r\n]+)"
+)
+
+
+def extract_rtf_text(source: Union[str, bytes, BinaryIO]) -> str:
+    """
+    Извлекает текст документа RTF без внешних утилит.
+
+    Служебные группы (таблицы шрифтов и стилей, картинки, колонтитулы, коды полей)
+    пропускаются; \\'hh декодируются по кодовой странице документа или
+    \\fcharset текущего шрифта, \\uN — как Unicode с пропуском замещающих символов.
+
+    :param source: Путь, байты или бинарный поток .rtf.
+    :return: Текст, абзацы разделены переводом строки.
+    """
+    if isinstance(source, str):
+        with open(source, "rb") as f:
+            data = f.read()
+    elif isinstance(source, (bytes, bytearray)):
+        data = bytes(source)
+    else:
+        source.seek(0)
+        data = source.read()
+
+    codepage = "cp1252"
+    fonts: Dict[int, str] = {}
+    # Состояние группы: пропускается ли она, шрифт, число замещающих символов после \u
+    stack: List[tuple] = []
+    skip, font, uc = False, None, 1
+    # Сколько следующих символов — замена предыдущего \uN
+    pending_skip = 0
+    # Глубина группы \fonttbl и шрифт, описываемый в ней сейчас
+    fonttbl = None
+    table_font = None
+    result: List[str] = []
+    raw = bytearray()
+
+    def flush() -> None:
+        if raw:
+            result.append(raw.decode(fonts.get(font, codepage), errors="replace"))
+            raw.clear()
+
+    for match in TOKEN.finditer(data):
+        word, argument, hex_code, symbol, brace, text = match.groups()
+        if brace == b"{":
+            flush()
+            stack.append((skip, font, uc))
+            pending_skip = 0
+        elif brace == b"}":
+            flush()
+            if stack:
+                skip, font, uc = stack.pop()
+            if fonttbl is not None and len(stack) < fonttbl:
+                fonttbl = None
+            pending_skip = 0
+        elif word is not None:
+            name = word.decode()
+            value = int(argument) if argument is not None else None
+            if fonttbl is not None:
+                # Внутри \fonttbl: \fN открывает описание шрифта, \fcharset задаёт кодировку
+                if name == "f":
+                    table_font = value
+                elif name == "fcharset" and value in CHARSET_CODEPAGES and table_font is not None:
+                    fonts[table_font] = CHARSET_CODEPAGES[value]
+                continue
+            if name == "fonttbl":
+                flush()
+                skip = True
+                fonttbl = len(stack)
+            elif name == "ansicpg" and value:
+                codepage = f"cp{value}"
+            elif name in SKIP_DESTINATIONS:
+                flush()
+                skip = True
+            elif skip:
+                continue
+            elif name == "f" and value is not None:
+                flush()
+                font = value
+            elif name == "uc" and value is not None:
+                uc = value
+            elif name == "u" and value is not None:
+                flush()
+                result.append(chr(value + 65536 if value < 0 else value))
+                pending_skip = uc
+            elif name in SPECIAL_WORDS:
+                flush()
+                result.append(SPECIAL_WORDS[name])
+                pending_skip = 0
+        elif symbol is not None:
+            if symbol == b"*":
+                # Необязательная группа, неизвестная читателю, пропускается целиком
+                flush()
+                skip = True
+            elif skip:
+                continue
+            elif symbol in (b"\\", b"{", b"}"):
+                raw.extend(symbol)
+            elif symbol.decode() in SPECIAL_WORDS:
+                flush()
+                result.append(SPECIAL_WORDS[symbol.decode()])
+        elif hex_code is not None:
+            if skip:
+                continue
+            if pending_skip:
+                pending_skip -= 1
+                continue
+            raw.append(int(hex_code, 16))
+        elif text is not None and not skip:
+            if pending_skip:
+                dropped = min(pending_skip, len(text))
+                text = text[dropped:]
+                pending_skip -= dropped
+            raw.extend(text)
+    flush()
+    return "".join(result)
@@ -0,0 +1,162 @@
+import os
+import re
+from functools import lru_cache
+from typing import BinaryIO, Dict, Iterable, List, Optional, Sequence, Set
+
+from core.parser.parser_documents import DocumentSource, open_source
+
+# Ключевые слова разделов контракта по номерам критериев (в нижнем регистре, ё -> е)
+CRITERION_KEYWORDS: Dict[int, Sequence[str]] = {
+    # Название закупки
+    1: ("предмет контракта", "предмет договора", "объект закупки", "наименование закупки"),
+    # Обеспечение исполнения контракта
+    2: ("обеспечени",),
+    # Сертификаты и лицензии
+    3: ("лиценз", "сертификат", "декларац"),
+    # График и место поставки
+    4: ("срок поставки", "сроки поставки", "место поставки", "условия поставки",
+        "график поставки", "доставк"),
+    # Тип и размер цены
+    5: ("цена контракта", "цены контракта", "цена договора", "стоимост"),
+    # Спецификация и характеристики товаров
+    6: ("спецификац", "характеристик", "техническое задание", "единица измерения", "ед. изм"),
+}
+
+# Если на страницу в среднем приходится меньше символов, текстового слоя нет
+# (скан) или он не декодируется — такой документ извлекается целиком
+MIN_CHARS_PER_PAGE = 20
+
+
+def criteria_scope(criteria: Iterable[int]) -> str:
+    """
+    Метка набора критериев для ключей кэшей: текст, извлечённый по разделам,
+    зависит от запрошенных критериев.
+    """
+    return "sections=" + ",".join(str(criterion) for criterion in sorted(set(criteria)))
+
+
+@lru_cache(maxsize=None)
+def text_collector() -> type:
+    """
+    Класс устройства pdfminer, которое только декодирует строки страницы в текст:
+    без координат символов и анализа разметки, которые строит pdfplumber.
+
+    pdfminer загружается при первом проходе, а не при импорте модуля:
+    criteria_scope нужен и там, где PDF не разбираются.
+    """
+    from pdfminer.pdfdevice import PDFDevice
+    from pdfminer.pdffont import PDFUnicodeNotDefined
+
+    class TextCollector(PDFDevice):
+        def __init__(self, rsrcmgr):
+            super().__init__(rsrcmgr)
+            self.parts: List[str] = []
+
+        def render_string(self, textstate, seq, *args) -> None:
+            font = textstate.font
+            for obj in seq:
+                if not isinstance(obj, bytes):
+                    continue
+                for cid in font.decode(obj):
+                    try:
+                        self.parts.append(font.to_unichr(cid))
+                    except PDFUnicodeNotDefined:
+                        pass
+            self.parts.append(" ")
+
+    return TextCollector
+
+
+class SectionLocator:
+    """
+    Находит страницы PDF, относящиеся к запрошенным критериям.
+
+    Дешёвый проход декодирует текст каждой страницы без разметки и строит
+    индекс «страница -> критерии» по ключевым словам. Полное извлечение
+    (с таблицами) затем выполняется только для найденных страниц и
+    context_pages страниц после каждой из них, где обычно продолжается раздел.
+    """
+
+    def __init__(
+        self,
+        criteria: Iterable[int],
+        keywords: Dict[int, Sequence[str]] = CRITERION_KEYWORDS,
+        context_pages: int = 1,
+        leading_pages: int = 1,
+    ):
+        self.criteria = sorted(set(criteria))
+        self.keywords = keywords
+        self.context_pages = max(0, context_pages)
+        # Первые страницы (стороны, предмет контракта) нужны всегда
+        self.leading_pages = max(0, leading_pages)
+
+    def scan(self, file_path: DocumentSource) -> List[str]:
+        """
+        Дешёвый текстовый проход: нормализованный текст каждой страницы.
+        """
+        source = open_source(file_path)
+        if isinstance(source, (str, os.PathLike)):
+            with open(source, "rb") as f:
+                return self.__scan_stream(f)
+        try:
+            return self.__scan_stream(source)
+        finally:
+            source.seek(0)
+
+    def __scan_stream(self, stream: BinaryIO) -> List[str]:
+        from pdfminer.pdfinterp import PDFPageInterpreter, PDFResourceManager
+        from pdfminer.pdfpage import PDFPage
+
+        collector = text_collector()
+        rsrcmgr = PDFResourceManager(caching=True)
+        pages_text = []
+        for page in PDFPage.get_pages(stream):
+            device = collector(rsrcmgr)
+            PDFPageInterpreter(rsrcmgr, device).process_page(page)
+            pages_text.append(self.normalize("".join(device.parts)))
+        return pages_text
+
+    def index(self, file_path: DocumentSource) -> Optional[List[Set[int]]]:
+        """
+        Для каждой страницы — множество критериев, ключевые слова которых на ней есть.
+
+        :return: Индекс по страницам или None, если текстовый слой непригоден.
+        """
+        pages_text = self.scan(file_path)
+        if not pages_text:
+            return None
+        if sum(len(text) for text in pages_text) < MIN_CHARS_PER_PAGE * len(pages_text):
+            return None
+        return [
+            {
+                criterion
+                for criterion in self.criteria
+                if any(keyword in text for keyword in self.keywords.get(criterion, ()))
+            }
+            for text in pages_text
+        ]
+
+    def locate(self, file_path: DocumentSource) -> Optional[List[int]]:
+        """
+        Номера страниц (с нуля) для полного извлечения.
+
+        :return: Отсортированный список страниц или None — извлекать документ целиком
+            (нет текстового слоя или ни одна страница не подошла).
+        """
+        page_index = self.index(file_path)
+        if page_index is None:
+            return None
+        matched = [number for number, criteria in enumerate(page_index) if criteria]
+        if not matched:
+            return None
+
+        selected = set(range(min(self.leading_pages, len(page_index))))
+        for number in matched:
+            last = min(number + self.context_pages, len(page_index) - 1)
+            selected.update(range(number, last + 1))
+        return sorted(selected)
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        return re.sub(r"\s+", " ", text.lower().replace("ё", "е"))
+
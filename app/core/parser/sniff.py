@@ -0,0 +1,83 @@
+import os
+import struct
+from typing import Iterable, Iterator, Optional
+
+# Сколько байт начала файла нужно для определения формата
+SNIFF_BYTES = 8192
+
+# Сигнатуры в начале файла
+SIGNATURES = (
+    (b"{\\rtf", "rtf"),
+    (b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1", "ole"),
+    (b"PK\x03\x04", "zip"),
+    (b"PK\x05\x06", "zip"),
+    (b"Rar!\x1a\x07", "rar"),
+    (b"7z\xbc\xaf\x27\x1c", "7z"),
+    (b"\x1f\x8b", "gzip"),
+    (b"\xff\xd8\xff", "image"),
+    (b"\x89PNG\r\n\x1a\n", "image"),
+    (b"GIF8", "image"),
+    (b"II*\x00", "image"),
+    (b"MM\x00*", "image"),
+    (b"MZ", "executable"),
+)
+# Документы OOXML — ZIP, различаются по каталогу частей внутри архива
+OOXML_FOLDERS = (("word/", "docx"), ("xl/", "xlsx"), ("ppt/", "pptx"))
+ZIP_LOCAL_HEADER = b"PK\x03\x04"
+# Флаг ZIP: размеры записи указаны после данных, следующий заголовок не найти
+ZIP_DATA_DESCRIPTOR = 0x08
+# Составной файл OLE хранит и DOC, и XLS/PPT: без разбора потоков решает расширение
+OLE_EXTENSIONS = {".xls": "xls", ".ppt": "ppt", ".msg": "msg"}
+
+
+def sniff_format(head: bytes, filename: str = "") -> Optional[str]:
+    """
+    Формат файла по первым байтам содержимого.
+
+    :param head: Начало файла (достаточно SNIFF_BYTES байт).
+    :param filename: Имя файла — уточняет формат составных файлов OLE.
+    :return: Имя формата (pdf, docx, zip, image...) или None, если сигнатура не распознана.
+    """
+    # Перед %PDF допускается мусор в первых 1024 байтах
+    if b"%PDF-" in head[:1024]:
+        return "pdf"
+    for signature, file_format in SIGNATURES:
+        if head.startswith(signature):
+            break
+    else:
+        return None
+    if file_format == "zip":
+        return ooxml_format(_zip_entry_names(head))
+    if file_format == "ole":
+        return OLE_EXTENSIONS.get(os.path.splitext(filename)[1].lower(), "doc")
+    return file_format
+
+
+def ooxml_format(names: Iterable[str]) -> str:
+    """
+    Формат ZIP по именам записей: docx/xlsx/pptx или zip для обычного архива.
+    """
+    for name in names:
+        for folder, file_format in OOXML_FOLDERS:
+            if name.startswith(folder):
+                return file_format
+    return "zip"
+
+
+def _zip_entry_names(head: bytes) -> Iterator[str]:
+    """
+    Имена записей ZIP, чьи локальные заголовки целиком попали в начало файла.
+    Заголовки обходятся по порядку, поэтому данные вложенных ZIP не мешают.
+    """
+    offset = 0
+    while head.startswith(ZIP_LOCAL_HEADER, offset) and offset + 30 <= len(head):
+        flags, compressed_size, name_length, extra_length = struct.unpack_from(
+            "<H10xI4xHH", head, offset + 6
+        )
+        name = head[offset + 30:offset + 30 + name_length]
+        if len(name) < name_length:
+            return
+        yield name.decode("cp437")
+        if flags & ZIP_DATA_DESCRIPTOR:
+            return
+        offset += 30 + name_length + extra_length + compressed_size
@@ -0,0 +1,96 @@
+import posixpath
+import zipfile
+from typing import BinaryIO, Dict, Iterator, List, Tuple, Union
+from xml.etree import ElementTree
+
+MAIN_NS = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+REL_NS = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+PACKAGE_REL_NS = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+
+
+def iter_xlsx_sheets(source: Union[str, BinaryIO]) -> Iterator[Tuple[str, Iterator[List[str]]]]:
+    """
+    Листы книги XLSX по порядку без внешних библиотек.
+
+    Строки листа читаются потоково (iterparse): в памяти держится только
+    таблица общих строк и текущая строка. Формулы не вычисляются — берётся
+    сохранённое значение ячейки.
+
+    :param source: Путь или бинарный поток .xlsx.
+    :return: Пары (имя листа, итератор строк); строка — значения непустых ячеек.
+    """
+    with zipfile.ZipFile(source) as archive:
+        shared = _shared_strings(archive)
+        for name, path in _sheet_paths(archive):
+            yield name, _iter_rows(archive, path, shared)
+
+
+def extract_xlsx_text(source: Union[str, BinaryIO]) -> str:
+    """
+    Текст книги: заголовок листа, затем строки с ячейками через табуляцию.
+    """
+    parts = []
+    for name, rows in iter_xlsx_sheets(source):
+        parts.append(f"Лист: {name}\n")
+        parts.extend("\t".join(row) + "\n" for row in rows if row)
+    return "".join(parts)
+
+
+def _shared_strings(archive: zipfile.ZipFile) -> List[str]:
+    if "xl/sharedStrings.xml" not in archive.namelist():
+        return []
+    strings = []
+    with archive.open("xl/sharedStrings.xml") as stream:
+        for _, element in ElementTree.iterparse(stream):
+            if element.tag == f"{MAIN_NS}si":
+                # Форматированная строка состоит из нескольких фрагментов <r><t>
+                strings.append("".join(t.text or "" for t in element.iter(f"{MAIN_NS}t")))
+                element.clear()
+    return strings
+
+
+def _sheet_paths(archive: zipfile.ZipFile) -> List[Tuple[str, str]]:
+    workbook = ElementTree.fromstring(archive.read("xl/workbook.xml"))
+    relations = ElementTree.fromstring(archive.read("xl/_rels/workbook.xml.rels"))
+    targets: Dict[str, str] = {}
+    for relation in relations.iter(f"{PACKAGE_REL_NS}Relationship"):
+        target = relation.get("Target", "")
+        # Цель связи задаётся относительно xl/ или абсолютным путём в пакете
+        targets[relation.get("Id")] = (
+            target.lstrip("/") if target.startswith("/") else posixpath.normpath(f"xl/{target}")
+        )
+    return [
+        (sheet.get("name", ""), targets[sheet.get(f"{REL_NS}id")])
+        for sheet in workbook.iter(f"{MAIN_NS}sheet")
+        if targets.get(sheet.get(f"{REL_NS}id")) in archive.namelist()
+    ]
+
+
+def _iter_rows(archive: zipfile.ZipFile, path: str, shared: List[str]) -> Iterator[List[str]]:
+    with archive.open(path) as stream:
+        row: List[str] = []
+        for event, element in ElementTree.iterparse(stream, events=("end",)):
+            if element.tag == f"{MAIN_NS}c":
+                value = _cell_value(element, shared)
+                if value:
+                    row.append(value)
+                element.clear()
+            elif element.tag == f"{MAIN_NS}row":
+                yield row
+                row = []
+                element.clear()
+
+
+def _cell_value(cell: ElementTree.Element, shared: List[str]) -> str:
+    cell_type = cell.get("t", "n")
+    if cell_type == "inlineStr":
+        return "".join(t.text or "" for t in cell.iter(f"{MAIN_NS}t"))
+    value = cell.find(f"{MAIN_NS}v")
+    if value is None or value.text is None:
+        return ""
+    if cell_type == "s":
+        index = int(value.text)
+        return shared[index] if index < len(shared) else ""
+    if cell_type == "b":
+        return "ИСТИНА" if value.text == "1" else "ЛОЖЬ"
+    return value.text
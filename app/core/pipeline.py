@@ -0,0 +1,158 @@
+import queue
+import time
+import itertools
+import threading
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from core.metrics import PIPELINE_STAGE_SECONDS
+
+# Обработчик этапа получает элемент и функцию emit для передачи результатов дальше
+StageHandler = Callable[[Any, Callable[[Any], None]], None]
+
+_STOP = object()
+
+
+class Stage:
+    """
+    Этап конвейера: обработчик, число рабочих потоков и ёмкость входной очереди.
+    Когда очередь заполнена, предыдущий этап ждёт (backpressure).
+    С priority входная очередь выдаёт первым элемент с наименьшим ключом
+    среди ожидающих, при равных ключах — пришедший раньше.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        handler: StageHandler,
+        workers: int = 1,
+        queue_size: int = 16,
+        priority: Optional[Callable[[Any], Any]] = None,
+    ):
+        self.name = name
+        self.handler = handler
+        self.workers = max(1, workers)
+        self.queue_size = max(1, queue_size)
+        self.priority = priority
+
+
+class _PriorityStageQueue(queue.PriorityQueue):
+    """
+    Очередь этапа с приоритетом; маркер остановки выдаётся после всех элементов.
+    """
+
+    def __init__(self, maxsize: int, key: Callable[[Any], Any]):
+        super().__init__(maxsize)
+        self.key = key
+        self.counter = itertools.count()
+
+    def _put(self, item: Any) -> None:
+        rank = (1, 0) if item is _STOP else (0, self.key(item))
+        super()._put((rank, next(self.counter), item))
+
+    def _get(self) -> Any:
+        return super()._get()[2]
+
+
+class Pipeline:
+    """
+    Многоэтапный конвейер на потоках с ограниченными очередями между этапами.
+
+    Этапы работают одновременно: пока один элемент парсится, следующий уже
+    скачивается, поэтому общее время стремится ко времени самого медленного этапа.
+    Первая ошибка любого обработчика останавливает конвейер и пробрасывается из run().
+    Установленное событие stop останавливает конвейер без ошибки: новые элементы
+    не берутся в работу, run() возвращается после текущих обработчиков.
+    """
+
+    def __init__(self, stages: List[Stage], stop: Optional[threading.Event] = None):
+        self.stages = stages
+        self.stats: Dict[str, Dict[str, float]] = {
+            stage.name: {"items": 0, "busy": 0.0} for stage in stages
+        }
+        self._stats_lock = threading.Lock()
+        self._stop = stop if stop is not None else threading.Event()
+        self._error: Optional[BaseException] = None
+
+    def run(self, items: Iterable[Any]) -> None:
+        queues = [
+            queue.Queue(maxsize=stage.queue_size)
+            if stage.priority is None
+            else _PriorityStageQueue(stage.queue_size, stage.priority)
+            for stage in self.stages
+        ]
+        # Сколько рабочих этапа ещё не завершилось
+        remaining = [stage.workers for stage in self.stages]
+        remaining_lock = threading.Lock()
+
+        def emit_to(index: int) -> Callable[[Any], None]:
+            if index >= len(self.stages):
+                return lambda item: None
+            return lambda item: self.__put(queues[index], item)
+
+        def worker(index: int) -> None:
+            stage = self.stages[index]
+            emit = emit_to(index + 1)
+            while True:
+                item = queues[index].get()
+                if item is _STOP:
+                    break
+                # После ошибки или остановки вычитываем очередь, чтобы не блокировать предыдущие этапы
+                if self._stop.is_set():
+                    continue
+                started = time.perf_counter()
+                try:
+                    stage.handler(item, emit)
+                except BaseException as e:
+                    self.__fail(e)
+                finally:
+                    elapsed = time.perf_counter() - started
+                    PIPELINE_STAGE_SECONDS.labels(stage.name).observe(elapsed)
+                    with self._stats_lock:
+                        self.stats[stage.name]["items"] += 1
+                        self.stats[stage.name]["busy"] += elapsed
+
+            with remaining_lock:
+                remaining[index] -= 1
+                last = remaining[index] == 0
+            # Последний рабочий этапа закрывает вход следующего этапа
+            if last and index + 1 < len(self.stages):
+                for _ in range(self.stages[index + 1].workers):
+                    queues[index + 1].put(_STOP)
+
+        threads = [
+            threading.Thread(target=worker, args=(index,), name=f"{stage.name}-{n}", daemon=True)
+            for index, stage in enumerate(self.stages)
+            for n in range(stage.workers)
+        ]
+        for thread in threads:
+            thread.start()
+
+        try:
+            for item in items:
+                if self._stop.is_set():
+                    break
+                self.__put(queues[0], item)
+        except BaseException as e:
+            self.__fail(e)
+        finally:
+            for _ in range(self.stages[0].workers):
+                queues[0].put(_STOP)
+            for thread in threads:
+                thread.join()
+
+        if self._error is not None:
+            raise self._error
+
+    def __put(self, target: queue.Queue, item: Any) -> None:
+        # Ожидание свободного места с проверкой остановки
+        while not self._stop.is_set():
+            try:
+                target.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    def __fail(self, error: BaseException) -> None:
+        if self._error is None:
+            self._error = error
+        self._stop.set()
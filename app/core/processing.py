@@ -1,86 +1,591 @@
 import os
+import json
+import logging
 import requests
 import re
-from typing import List, Any, Dict
+import threading
+from concurrent.futures import Future
+from typing import List, Any, Callable, Dict, Optional, Tuple
 import urllib.parse
 from unidecode import unidecode  # Убедитесь, что библиотека установлена: pip install unidecode
-from parser.parser_site_mos import AuctionParser
-from parser.parser_documents import DocumentParserFactory, PDFParser
+from core.config import Config
+from core.auction_cache import AuctionCache, create_auction_cache
+from core.auction_store import AuctionStore, get_auction_store
+from core.document_cache import DocumentCache
+from core.download import ByteBudget, DownloadBudgetError, fetch_head, spool_bytes, stream_download
+from core.dedup import BlockDeduplicator
+from core.llm_client import NO_EXTRACT, LLMClient, get_llm_client
+from core.pipeline import Pipeline, Stage
+from core.parser.parser_site_mos import AuctionParser, create_session
+from core.parser.parser_documents import (
+    DocumentParserFactory,
+    ParallelDocumentParser,
+    UnsupportedFormatError,
+    get_parse_executor,
+)
+from core.parser.section_locator import criteria_scope
+
+logger = logging.getLogger(__name__)
 
 class LLMProcessingEntity:
 
-    def __init__(self, urls_list: List[str], criterions_list: List[int]):
+    def __init__(
+        self,
+        urls_list: List[str],
+        criterions_list: List[int],
+        cache: Optional[DocumentCache] = None,
+        auction_cache: Optional[AuctionCache] = None,
+        progress: Optional[Callable[[Dict[str, Any]], None]] = None,
+        payloads: Optional[Dict[int, Dict[str, Any]]] = None,
+        known_files: Optional[Dict[int, Dict[str, Any]]] = None,
+        store: Optional[AuctionStore] = None,
+    ):
         self.urls = urls_list
         self.criterions = criterions_list
         self.criterions_data = {}
         self.files_data = {}
+        # Общая keep-alive сессия для API аукционов и скачивания файлов
+        self.session = create_session(
+            Config.ITEM_FETCH_WORKERS * Config.PIPELINE_METADATA_WORKERS
+            + Config.PIPELINE_PROBE_WORKERS
+            + Config.PIPELINE_DOWNLOAD_WORKERS
+        )
+        # Кэш скачанных и распарсенных документов между запусками
+        if cache is None and Config.DOCUMENT_CACHE_ENABLED:
+            cache = DocumentCache(Config.DOCUMENT_CACHE_DIR, Config.DOCUMENT_CACHE_MAX_BYTES)
+        self.cache = cache
+        # Кэш Auction/Get в Redis: неизменившиеся аукционы не скачиваются и не парсятся заново
+        if auction_cache is None and Config.AUCTION_CACHE_ENABLED:
+            auction_cache = create_auction_cache(
+                Config.REDIS_HOST, Config.REDIS_PORT, Config.AUCTION_CACHE_TTL
+            )
+        self.auction_cache = auction_cache
+        # Обработанные аукционы сохраняются для полнотекстового поиска без повторной обработки
+        if store is None and Config.AUCTION_STORE_ENABLED:
+            store = get_auction_store()
+        self.store = store
+        # Обработчик событий прогресса (этап, аукцион, файл) — например, для API задач
+        self.progress = progress
+        # Текст PDF зависит от набора критериев, поэтому и ключи кэшей тоже
+        self.section_criteria = self.criterions if Config.SECTION_LOCATOR_ENABLED else None
+        self.cache_scope = criteria_scope(self.criterions) if self.section_criteria else ""
+        # Для повторной обработки (core.monitor): уже полученные ответы Auction/Get
+        # и распарсенные файлы {id файла: результат} по номерам аукционов —
+        # такие аукционы не запрашиваются, а файлы не скачиваются заново
+        self.payloads = payloads or {}
+        self.known_files = known_files or {}
+        # Отмена parse() из другого потока (cancel), например при отключении клиента
+        self.cancelled = threading.Event()
 
     def parse(self) -> Dict[str, Any]:
         """
-        Parse criterions to condition
+        Parse criterions to condition.
+
+        Аукционы проходят конвейер metadata -> download -> parse -> assemble:
+        этапы работают одновременно на разных файлах и аукционах, очереди между
+        ними ограничены, число рабочих каждого этапа задаётся в Config.
         """
-        documents_dir = os.path.join(os.getcwd(), "documents")
-        
-        # Проверка существования 'documents' и обработка конфликтов
-        if os.path.exists(documents_dir):
-            if os.path.isfile(documents_dir):
-                backup_dir = documents_dir + "_backup"
-                os.rename(documents_dir, backup_dir)
+        parse_workers = Config.PARSE_WORKERS or os.cpu_count() or 1
+        # Общий пул процессов для парсинга живёт всё время работы приложения:
+        # воркеры не поднимаются заново на каждый запрос. При PARSE_WORKERS=1
+        # парсим в потоках этапа
+        self.executor = None
+        if parse_workers > 1:
+            self.executor = get_parse_executor(parse_workers, prewarm=Config.PARSE_POOL_PREWARM)
+        # Лимит скачанных байт на весь запуск
+        self.download_budget = None
+        if Config.DOWNLOAD_BATCH_MAX_BYTES:
+            self.download_budget = ByteBudget(Config.DOWNLOAD_BATCH_MAX_BYTES)
+        self.auctions = {}
+        self.in_flight = {}
+        self.lock = threading.Lock()
+
+        queue_size = Config.PIPELINE_QUEUE_SIZE
+        pipeline = Pipeline([
+            Stage("metadata", self.__fetch_metadata, Config.PIPELINE_METADATA_WORKERS, queue_size),
+            Stage("probe", self.__probe_file, Config.PIPELINE_PROBE_WORKERS, queue_size),
+            Stage(
+                "download",
+                self.__download_file,
+                Config.PIPELINE_DOWNLOAD_WORKERS,
+                Config.PIPELINE_DOWNLOAD_QUEUE_SIZE,
+                priority=self.__download_order,
+            ),
+            Stage("parse", self.__parse_file, Config.PIPELINE_PARSE_WORKERS or parse_workers, queue_size),
+            Stage("assemble", self.__assemble, 1, queue_size),
+        ], stop=self.cancelled)
+        pipeline.run(enumerate(self.urls))
+        self.pipeline_stats = pipeline.stats
+        if self.cancelled.is_set():
+            logger.info(f"Processing cancelled, auctions assembled: {len(self.criterions_data)}")
+
+        return {"infoCriterion": self.criterions_data, "filesContent": self.files_data}
+
+    def cancel(self) -> None:
+        """
+        Останавливает parse(): файлы в работе дообрабатываются, новые не берутся,
+        недособранные аукционы не попадают в кэши и хранилище.
+        """
+        self.cancelled.set()
+
+    def evaluate(
+        self,
+        client: Optional[LLMClient] = None,
+        criteria: Optional[Dict[int, List[int]]] = None,
+    ) -> Dict[int, Dict[int, Optional[str]]]:
+        """
+        Проверяет критерии всех аукционов в LLM после parse().
+
+        Все промпты ставятся в очередь клиента сразу: клиент сам собирает их в батчи
+        по критериям и ограничивает число одновременных запросов.
+        При LLM_DEDUP_ENABLED и нескольких аукционах документы сначала делятся
+        на блоки без повторов между аукционами, и по каждому уникальному блоку
+        выдержки под критерий запрашиваются один раз; в промпт проверки попадают
+        только выдержки. Одиночный аукцион проверяется по тексту документов:
+        повторять между аукционами нечего, а запросы выдержек только добавили бы вызовов.
+
+        :param criteria: Какие критерии проверять по номерам аукционов
+            (по умолчанию все критерии всех аукционов).
+        :return: {номер аукциона: {критерий: ответ модели или None при ошибке}}.
+        """
+        client = client or get_llm_client()
+        if criteria is None:
+            criteria = {i: self.criterions for i in self.criterions_data}
+        extracts = None
+        if Config.LLM_DEDUP_ENABLED and len(criteria) > 1:
+            extracts = self.__extract_blocks(client, criteria)
+        futures = {
+            (i, criterion): client.submit(
+                criterion, self.__build_prompt(i, criterion, extracts)
+            )
+            for i, auction_criteria in criteria.items()
+            for criterion in auction_criteria
+        }
+        results = {}
+        for (i, criterion), future in futures.items():
+            try:
+                answer = future.result()
+            except Exception as e:
+                logger.error(f"LLM evaluation failed for auction {i}, criterion {criterion}: {e}")
+                answer = None
+            results.setdefault(i, {})[criterion] = answer
+        return results
+
+    def __extract_blocks(
+        self, client: LLMClient, criteria: Dict[int, List[int]]
+    ) -> Dict[int, Dict[int, List[str]]]:
+        """
+        Выдержки по критериям из уникальных блоков документов проверяемых аукционов.
+
+        :return: {номер аукциона: {критерий: выдержки его блоков по порядку}}.
+        """
+        dedup = BlockDeduplicator(Config.LLM_BLOCK_CHARS)
+        auction_blocks = {}
+        # Обход по проверяемым аукционам: files_data других может ещё дополняться конвейером
+        for i in criteria:
+            files = self.files_data.get(i, {})
+            if not criteria[i]:
+                continue
+            auction_blocks[i] = []
+            for j, parsed in files.items():
+                text = parsed[0] if isinstance(parsed, tuple) else parsed
+                if text:
+                    auction_blocks[i].extend(dedup.add_document((i, j), text))
+        self.dedup_stats = dedup.summary()
+
+        # Блок нужен по объединению критериев всех аукционов, где он встречается
+        needed = {}
+        for i, block_ids in auction_blocks.items():
+            for block_id in block_ids:
+                needed.setdefault(block_id, set()).update(criteria[i])
+        futures = {
+            (block_id, criterion): client.submit(criterion, dedup.blocks[block_id], kind="extract")
+            for block_id, block_criteria in needed.items()
+            for criterion in sorted(block_criteria)
+        }
+        answers = {}
+        for key, future in futures.items():
+            try:
+                answers[key] = future.result().strip()
+            except Exception as e:
+                logger.error(f"LLM extraction failed for block {key[0]}, criterion {key[1]}: {e}")
+                # Без выдержки блок передаётся в проверку целиком
+                answers[key] = dedup.blocks[key[0]]
+
+        # Ответ по блоку раздаётся всем аукционам, где он встречается
+        extracts = {}
+        for i, block_ids in auction_blocks.items():
+            for criterion in criteria[i]:
+                found = []
+                for block_id in dict.fromkeys(block_ids):
+                    answer = answers[(block_id, criterion)]
+                    # «Нет» — весь ответ, а не его начало: выдержка может начинаться с «нет...»
+                    if answer and answer.strip(" .«»\"").lower() != NO_EXTRACT:
+                        found.append(answer)
+                extracts.setdefault(i, {})[criterion] = found
+        return extracts
+
+    def __build_prompt(
+        self,
+        i: int,
+        criterion: int,
+        extracts: Optional[Dict[int, Dict[int, List[str]]]] = None,
+    ) -> str:
+        """
+        Данные аукциона по критерию и текст документов (с ограничением длины).
+        """
+        if extracts is not None:
+            documents = extracts.get(i, {}).get(criterion, [])
         else:
-            os.makedirs(documents_dir, exist_ok=True)
+            documents = []
+            for parsed in self.files_data.get(i, {}).values():
+                text = parsed[0] if isinstance(parsed, tuple) else parsed
+                if text:
+                    documents.append(text)
+        documents_text = "\n\n".join(documents)[:Config.LLM_MAX_DOCUMENT_CHARS]
+        auction_data = json.dumps(
+            self.criterions_data[i].get(criterion), ensure_ascii=False, indent=1
+        )
+        return f"Карточка аукциона:\n{auction_data}\n\nДокументы:\n{documents_text}"
 
-        for i, url in enumerate(self.urls):
-            parser = AuctionParser(url)
-            parser.parse_data()
-            
-            self.criterions_data[i] = {}
-            for criterion in self.criterions:
-                try:
-                    self.criterions_data[i][criterion] = parser.criterion_forms[criterion - 1]
-                except IndexError:
-                    self.criterions_data[i][criterion] = None
-            
-            self.files_data[i] = {}
+    def __fetch_metadata(
+        self, task: Tuple[int, str], emit: Callable[[Dict[str, Any]], None]
+    ) -> None:
+        """
+        Этап metadata: Auction/Get и критерии аукциона, затем задачи на скачивание файлов.
+        """
+        i, url = task
+        parser = AuctionParser(
+            url,
+            session=self.session,
+            max_workers=Config.ITEM_FETCH_WORKERS,
+            cache=self.auction_cache,
+            base_url=Config.ZAKUPKI_URL,
+        )
+        self.__report("metadata", auction=i, url=url, status="started")
+        # Собираются только запрошенные критерии: характеристики товаров нужны лишь критерию 6
+        parser.parse_data(self.payloads.get(i), criteria=self.criterions)
+        self.__report("metadata", auction=i, url=url, status="done", files=len(parser.files))
+
+        # Эта версия аукциона уже обработана: файлы не скачиваем и не парсим
+        files_data = None
+        if self.auction_cache and parser.payload_hash:
+            files_data = self.auction_cache.get_result(
+                parser.auction_id, parser.payload_hash, self.cache_scope
+            )
+            if files_data is not None:
+                self.__report("download", auction=i, status="cached")
+
+        files = []
+        known = {}
+        if files_data is None:
+            # Пропустить файлы без 'id'; уже распарсенные файлы берутся как есть
+            known_files = self.known_files.get(i, {})
             for j, file in enumerate(parser.files):
-                file_id = file.get("id")
-                if not file_id:
-                    continue  # Пропустить файлы без 'id'
-                
-                download_url = f"https://zakupki.mos.ru/newapi/api/FileStorage/Download?id={file_id}"
-                
-                try:
-                    response = requests.get(download_url, timeout=10)
-                    response.raise_for_status()
-                except requests.RequestException:
-                    continue  # Пропустить файл при ошибке скачивания
-                
-                # Извлечение имени файла
-                filename = self.__get_filename_from_response(response, file)
-                print(filename)
-                # Транслитерация имени файла
-                
+                if not file.get("id"):
+                    continue
+                if str(file["id"]) in known_files:
+                    known[j] = known_files[str(file["id"])]
+                else:
+                    files.append((j, file))
+
+        emit({
+            "kind": "auction",
+            "auction": i,
+            "parser": parser,
+            "files_data": files_data,
+            "known": known,
+            "expected": len(files),
+        })
+        for j, file in files:
+            emit({"kind": "file", "auction": i, "file": j, "meta": file})
+
+    def __probe_file(
+        self, item: Dict[str, Any], emit: Callable[[Dict[str, Any]], None]
+    ) -> None:
+        """
+        Этап probe: кэш документов по id, затем начало файла запросом Range —
+        по нему определяется формат (файлы без парсера не скачиваются) и размер
+        для очереди этапа download.
+        """
+        if item["kind"] != "file":
+            emit(item)
+            return
+
+        i, j, file = item["auction"], item["file"], item["meta"]
+        file_id = file.get("id")
+
+        # Повторная проверка: файл уже скачан и распарсен ранее
+        cached = self.cache.get(file_id, self.cache_scope) if self.cache else None
+        if cached is not None:
+            item["parsed"] = cached["parsed"]
+            self.__report("download", auction=i, file=j, status="cached")
+            emit(item)
+            return
+
+        item["url"] = f"{Config.ZAKUPKI_URL}/newapi/api/FileStorage/Download?id={file_id}"
+        if not Config.DOWNLOAD_SNIFF_ENABLED:
+            emit(item)
+            return
+
+        try:
+            head, response, size = fetch_head(
+                self.session,
+                item["url"],
+                timeout=(Config.DOWNLOAD_CONNECT_TIMEOUT, Config.DOWNLOAD_READ_TIMEOUT),
+                retries=Config.DOWNLOAD_RETRIES,
+                backoff=Config.DOWNLOAD_BACKOFF,
+            )
+        except requests.RequestException as e:
+            self.__skip_file(item, "failed", f"Download of file {file_id} failed: {e}")
+            emit(item)
+            return
+
+        filename = os.path.basename(self.__get_filename_from_response(response, file))
+        # Архивы с видео, сканы в JPEG и прочее без парсера не скачиваются целиком
+        file_format = DocumentParserFactory.sniff(filename, head)
+        if not DocumentParserFactory.is_supported(file_format):
+            item["parsed"] = None
+            self.__report(
+                "download", auction=i, file=j, filename=filename,
+                format=file_format, status="skipped",
+            )
+            emit(item)
+            return
+
+        item.update(filename=filename, size=size)
+        # Небольшой файл уже получен целиком первым запросом
+        if size is not None and size <= len(head):
+            if self.download_budget is not None and not self.download_budget.take(size):
+                self.__skip_file(item, "budget", f"Batch download budget exhausted: {item['url']}")
+            else:
+                item["buffer"], item["sha256"] = spool_bytes(head, Config.DOWNLOAD_SPOOL_MAX_BYTES)
+        else:
+            # Большой файл докачивается с конца полученного начала
+            item["head"] = head
+        emit(item)
+
+    def __download_file(
+        self, item: Dict[str, Any], emit: Callable[[Dict[str, Any]], None]
+    ) -> None:
+        """
+        Этап download: потоковое скачивание с докачкой и повторами, лимиты байт
+        на файл и на пакет, кэш документов по хэшу содержимого.
+        Очередь этапа выдаёт крупные файлы первыми (см. __download_order).
+        """
+        if item["kind"] != "file" or "parsed" in item:
+            emit(item)
+            return
+
+        i, j, file = item["auction"], item["file"], item["meta"]
+        file_id = file.get("id")
+
+        buffer, sha256 = item.pop("buffer", None), item.pop("sha256", None)
+        head = item.pop("head", b"")
+        if buffer is None:
+            try:
+                buffer, response, sha256 = stream_download(
+                    self.session,
+                    item["url"],
+                    timeout=(Config.DOWNLOAD_CONNECT_TIMEOUT, Config.DOWNLOAD_READ_TIMEOUT),
+                    spool_max_size=Config.DOWNLOAD_SPOOL_MAX_BYTES,
+                    retries=Config.DOWNLOAD_RETRIES,
+                    backoff=Config.DOWNLOAD_BACKOFF,
+                    max_bytes=Config.DOWNLOAD_MAX_FILE_BYTES or None,
+                    budget=self.download_budget,
+                    expected_size=item.get("size"),
+                    head=head,
+                )
+            except DownloadBudgetError as e:
+                self.__skip_file(item, "budget", str(e))
+                emit(item)
+                return
+            except requests.RequestException as e:
+                # Пропустить файл при ошибке скачивания
+                self.__skip_file(item, "failed", f"Download of file {file_id} failed: {e}")
+                emit(item)
+                return
+            if "filename" not in item:
                 # Безопасное имя файла
-                filename = os.path.basename(filename)
-                file_path = os.path.join(documents_dir, filename)
-                
-                # Проверка на существование файла и предотвращение перезаписи
-                if os.path.exists(file_path):
-                    filename = self.__generate_unique_filename(documents_dir, filename)
-                    file_path = os.path.join(documents_dir, filename)
-                
-                # Сохранение файла
-                if not self.__save_file(file_path, response):
-                    continue  # Пропустить файл при ошибке сохранения
-                
-                # Парсинг содержимого файла
-                
-                file_text = DocumentParserFactory().parser_file(file_path, is_contract=self.__is_contract_file(file_path))
-                self.files_data[i][j] = file_text
-                
-                # Удаление временного файла после парсинга
-                os.remove(file_path)
-        
-        return {"infoCriterion": self.criterions_data, "filesContent": self.files_data}
+                item["filename"] = os.path.basename(self.__get_filename_from_response(response, file))
+
+        filename = item["filename"]
+        logger.debug(f"Downloaded file {filename}")
+
+        # Тот же документ мог прийти под другим id (типовые шаблоны контрактов)
+        if self.cache:
+            file_text = self.cache.get_by_hash(file_id, sha256, filename, self.cache_scope)
+            if file_text is not None:
+                buffer.close()
+                item["parsed"] = file_text
+                emit(item)
+                return
+
+        item.update(sha256=sha256, buffer=buffer)
+        self.__report("download", auction=i, file=j, filename=filename, status="done")
+        emit(item)
+
+    @staticmethod
+    def __download_order(item: Dict[str, Any]) -> float:
+        """
+        Ключ очереди этапа download: элементы, которые не нужно скачивать, проходят
+        сразу, файлы — от крупных к мелким, чтобы долгие загрузки начинались раньше
+        и шли параллельно с парсингом мелких. Файлы неизвестного размера — последними.
+        """
+        if item["kind"] != "file" or "parsed" in item or "buffer" in item:
+            return float("-inf")
+        return -(item.get("size") or 0)
+
+    def __skip_file(self, item: Dict[str, Any], status: str, reason: str) -> None:
+        logger.warning(reason)
+        item["parsed"] = None
+        # Файл не получен: результат аукциона неполный и не кэшируется
+        item["incomplete"] = True
+        self.__report(
+            "download", auction=item["auction"], file=item["file"],
+            filename=item.get("filename"), status=status,
+        )
+
+    def __parse_file(
+        self, item: Dict[str, Any], emit: Callable[[Dict[str, Any]], None]
+    ) -> None:
+        """
+        Этап parse: извлечение текста в пуле процессов.
+        Одинаковое содержимое, пришедшее одновременно, парсится один раз.
+        """
+        if item["kind"] != "file" or "parsed" in item:
+            emit(item)
+            return
+
+        filename, sha256, buffer = item["filename"], item["sha256"], item["buffer"]
+        with self.lock:
+            future = self.in_flight.get(sha256)
+            owner = future is None
+            if owner:
+                future = self.in_flight[sha256] = Future()
+
+        try:
+            if owner:
+                self.__report("parse", auction=item["auction"], file=item["file"], status="started")
+                try:
+                    parsed = ParallelDocumentParser(
+                        max_workers=1 if self.executor is None else None,
+                        executor=self.executor,
+                        criteria=self.section_criteria,
+                    ).parse_files([(filename, self.__is_contract_file(filename), buffer)])[0]
+                    status = "done"
+                except UnsupportedFormatError as e:
+                    # По содержимому целиком формат оказался неподдерживаемым
+                    logger.warning(str(e))
+                    parsed, status = None, "skipped"
+                except Exception as e:
+                    # Повреждённое вложение не должно останавливать разбор остальных файлов
+                    logger.error(f"Parsing of file {filename} failed: {e}")
+                    parsed, status = None, "failed"
+                except BaseException as e:
+                    future.set_exception(e)
+                    raise
+                future.set_result(parsed)
+                if self.cache and parsed is not None:
+                    self.cache.put(
+                        item["meta"].get("id"), filename, buffer, parsed,
+                        sha256=sha256, scope=self.cache_scope,
+                    )
+                self.__report("parse", auction=item["auction"], file=item["file"], status=status)
+            else:
+                parsed = future.result()
+        finally:
+            buffer.close()
+
+        if parsed is None:
+            # Текст не получен ни этим, ни параллельным разбором того же содержимого
+            item["incomplete"] = True
+
+        item["parsed"] = parsed
+        del item["buffer"]
+        emit(item)
+
+    def __assemble(
+        self, item: Dict[str, Any], emit: Callable[[Dict[str, Any]], None]
+    ) -> None:
+        """
+        Этап assemble: сборка критериев и текстов файлов по аукционам.
+        Файлы аукциона могут прийти раньше его метаданных.
+        """
+        i = item["auction"]
+        state = self.auctions.setdefault(
+            i, {"parser": None, "expected": None, "received": 0, "cached": False, "incomplete": False}
+        )
+        self.files_data.setdefault(i, {})
+
+        if item["kind"] == "auction":
+            parser = item["parser"]
+            state["parser"] = parser
+            state["expected"] = item["expected"]
+            self.criterions_data[i] = {}
+            for criterion in self.criterions:
+                self.criterions_data[i][criterion] = parser.criterion_form(criterion)
+            if item["files_data"] is not None:
+                self.files_data[i] = item["files_data"]
+                state["cached"] = True
+            else:
+                self.files_data[i].update(item["known"])
+        else:
+            state["received"] += 1
+            if item.get("incomplete"):
+                state["incomplete"] = True
+            if item["parsed"] is not None:
+                self.files_data[i][item["file"]] = item["parsed"]
+
+        if state["expected"] is not None and state["received"] == state["expected"]:
+            self.__report("auction", auction=i, status="done")
+            parser = state["parser"]
+            if state["incomplete"]:
+                # Следующий запуск должен снова попробовать недостающие файлы:
+                # неполный набор не кэшируется и не заменяет документы в хранилище
+                logger.warning(f"Auction {parser.auction_id} is incomplete, result is not cached")
+                return
+            if self.auction_cache and parser.payload_hash and not state["cached"]:
+                self.auction_cache.put_result(
+                    parser.auction_id, parser.payload_hash, self.files_data[i], self.cache_scope
+                )
+            # В хранилище — только полный текст: отобранные под критерии страницы
+            # заменили бы документы аукциона неполными
+            if self.store is not None and not self.cache_scope:
+                self.__store_auction(i, parser)
+
+    def __store_auction(self, i: int, parser: AuctionParser) -> None:
+        """
+        Сохраняет критерии и тексты документов аукциона в хранилище.
+        Ошибка хранилища не прерывает обработку.
+        """
+        documents = []
+        for j, parsed in self.files_data[i].items():
+            file = parser.files[j]
+            filename = file.get("name") or ""
+            documents.append({
+                "file_id": file.get("id"),
+                "filename": filename,
+                "is_contract": self.__is_contract_file(unidecode(filename)),
+                "text": parsed[0] if isinstance(parsed, tuple) else parsed,
+            })
+        try:
+            self.store.put_auction(
+                parser.auction_id,
+                parser.payload,
+                self.criterions_data[i],
+                documents,
+                payload_hash=parser.payload_hash,
+            )
+        except Exception as e:
+            logger.error(f"Failed to store auction {parser.auction_id}: {e}")
+
+    def __report(self, stage: str, **fields: Any) -> None:
+        """
+        Передаёт событие прогресса обработчику, если он задан.
+        """
+        if self.progress is not None:
+            self.progress({"stage": stage, **fields})
 
     def __is_contract_file(self, filename: str) -> bool:
         """
@@ -128,32 +633,11 @@ class LLMProcessingEntity:
         
         return filename
 
-    def __generate_unique_filename(self, directory: str, filename: str) -> str:
-        """
-        Генерирует уникальное имя файла, добавляя суффикс, если файл уже существует.
-        """
-        base, ext = os.path.splitext(filename)
-        count = 1
-        new_filename = f"{base}_{count}{ext}"
-        while os.path.exists(os.path.join(directory, new_filename)):
-            count += 1
-            new_filename = f"{base}_{count}{ext}"
-        return new_filename
-
-    def __save_file(self, file_path: str, response: requests.Response) -> bool:
-        """
-        Сохраняет файл на диск. Возвращает True при успехе, False при ошибке.
-        """
-        try:
-            with open(file_path, "wb") as f:
-                f.write(response.content)
-            return True
-        except OSError:
-            return False
-
     def display_data(self):
         print(self.files_data)
 
-to_send = LLMProcessingEntity(["https://zakupki.mos.ru/auction/9869562",], [1, 2, 3, 4, 5, 6])
-to_send.parse()
-to_send.display_data()
\ No newline at end of file
+# Запуск из папки app: python -m core.processing
+if __name__ == "__main__":
+    to_send = LLMProcessingEntity(["https://zakupki.mos.ru/auction/9869562",], [1, 2, 3, 4, 5, 6])
+    to_send.parse()
+    to_send.display_data()
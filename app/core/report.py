@@ -0,0 +1,192 @@
+import queue
+import logging
+import threading
+from datetime import datetime
+from contextlib import closing
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterator, List, Optional
+
+from core.config import Config
+from core.llm_client import CRITERION_TOPICS, LLMClient
+from core.metrics import JOBS_IN_FLIGHT
+from core.report_pdf import PDFStreamWriter, load_font
+
+logger = logging.getLogger(__name__)
+
+_PARSED = object()
+
+
+def iter_auction_results(
+    urls: List[str],
+    criteria: List[int],
+    client: Optional[LLMClient] = None,
+    evaluate: bool = True,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Результаты по аукционам в порядке завершения их обработки.
+
+    Конвейер LLMProcessingEntity.parse работает в отдельном потоке; собранные
+    аукционы отправляются в LLM, не дожидаясь остальных. Пока идёт проверка,
+    вновь собранные аукционы копятся и проверяются следующим пакетом одним
+    вызовом evaluate: повторы блоков документов убираются в пределах пакета.
+    После выдачи результата тексты документов аукциона освобождаются.
+    Ошибка конвейера пробрасывается после результатов, готовых к этому моменту.
+    Если генератор закрыт раньше (клиент отключился), обработка отменяется.
+
+    :return: Словари с полями auction, url, criteria (данные карточки) и answers.
+    """
+    # Тяжёлые зависимости обработки нужны только при генерации отчёта
+    from core.processing import LLMProcessingEntity
+
+    events: "queue.Queue[Any]" = queue.Queue()
+
+    def on_progress(event: Dict[str, Any]) -> None:
+        if event["stage"] == "auction" and event.get("status") == "done":
+            events.put(("parsed", event["auction"]))
+
+    entity = LLMProcessingEntity(urls, criteria, progress=on_progress)
+
+    def run() -> None:
+        try:
+            entity.parse()
+        except BaseException as e:
+            events.put(e)
+        else:
+            events.put(_PARSED)
+
+    def evaluate_batch(batch: List[int]) -> None:
+        answers = {}
+        if evaluate:
+            try:
+                answers = entity.evaluate(client, criteria={i: criteria for i in batch})
+            except Exception as e:
+                logger.error(f"LLM evaluation failed for auctions {batch}: {e}")
+        events.put(("evaluated", batch, answers))
+
+    threading.Thread(target=run, name="report-parse", daemon=True).start()
+    # Один пакет за раз: внутри пакета промпты всех аукционов уходят в клиент LLM
+    # сразу, и он сам собирает их в батчи
+    evaluator = ThreadPoolExecutor(max_workers=1, thread_name_prefix="report-evaluate")
+    parsing = True
+    evaluating = False
+    ready: List[int] = []
+    error = None
+    try:
+        while parsing or evaluating or ready:
+            if ready and not evaluating:
+                evaluator.submit(evaluate_batch, ready)
+                ready, evaluating = [], True
+                continue
+            event = events.get()
+            if event is _PARSED:
+                parsing = False
+            elif isinstance(event, BaseException):
+                parsing = False
+                error = event
+            elif event[0] == "parsed":
+                ready.append(event[1])
+            else:
+                _, batch, answers = event
+                evaluating = False
+                for i in batch:
+                    yield {
+                        "auction": i,
+                        "url": urls[i],
+                        "criteria": entity.criterions_data.get(i, {}),
+                        "answers": answers.get(i, {}),
+                    }
+                    entity.files_data.pop(i, None)
+    finally:
+        # При закрытии генератора до конца конвейер не должен качать и парсить дальше
+        entity.cancel()
+        evaluator.shutdown(wait=False, cancel_futures=True)
+    if error is not None:
+        raise error
+
+
+def stream_report(urls: List[str], criteria: List[int]) -> Iterator[bytes]:
+    """
+    PDF-отчёт по частям: заголовок отдаётся сразу, раздел аукциона — как только
+    аукцион обработан, завершённые страницы не держатся в памяти.
+    """
+    with JOBS_IN_FLIGHT.labels("stream").track_inprogress():
+        writer = PDFStreamWriter(load_font(Config.REPORT_FONT_PATH))
+        yield writer.begin() + writer.heading("Отчёт о проверке аукционов", 18) + writer.paragraph(
+            f"Сформирован {datetime.now():%d.%m.%Y %H:%M}, аукционов: {len(urls)}"
+        )
+        try:
+            # closing: при отключении клиента обработка отменяется сразу, а не при сборке мусора
+            with closing(iter_auction_results(urls, criteria, evaluate=Config.REPORT_EVALUATE)) as results:
+                for result in results:
+                    yield render_auction(writer, result)
+        except Exception as e:
+            logger.exception("Report generation failed")
+            yield writer.heading("Ошибка обработки") + writer.paragraph(str(e))
+        yield writer.finish()
+
+
+def render_job_report(urls: List[str], result: Dict[str, Any]) -> bytes:
+    """
+    PDF-отчёт по сохранённому результату задачи (JobStore.get_result).
+    Номера аукционов и критериев после JSON — строки.
+    """
+    writer = PDFStreamWriter(load_font(Config.REPORT_FONT_PATH))
+    chunks = [writer.begin() + writer.heading("Отчёт о проверке аукционов", 18) + writer.paragraph(
+        f"Сформирован {datetime.now():%d.%m.%Y %H:%M}, аукционов: {len(urls)}"
+    )]
+    answers = result.get("answers") or {}
+    for i, url in enumerate(urls):
+        criteria = result["infoCriterion"].get(str(i))
+        if criteria is None:
+            chunks.append(writer.heading(f"Аукцион {url.rstrip('/').split('/')[-1]}"))
+            chunks.append(writer.paragraph("Не удалось получить данные аукциона"))
+            continue
+        chunks.append(render_auction(writer, {
+            "url": url,
+            "criteria": {int(c): form for c, form in criteria.items()},
+            "answers": {int(c): answer for c, answer in answers.get(str(i), {}).items()},
+        }))
+    chunks.append(writer.finish())
+    return b"".join(chunks)
+
+
+def render_auction(writer: PDFStreamWriter, result: Dict[str, Any]) -> bytes:
+    """
+    Раздел аукциона: данные карточки и заключение по каждому критерию.
+    """
+    auction_id = result["url"].rstrip("/").split("/")[-1]
+    chunks = [writer.heading(f"Аукцион {auction_id}"), writer.paragraph(result["url"], 8)]
+    for criterion, form in result["criteria"].items():
+        topic = CRITERION_TOPICS.get(criterion, "")
+        chunks.append(writer.heading(f"Критерий {criterion}. {topic.capitalize()}", 11))
+        chunks.append(writer.paragraph("\n".join(_form_lines(form)) or "Нет данных", indent=10))
+        answer = result["answers"].get(criterion)
+        if answer is not None:
+            chunks.append(writer.paragraph(f"Заключение: {answer.strip()}", indent=10))
+    return b"".join(chunks)
+
+
+def _form_lines(value: Any, indent: str = "") -> List[str]:
+    """
+    Данные карточки по критерию (словари и списки из AuctionParser) в виде строк.
+    """
+    if isinstance(value, dict):
+        lines = []
+        for key, item in value.items():
+            if isinstance(item, (dict, list)):
+                lines.append(f"{indent}{key}:")
+                lines += _form_lines(item, indent + "    ")
+            else:
+                lines.append(f"{indent}{key}: {item}")
+        return lines
+    if isinstance(value, list):
+        lines = []
+        for item in value:
+            item_lines = _form_lines(item, indent + "  ")
+            if item_lines:
+                item_lines[0] = f"{indent}- {item_lines[0].lstrip()}"
+            lines += item_lines
+        return lines
+    if value is None:
+        return []
+    return [f"{indent}{value}"]
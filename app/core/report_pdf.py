@@ -0,0 +1,434 @@
+import os
+import re
+import zlib
+import struct
+import hashlib
+import logging
+import functools
+from typing import Dict, Iterable, List, Optional
+
+from unidecode import unidecode
+
+logger = logging.getLogger(__name__)
+
+# A4 в пунктах
+PAGE_WIDTH = 595.28
+PAGE_HEIGHT = 841.89
+MARGIN = 50
+LINE_SPACING = 1.35
+
+# Шаблон CMap ToUnicode: по нему просмотрщики копируют и ищут текст со встроенным шрифтом
+TO_UNICODE_HEADER = (
+    "/CIDInit /ProcSet findresource begin\n12 dict begin\nbegincmap\n"
+    "/CIDSystemInfo << /Registry (Adobe) /Ordering (UCS) /Supplement 0 >> def\n"
+    "/CMapName /Adobe-Identity-UCS def\n/CMapType 2 def\n"
+    "1 begincodespacerange\n<0000> <FFFF>\nendcodespacerange\n"
+)
+TO_UNICODE_FOOTER = "endcmap\nCMapName currentdict /CMap defineresource pop\nend\nend\n"
+
+# Таблицы TrueType, которые нужны PDF для встроенного CIDFontType2 с /CIDToGIDMap /Identity:
+# глифы с метриками и хинтингом; cmap, имена глифов и таблицы OpenType не используются
+SUBSET_TABLES = ("head", "hhea", "hmtx", "maxp", "loca", "glyf", "cvt ", "fpgm", "prep", "OS/2")
+# Флаги компонента составного глифа (glyf)
+ARG_1_AND_2_ARE_WORDS = 0x0001
+WE_HAVE_A_SCALE = 0x0008
+MORE_COMPONENTS = 0x0020
+WE_HAVE_AN_X_AND_Y_SCALE = 0x0040
+WE_HAVE_A_TWO_BY_TWO = 0x0080
+
+
+class TrueTypeFont:
+    """
+    TrueType-шрифт для встраивания в PDF как Type0 (Identity-H): кириллица
+    выводится номерами глифов. Таблицы и метрики читаются один раз при загрузке
+    и переиспользуются всеми отчётами процесса (см. load_font); в отчёт
+    встраивается подмножество шрифта только с использованными глифами (subset).
+    """
+
+    def __init__(self, path: str):
+        with open(path, "rb") as f:
+            data = f.read()
+        num_tables = struct.unpack_from(">H", data, 4)[0]
+        tables = {}
+        for n in range(num_tables):
+            tag, _, offset, length = struct.unpack_from(">4sIII", data, 12 + 16 * n)
+            tables[tag.decode("latin-1")] = (offset, length)
+
+        head = tables["head"][0]
+        units_per_em = struct.unpack_from(">H", data, head + 18)[0]
+        self.scale = 1000 / units_per_em
+        self.bbox = [round(v * self.scale) for v in struct.unpack_from(">4h", data, head + 36)]
+        hhea = tables["hhea"][0]
+        ascent, descent = struct.unpack_from(">hh", data, hhea + 4)
+        self.ascent = round(ascent * self.scale)
+        self.descent = round(descent * self.scale)
+        self.cap_height = self.ascent
+        if "OS/2" in tables and tables["OS/2"][1] >= 90:
+            self.cap_height = round(struct.unpack_from(">h", data, tables["OS/2"][0] + 88)[0] * self.scale)
+
+        num_metrics = struct.unpack_from(">H", data, hhea + 34)[0]
+        num_glyphs = struct.unpack_from(">H", data, tables["maxp"][0] + 4)[0]
+        hmtx = tables["hmtx"][0]
+        advances = [struct.unpack_from(">H", data, hmtx + 4 * n)[0] for n in range(num_metrics)]
+        advances += [advances[-1]] * (num_glyphs - num_metrics)
+        self.widths = [round(advance * self.scale) for advance in advances]
+        self.cmap = self.__read_cmap(data, tables["cmap"][0])
+
+        self.name = re.sub(r"[^A-Za-z0-9-]", "", os.path.splitext(os.path.basename(path))[0])
+        self.data = data
+        self.tables = tables
+        self.num_glyphs = num_glyphs
+        long_loca = struct.unpack_from(">h", data, head + 50)[0] == 1
+        loca = tables["loca"][0]
+        if long_loca:
+            self.loca = list(struct.unpack_from(f">{num_glyphs + 1}I", data, loca))
+        else:
+            self.loca = [2 * n for n in struct.unpack_from(f">{num_glyphs + 1}H", data, loca)]
+
+    def glyph(self, char: str) -> int:
+        return self.cmap.get(ord(char), 0)
+
+    def subset(self, glyphs: Iterable[int]) -> bytes:
+        """
+        Файл шрифта, в котором контуры есть только у glyphs (и их компонентов
+        в составных глифах) и глифа 0. Номера глифов не меняются, остальные
+        глифы пустые, поэтому /CIDToGIDMap /Identity и /W остаются верными.
+        """
+        glyf = self.tables["glyf"][0]
+        keep = {0}
+        pending = [glyph for glyph in glyphs if 0 <= glyph < self.num_glyphs]
+        while pending:
+            glyph = pending.pop()
+            if glyph in keep:
+                continue
+            keep.add(glyph)
+            pending.extend(self.__components(glyf + self.loca[glyph], glyf + self.loca[glyph + 1]))
+
+        outlines, offsets = [], [0]
+        for glyph in range(self.num_glyphs):
+            outline = self.data[glyf + self.loca[glyph]:glyf + self.loca[glyph + 1]] if glyph in keep else b""
+            outlines.append(outline + b"\0" * (-len(outline) % 4))
+            offsets.append(offsets[-1] + len(outlines[-1]))
+
+        tables = {
+            tag: self.data[offset:offset + length]
+            for tag, (offset, length) in self.tables.items()
+            if tag in SUBSET_TABLES
+        }
+        tables["glyf"] = b"".join(outlines)
+        tables["loca"] = struct.pack(f">{len(offsets)}I", *offsets)
+        head = bytearray(tables["head"])
+        # checkSumAdjustment пересчитывается ниже, indexToLocFormat — длинная loca
+        struct.pack_into(">I", head, 8, 0)
+        struct.pack_into(">h", head, 50, 1)
+        tables["head"] = bytes(head)
+        return self.__build(tables)
+
+    def __components(self, start: int, end: int) -> List[int]:
+        """
+        Номера глифов-компонентов составного глифа (пусто для простого).
+        """
+        if end - start < 10 or struct.unpack_from(">h", self.data, start)[0] >= 0:
+            return []
+        components = []
+        position = start + 10
+        while True:
+            flags, glyph = struct.unpack_from(">HH", self.data, position)
+            components.append(glyph)
+            position += 4 + (4 if flags & ARG_1_AND_2_ARE_WORDS else 2)
+            if flags & WE_HAVE_A_SCALE:
+                position += 2
+            elif flags & WE_HAVE_AN_X_AND_Y_SCALE:
+                position += 4
+            elif flags & WE_HAVE_A_TWO_BY_TWO:
+                position += 8
+            if not flags & MORE_COMPONENTS:
+                return components
+
+    @staticmethod
+    def __build(tables: Dict[str, bytes]) -> bytes:
+        """
+        Собирает файл TrueType из таблиц: каталог с контрольными суммами,
+        таблицы выровнены по 4 байта.
+        """
+        def checksum(data: bytes) -> int:
+            data += b"\0" * (-len(data) % 4)
+            return sum(struct.unpack(f">{len(data) // 4}I", data)) & 0xFFFFFFFF
+
+        tags = sorted(tables)
+        count = len(tags)
+        power = 1 << (count.bit_length() - 1)
+        header = struct.pack(">IHHHH", 0x00010000, count, power * 16, power.bit_length() - 1, (count - power) * 16)
+        offset = 12 + 16 * count
+        directory, body = [], []
+        for tag in tags:
+            data = tables[tag]
+            directory.append(struct.pack(">4sIII", tag.encode("latin-1"), checksum(data), offset, len(data)))
+            body.append(data + b"\0" * (-len(data) % 4))
+            offset += len(body[-1])
+        font = bytearray(header + b"".join(directory) + b"".join(body))
+        head = 12 + 16 * count + sum(len(part) for part in body[:tags.index("head")])
+        struct.pack_into(">I", font, head + 8, (0xB1B0AFBA - checksum(bytes(font))) & 0xFFFFFFFF)
+        return bytes(font)
+
+    def text_width(self, text: str, size: float) -> float:
+        return sum(self.widths[self.glyph(char)] for char in text) * size / 1000
+
+    @staticmethod
+    def __read_cmap(data: bytes, offset: int) -> Dict[int, int]:
+        """
+        Таблица символ -> глиф из подтаблицы Unicode формата 12 или 4.
+        """
+        subtables = {}
+        for n in range(struct.unpack_from(">H", data, offset + 2)[0]):
+            platform, encoding, sub_offset = struct.unpack_from(">HHI", data, offset + 4 + 8 * n)
+            subtables[(platform, encoding)] = offset + sub_offset
+
+        cmap = {}
+        if (3, 10) in subtables:
+            table = subtables[(3, 10)]
+            for n in range(struct.unpack_from(">I", data, table + 12)[0]):
+                start, end, glyph = struct.unpack_from(">III", data, table + 16 + 12 * n)
+                for code in range(start, end + 1):
+                    cmap[code] = glyph + code - start
+            return cmap
+
+        table = subtables.get((3, 1), subtables.get((0, 3)))
+        if table is None:
+            raise ValueError("В шрифте нет таблицы символов Unicode")
+        seg_count = struct.unpack_from(">H", data, table + 6)[0] // 2
+        ends = table + 14
+        starts = ends + 2 * seg_count + 2
+        deltas = starts + 2 * seg_count
+        ranges = deltas + 2 * seg_count
+        for s in range(seg_count):
+            end, start, delta, range_offset = (
+                struct.unpack_from(">H", data, base + 2 * s)[0]
+                for base in (ends, starts, deltas, ranges)
+            )
+            for code in range(start, min(end, 0xFFFE) + 1):
+                if range_offset:
+                    glyph = struct.unpack_from(
+                        ">H", data, ranges + 2 * s + range_offset + 2 * (code - start)
+                    )[0]
+                    glyph = (glyph + delta) & 0xFFFF if glyph else 0
+                else:
+                    glyph = (code + delta) & 0xFFFF
+                if glyph:
+                    cmap[code] = glyph
+        return cmap
+
+
+@functools.lru_cache(maxsize=None)
+def load_font(path: str) -> Optional[TrueTypeFont]:
+    """
+    Загружает шрифт один раз на процесс. None — шрифта нет, отчёт пишется
+    встроенным Helvetica с транслитерацией.
+    """
+    try:
+        return TrueTypeFont(path)
+    except (OSError, KeyError, ValueError, struct.error) as e:
+        logger.warning(f"Report font {path} is unavailable, falling back to Helvetica: {e}")
+        return None
+
+
+class PDFStreamWriter:
+    """
+    Потоковая запись PDF-отчёта.
+
+    Методы возвращают байты, которые уже можно отдавать клиенту: страница
+    записывается целиком, как только заполнена, и больше не хранится.
+    В памяти остаются только смещения объектов для таблицы xref, номера
+    страниц и использованные глифы. Номера каталога, дерева страниц и шрифта
+    резервируются заранее, а сами объекты пишутся в finish().
+    """
+
+    def __init__(self, font: Optional[TrueTypeFont] = None, font_size: float = 10):
+        self.font = font
+        self.font_size = font_size
+        self.offsets: Dict[int, int] = {}
+        self.position = 0
+        self.next_id = 1
+        self.catalog_id = self.__reserve()
+        self.pages_id = self.__reserve()
+        self.font_id = self.__reserve()
+        self.page_ids: List[int] = []
+        self.used: Dict[int, str] = {}
+        self.content: List[str] = []
+        self.y = PAGE_HEIGHT - MARGIN
+
+    def begin(self) -> bytes:
+        header = b"%PDF-1.7\n%\xe2\xe3\xcf\xd3\n"
+        self.position = len(header)
+        return header + self.__object(
+            self.catalog_id, f"<< /Type /Catalog /Pages {self.pages_id} 0 R >>".encode()
+        )
+
+    def heading(self, text: str, size: float = 14) -> bytes:
+        chunk = b""
+        # Заголовок не остаётся последней строкой страницы
+        if self.y - 3 * size * LINE_SPACING < MARGIN:
+            chunk = self.__flush_page()
+        self.y -= size * 0.5
+        return chunk + self.paragraph(text, size)
+
+    def paragraph(self, text: str, size: Optional[float] = None, indent: float = 0) -> bytes:
+        """
+        Добавляет абзац с переносом по словам.
+
+        :return: Байты страниц, заполненных этим абзацем.
+        """
+        size = size or self.font_size
+        chunks = []
+        for line in text.splitlines() or [""]:
+            # Ведущие пробелы строки (вложенность) становятся отступом
+            stripped = line.lstrip(" ")
+            offset = indent + self.__width(line[:len(line) - len(stripped)], size)
+            for wrapped in self.__wrap(stripped, size, PAGE_WIDTH - 2 * MARGIN - offset):
+                if self.y - size * LINE_SPACING < MARGIN:
+                    chunks.append(self.__flush_page())
+                self.y -= size * LINE_SPACING
+                self.content.append(
+                    f"BT /F1 {size:g} Tf {MARGIN + offset:.2f} {self.y:.2f} Td {self.__encode(wrapped)} Tj ET"
+                )
+        return b"".join(chunks)
+
+    def finish(self) -> bytes:
+        """
+        Последняя страница, дерево страниц, шрифт, таблица xref и трейлер.
+        """
+        chunks = []
+        if self.content or not self.page_ids:
+            chunks.append(self.__flush_page())
+        kids = " ".join(f"{page_id} 0 R" for page_id in self.page_ids)
+        chunks.append(self.__object(
+            self.pages_id,
+            f"<< /Type /Pages /Kids [{kids}] /Count {len(self.page_ids)} >>".encode(),
+        ))
+        chunks.extend(self.__font_objects())
+
+        xref_position = self.position
+        xref = [f"xref\n0 {self.next_id}\n", "0000000000 65535 f \n"]
+        xref += [f"{self.offsets[n]:010d} 00000 n \n" for n in range(1, self.next_id)]
+        xref.append(
+            f"trailer\n<< /Size {self.next_id} /Root {self.catalog_id} 0 R >>\n"
+            f"startxref\n{xref_position}\n%%EOF\n"
+        )
+        chunks.append("".join(xref).encode())
+        return b"".join(chunks)
+
+    def __reserve(self) -> int:
+        object_id = self.next_id
+        self.next_id += 1
+        return object_id
+
+    def __object(self, object_id: int, body: bytes) -> bytes:
+        data = f"{object_id} 0 obj\n".encode() + body + b"\nendobj\n"
+        self.offsets[object_id] = self.position
+        self.position += len(data)
+        return data
+
+    def __stream(self, object_id: int, data: bytes, extra: str = "") -> bytes:
+        compressed = zlib.compress(data)
+        header = f"<< /Length {len(compressed)} /Filter /FlateDecode{extra} >>\nstream\n".encode()
+        return self.__object(object_id, header + compressed + b"\nendstream")
+
+    def __flush_page(self) -> bytes:
+        page_id = self.__reserve()
+        content_id = self.__reserve()
+        self.page_ids.append(page_id)
+        footer = f"BT /F1 8 Tf {PAGE_WIDTH / 2 - 10:.2f} {MARGIN / 2:.2f} Td {self.__encode(str(len(self.page_ids)))} Tj ET"
+        content = "\n".join(self.content + [footer]).encode()
+        self.content = []
+        self.y = PAGE_HEIGHT - MARGIN
+        return self.__object(
+            page_id,
+            (
+                f"<< /Type /Page /Parent {self.pages_id} 0 R "
+                f"/MediaBox [0 0 {PAGE_WIDTH} {PAGE_HEIGHT}] "
+                f"/Resources << /Font << /F1 {self.font_id} 0 R >> >> /Contents {content_id} 0 R >>"
+            ).encode(),
+        ) + self.__stream(content_id, content)
+
+    def __wrap(self, line: str, size: float, width: float) -> List[str]:
+        lines = []
+        current = ""
+        for word in line.split(" "):
+            candidate = f"{current} {word}" if current else word
+            if self.__width(candidate, size) <= width:
+                current = candidate
+                continue
+            if current:
+                lines.append(current)
+            # Слово длиннее строки режется по символам
+            current = ""
+            for char in word:
+                if current and self.__width(current + char, size) > width:
+                    lines.append(current)
+                    current = ""
+                current += char
+        lines.append(current)
+        return lines
+
+    def __width(self, text: str, size: float) -> float:
+        if self.font is None:
+            # Средняя ширина символа Helvetica
+            return len(unidecode(text)) * size * 0.55
+        return self.font.text_width(text, size)
+
+    def __encode(self, text: str) -> str:
+        if self.font is None:
+            text = unidecode(text).encode("latin-1", errors="replace").decode("latin-1")
+            escaped = text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+            return f"({escaped})"
+        glyphs = []
+        for char in text:
+            glyph = self.font.glyph(char)
+            self.used.setdefault(glyph, char)
+            glyphs.append(f"{glyph:04x}")
+        return f"<{''.join(glyphs)}>"
+
+    def __font_objects(self) -> List[bytes]:
+        if self.font is None:
+            return [self.__object(
+                self.font_id,
+                b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>",
+            )]
+
+        font = self.font
+        cid_id, descriptor_id, file_id, unicode_id = (self.__reserve() for _ in range(4))
+        used = sorted(self.used)
+        font_file = font.subset(used)
+        # Имя подмножества шрифта: шесть заглавных букв и «+» (ISO 32000-1, 9.6.4)
+        digest = int(hashlib.md5(" ".join(map(str, used)).encode()).hexdigest(), 16)
+        name = "".join(chr(65 + (digest >> (5 * n)) % 26) for n in range(6)) + "+" + font.name
+        widths = " ".join(f"{glyph} [{font.widths[glyph]}]" for glyph in used)
+        bfchar = []
+        for start in range(0, len(used), 100):
+            part = used[start:start + 100]
+            bfchar.append(f"{len(part)} beginbfchar\n")
+            bfchar += [
+                f"<{glyph:04x}> <{self.used[glyph].encode('utf-16-be').hex()}>\n" for glyph in part
+            ]
+            bfchar.append("endbfchar\n")
+        to_unicode = (TO_UNICODE_HEADER + "".join(bfchar) + TO_UNICODE_FOOTER).encode()
+
+        return [
+            self.__object(self.font_id, (
+                f"<< /Type /Font /Subtype /Type0 /BaseFont /{name} /Encoding /Identity-H "
+                f"/DescendantFonts [{cid_id} 0 R] /ToUnicode {unicode_id} 0 R >>"
+            ).encode()),
+            self.__object(cid_id, (
+                f"<< /Type /Font /Subtype /CIDFontType2 /BaseFont /{name} "
+                "/CIDSystemInfo << /Registry (Adobe) /Ordering (Identity) /Supplement 0 >> "
+                f"/FontDescriptor {descriptor_id} 0 R /CIDToGIDMap /Identity /W [{widths}] >>"
+            ).encode()),
+            self.__object(descriptor_id, (
+                f"<< /Type /FontDescriptor /FontName /{name} /Flags 32 "
+                f"/FontBBox [{' '.join(map(str, font.bbox))}] /ItalicAngle 0 "
+                f"/Ascent {font.ascent} /Descent {font.descent} /CapHeight {font.cap_height} "
+                f"/StemV 80 /FontFile2 {file_id} 0 R >>"
+            ).encode()),
+            self.__stream(file_id, font_file, f" /Length1 {len(font_file)}"),
+            self.__stream(unicode_id, to_unicode),
+        ]
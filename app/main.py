@@ -1,11 +1,34 @@
-from fastapi import FastAPI
+import os
+import time
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Response
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
-from api.routes import report
+from api.routes import auction, report
+from core.config import Config
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, generate_latest
+from core.metrics import HTTP_REQUEST_SECONDS
+from core.parser.parser_documents import get_parse_executor, shutdown_parse_executor
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Поднимает пул парсинга до первого запроса, чтобы первый отчёт не ждал
+    запуска процессов и импорта pdfplumber/python-docx в каждом из них.
+    """
+    parse_workers = Config.PARSE_WORKERS or os.cpu_count() or 1
+    if Config.PARSE_POOL_PREWARM and parse_workers > 1:
+        await run_in_threadpool(get_parse_executor, parse_workers)
+    yield
+    shutdown_parse_executor()
+
 
 app = FastAPI(
     title="FastAPI Application",
     description="API для генерации отчетов и взаимодействия с Telegram ботом.",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
 )
 
 # Подключение CORS middleware, если необходимо
@@ -18,4 +41,57 @@ app.add_middleware(
 )
 
 # Включение маршрутов из модулей
-app.include_router(report.router, prefix="/api", tags=["Report"])
\ No newline at end of file
+app.include_router(report.router, prefix="/api", tags=["Report"])
+app.include_router(auction.router, prefix="/api", tags=["Auctions"])
+
+
+class RequestLatencyMiddleware:
+    """
+    Время обработки запросов по шаблону маршрута (scope["route"].path, без
+    идентификаторов в пути). Для потоковых ответов учитывается время до начала
+    отдачи. Чистый ASGI, без BaseHTTPMiddleware: тело StreamingResponse/SSE
+    идёт напрямую, и отключение клиента доходит до генератора ответа.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        recorded = False
+
+        def record(status: int) -> None:
+            nonlocal recorded
+            recorded = True
+            route = scope.get("route")
+            HTTP_REQUEST_SECONDS.labels(
+                scope["method"], route.path if route is not None else "unmatched", status
+            ).observe(time.perf_counter() - started)
+
+        async def send_with_latency(message):
+            if message["type"] == "http.response.start" and not recorded:
+                record(message["status"])
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_latency)
+        finally:
+            # Исключение до начала ответа
+            if not recorded:
+                record(500)
+
+
+app.add_middleware(RequestLatencyMiddleware)
+
+
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    """
+    Метрики процесса в формате Prometheus: задержки этапов, скачанные байты,
+    скорость парсинга по типам файлов, попадания в кэши, задачи в работе.
+    """
+    return Response(generate_latest(REGISTRY), media_type=CONTENT_TYPE_LATEST)
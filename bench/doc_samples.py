@@ -0,0 +1,101 @@
+"""
+Генерация минимальных документов Word 97 (.doc) для бенчмарков.
+
+Документ — составной файл OLE (CFB v3) с потоками WordDocument и 1Table:
+FIB, текст в UTF-16 и таблица фрагментов (CLX) из одного фрагмента.
+Этого достаточно для antiword и для разбора через FIB/CLX.
+"""
+import struct
+from typing import List, Tuple
+
+SECTOR = 512
+FREESECT = 0xFFFFFFFF
+ENDOFCHAIN = 0xFFFFFFFE
+FATSECT = 0xFFFFFFFD
+NOSTREAM = 0xFFFFFFFF
+# Потоки короче порога попали бы в mini stream; дополняем их до порога
+MINI_STREAM_CUTOFF = 4096
+TEXT_OFFSET = 1024
+
+
+def _pad(data: bytes, size: int) -> bytes:
+    return data + b"\x00" * (size - len(data))
+
+
+def _word_document_stream(text: bytes, char_count: int, clx_size: int) -> bytes:
+    fib = bytearray(TEXT_OFFSET)
+    struct.pack_into("<HHHHH", fib, 0x00, 0xA5EC, 0x00C1, 0x0000, 0x0419, 0x0000)
+    # fWhichTblStm (таблица в 1Table) + fExtChar
+    struct.pack_into("<H", fib, 0x0A, 0x0200 | 0x1000)
+    struct.pack_into("<H", fib, 0x0C, 0x00BF)
+    struct.pack_into("<II", fib, 0x18, TEXT_OFFSET, TEXT_OFFSET + len(text))
+    # csw, fibRgW, cslw, fibRgLw, cbRgFcLcb
+    struct.pack_into("<H", fib, 0x20, 14)
+    struct.pack_into("<H", fib, 0x3E, 22)
+    struct.pack_into("<I", fib, 0x40, TEXT_OFFSET + len(text))  # cbMac
+    struct.pack_into("<I", fib, 0x4C, char_count)  # ccpText
+    struct.pack_into("<H", fib, 0x98, 0x5D)
+    struct.pack_into("<II", fib, 0x1A2, 0, clx_size)  # fcClx, lcbClx
+    stream = bytes(fib) + text
+    return _pad(stream, max(MINI_STREAM_CUTOFF, -(-len(stream) // SECTOR) * SECTOR))
+
+
+def _table_stream(char_count: int) -> Tuple[bytes, bytes]:
+    # Pcdt: 0x02, размер PlcPcd, CP-границы фрагмента и PCD с несжатым (UTF-16) fc
+    plc = struct.pack("<II", 0, char_count) + struct.pack("<HIH", 0, TEXT_OFFSET, 0)
+    clx = b"\x02" + struct.pack("<I", len(plc)) + plc
+    return clx, _pad(clx, MINI_STREAM_CUTOFF)
+
+
+def _dir_entry(name: str, entry_type: int, child: int, left: int, start: int, size: int) -> bytes:
+    encoded = (name + "\x00").encode("utf-16-le")
+    entry = bytearray(128)
+    entry[: len(encoded)] = encoded
+    struct.pack_into("<HBB", entry, 64, len(encoded), entry_type, 1)
+    struct.pack_into("<III", entry, 68, left, NOSTREAM, child)
+    struct.pack_into("<II", entry, 116, start, size)
+    return bytes(entry)
+
+
+def build_doc(paragraphs: List[str]) -> bytes:
+    """
+    Собирает .doc с заданными абзацами.
+
+    :param paragraphs: Абзацы текста (поддерживается кириллица).
+    :return: Содержимое файла.
+    """
+    text = "".join(paragraph + "\r" for paragraph in paragraphs)
+    clx, table = _table_stream(len(text))
+    word = _word_document_stream(text.encode("utf-16-le"), len(text), len(clx))
+
+    # Сектор 0 — FAT, сектор 1 — каталог, далее WordDocument и 1Table
+    word_start, word_sectors = 2, len(word) // SECTOR
+    table_start, table_sectors = word_start + word_sectors, len(table) // SECTOR
+    total = table_start + table_sectors
+    if total > SECTOR // 4:
+        raise ValueError("Документ слишком велик для одного сектора FAT")
+
+    fat = [FATSECT, ENDOFCHAIN]
+    for start, count in ((word_start, word_sectors), (table_start, table_sectors)):
+        fat += [start + n + 1 for n in range(count - 1)] + [ENDOFCHAIN]
+    fat += [FREESECT] * (SECTOR // 4 - len(fat))
+
+    directory = (
+        _dir_entry("Root Entry", 5, 1, NOSTREAM, ENDOFCHAIN, 0)
+        + _dir_entry("WordDocument", 2, NOSTREAM, 2, word_start, len(word))
+        + _dir_entry("1Table", 2, NOSTREAM, NOSTREAM, table_start, len(table))
+    )
+    directory = _pad(directory, SECTOR)
+
+    header = bytearray(SECTOR)
+    header[0:8] = b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1"
+    struct.pack_into("<HHHHH", header, 0x18, 0x003E, 0x0003, 0xFFFE, 9, 6)
+    # Число секторов каталога/FAT, первый сектор каталога, mini FAT и DIFAT не используются
+    struct.pack_into(
+        "<IIIIIIIII", header, 0x28, 0, 1, 1, 0, MINI_STREAM_CUTOFF, ENDOFCHAIN, 0, ENDOFCHAIN, 0
+    )
+    # DIFAT в заголовке: единственный сектор FAT — сектор 0
+    header[0x4C:SECTOR] = b"\xff" * (SECTOR - 0x4C)
+    header[0x4C:0x50] = struct.pack("<I", 0)
+
+    return bytes(header) + struct.pack("<%dI" % len(fat), *fat) + directory + word + table
@@ -0,0 +1,105 @@
+"""
+Локальная заглушка LLM-сервиса с OpenAI-совместимым POST /v1/completions.
+
+Отвечает на каждый промпт из списка, имитирует время генерации
+(latency + per_prompt на каждый промпт батча), ограничение числа одновременно
+обрабатываемых запросов и временные сбои (каждый fail_every-й запрос — 503).
+Собирает размеры батчей, объём промптов и пиковое число одновременных запросов.
+"""
+import json
+import time
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List, Optional
+
+
+class FakeLLM:
+    def __init__(
+        self,
+        latency: float = 0.05,
+        per_prompt: float = 0.005,
+        fail_every: int = 0,
+        capacity: Optional[int] = None,
+    ):
+        self.latency = latency
+        self.per_prompt = per_prompt
+        self.fail_every = fail_every
+        self.batch_sizes: List[int] = []
+        self.requests = 0
+        self.prompt_chars = 0
+        self.active = 0
+        self.peak_active = 0
+        self._lock = threading.Lock()
+        self._capacity = threading.Semaphore(capacity) if capacity else None
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), self.__handler())
+        self.server.daemon_threads = True
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self.server.server_address
+        return f"http://{host}:{port}"
+
+    def start(self) -> "FakeLLM":
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self) -> "FakeLLM":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    def __handler(self):
+        llm = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                pass
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+                prompts = body["prompt"] if isinstance(body["prompt"], list) else [body["prompt"]]
+                with llm._lock:
+                    llm.requests += 1
+                    failed = llm.fail_every and llm.requests % llm.fail_every == 0
+                if failed:
+                    self.send(503, {"error": "overloaded"})
+                    return
+
+                if llm._capacity:
+                    llm._capacity.acquire()
+                with llm._lock:
+                    llm.active += 1
+                    llm.peak_active = max(llm.peak_active, llm.active)
+                    llm.batch_sizes.append(len(prompts))
+                    llm.prompt_chars += sum(len(prompt) for prompt in prompts)
+                try:
+                    time.sleep(llm.latency + llm.per_prompt * len(prompts))
+                finally:
+                    with llm._lock:
+                        llm.active -= 1
+                    if llm._capacity:
+                        llm._capacity.release()
+
+                choices = [
+                    {"index": index, "text": f"Да. ({len(prompt)} символов)", "finish_reason": "stop"}
+                    for index, prompt in enumerate(prompts)
+                ]
+                self.send(200, {"object": "text_completion", "model": body.get("model"), "choices": choices})
+
+            def send(self, status: int, payload) -> None:
+                data = json.dumps(payload, ensure_ascii=False).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+        return Handler
@@ -0,0 +1,237 @@
+"""
+Локальная замена API zakupki.mos.ru для бенчмарков без сети.
+
+Отдаёт Auction/Get, Auction/GetAuctionItemAdditionalInfo и FileStorage/Download
+из каталога с записанными ответами (см. record_fixtures.py), а если его нет —
+из синтетического набора с PDF, DOCX и DOC вложениями.
+
+Структура каталога с записями:
+    auctions/{auctionId}.json  — ответ Auction/Get
+    items/{itemId}.json        — ответ GetAuctionItemAdditionalInfo
+    files/{fileId}/{имя файла} — содержимое вложения
+"""
+import os
+import json
+import time
+import zlib
+import threading
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional, Tuple
+
+from doc_samples import build_doc
+from pdf_samples import build_contract_pdf
+
+
+class PortalData:
+    """
+    Ответы портала в памяти: аукционы, характеристики товаров и файлы.
+    """
+
+    def __init__(self):
+        self.auctions: Dict[str, Dict[str, Any]] = {}
+        self.items: Dict[str, Dict[str, Any]] = {}
+        self.files: Dict[str, Tuple[str, bytes]] = {}
+
+    @classmethod
+    def from_fixtures(cls, directory: str) -> "PortalData":
+        data = cls()
+        for name in os.listdir(os.path.join(directory, "auctions")):
+            with open(os.path.join(directory, "auctions", name), encoding="utf-8") as f:
+                data.auctions[os.path.splitext(name)[0]] = json.load(f)
+        items_dir = os.path.join(directory, "items")
+        for name in os.listdir(items_dir) if os.path.isdir(items_dir) else []:
+            with open(os.path.join(items_dir, name), encoding="utf-8") as f:
+                data.items[os.path.splitext(name)[0]] = json.load(f)
+        files_dir = os.path.join(directory, "files")
+        for file_id in os.listdir(files_dir) if os.path.isdir(files_dir) else []:
+            for name in os.listdir(os.path.join(files_dir, file_id)):
+                with open(os.path.join(files_dir, file_id, name), "rb") as f:
+                    data.files[file_id] = (name, f.read())
+        return data
+
+    @classmethod
+    def synthetic(
+        cls,
+        auctions: int = 10,
+        items_per_auction: int = 40,
+        pdf_pages: int = 30,
+        with_doc: bool = True,
+    ) -> "PortalData":
+        """
+        Набор аукционов, похожих на реальные: спецификации, поставки и три вложения
+        (контракт PDF, ТЗ DOCX, DOC), причём контракт у всех аукционов общий.
+        with_doc=False убирает DOC, если в окружении нет antiword.
+        """
+        import docx
+        from io import BytesIO
+
+        data = cls()
+        contract = build_contract_pdf(pdf_pages, lines_per_page=30)
+        document = docx.Document()
+        for n in range(200):
+            document.add_paragraph(f"Пункт {n}. Требования к поставляемому товару и его упаковке.")
+        docx_buffer = BytesIO()
+        document.save(docx_buffer)
+        legacy_doc = build_doc([f"Пункт {n}. Условия поставки товара." for n in range(100)])
+
+        for a in range(auctions):
+            auction_id = str(9_000_000 + a)
+            files = []
+            attachments = [
+                ("Проект контракта.pdf", contract, True),
+                ("Техническое задание.docx", docx_buffer.getvalue(), False),
+            ]
+            if with_doc:
+                attachments.append(("Спецификация.doc", legacy_doc, False))
+            for name, content, shared in attachments:
+                file_id = f"shared-{name}" if shared else f"{auction_id}-{len(files)}"
+                file_id = str(zlib.crc32(file_id.encode()))
+                data.files[file_id] = (name, content)
+                files.append({"id": int(file_id), "name": name})
+
+            specifications = []
+            for n in range(items_per_auction):
+                item_id = str(int(auction_id) * 100 + n)
+                specifications.append({"id": int(item_id), "currentValue": n + 1, "name": f"Товар {n}"})
+                data.items[item_id] = {
+                    "characteristics": [
+                        {"name": "Цвет", "value": "белый"},
+                        {"name": "Масса, кг", "value": str(n % 7 + 1)},
+                    ]
+                }
+
+            data.auctions[auction_id] = {
+                "name": f"Поставка товаров №{a}",
+                "isContractGuaranteeRequired": a % 2 == 0,
+                "contractGuaranteeAmount": 1000.0 * a,
+                "isLicenseProduction": a % 3 == 0,
+                "purchaseTypeId": 1 + a % 2,
+                "deliveries": [
+                    {
+                        "periodDaysFrom": 1,
+                        "periodDaysTo": 10,
+                        "periodDateFrom": None,
+                        "periodDateTo": None,
+                        "deliveryPlace": "г. Москва",
+                        "items": [{"name": f"Товар {n}", "quantity": n + 1} for n in range(3)],
+                    }
+                ],
+                "items": specifications,
+                "files": files,
+            }
+        return data
+
+
+class FakePortal:
+    """
+    HTTP-сервер на 127.0.0.1 со случайным портом. latency — искусственная задержка
+    на запрос (секунды), bandwidth — ограничение скорости отдачи файлов (байт/с).
+    """
+
+    def __init__(self, data: PortalData, latency: float = 0.0, bandwidth: Optional[float] = None):
+        self.data = data
+        self.latency = latency
+        self.bandwidth = bandwidth
+        self.requests: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), self.__handler())
+        self.server.daemon_threads = True
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self.server.server_address
+        return f"http://{host}:{port}"
+
+    def start(self) -> "FakePortal":
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self) -> "FakePortal":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    def count(self, route: str) -> None:
+        with self._lock:
+            self.requests[route] = self.requests.get(route, 0) + 1
+
+    def __handler(self):
+        portal = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                pass
+
+            def do_HEAD(self):
+                self.do_GET(head=True)
+
+            def do_GET(self, head: bool = False):
+                parsed = urllib.parse.urlparse(self.path)
+                query = dict(urllib.parse.parse_qsl(parsed.query))
+                route = parsed.path.rstrip("/").rsplit("/", 1)[-1]
+                portal.count(route)
+                if portal.latency:
+                    time.sleep(portal.latency)
+
+                if route == "Get" and query.get("auctionId") in portal.data.auctions:
+                    self.send_json(portal.data.auctions[query["auctionId"]], head)
+                elif route == "GetAuctionItemAdditionalInfo":
+                    self.send_json(portal.data.items.get(query.get("itemId"), {"characteristics": []}), head)
+                elif route == "Download" and query.get("id") in portal.data.files:
+                    self.send_file(*portal.data.files[query["id"]], head)
+                else:
+                    self.send_response(404)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+
+            def send_json(self, payload: Any, head: bool):
+                body = json.dumps(payload, ensure_ascii=False).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                if not head:
+                    self.wfile.write(body)
+
+            def send_file(self, name: str, content: bytes, head: bool):
+                start, end = 0, len(content) - 1
+                status = 200
+                range_header = self.headers.get("Range")
+                if range_header and range_header.startswith("bytes="):
+                    first, _, last = range_header[len("bytes="):].partition("-")
+                    start = int(first or 0)
+                    end = min(int(last), end) if last else end
+                    status = 206
+                body = content[start:end + 1]
+
+                self.send_response(status)
+                self.send_header("Content-Type", "application/octet-stream")
+                self.send_header(
+                    "Content-Disposition",
+                    "attachment; filename*=UTF-8''" + urllib.parse.quote(name),
+                )
+                self.send_header("Accept-Ranges", "bytes")
+                self.send_header("Content-Length", str(len(body)))
+                if status == 206:
+                    self.send_header("Content-Range", f"bytes {start}-{end}/{len(content)}")
+                self.end_headers()
+                if head:
+                    return
+                if not portal.bandwidth:
+                    self.wfile.write(body)
+                    return
+                chunk = 64 * 1024
+                for offset in range(0, len(body), chunk):
+                    self.wfile.write(body[offset:offset + chunk])
+                    time.sleep(chunk / portal.bandwidth)
+
+        return Handler
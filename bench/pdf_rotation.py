@@ -0,0 +1,104 @@
+"""
+Бенчмарк PDFParser.parse: старая нормализация поворота через pdfrw с перезаписью
+файла против ленивого поворота страниц на стороне pdfplumber.
+
+Запуск из корня репозитория:
+    python bench/pdf_rotation.py                # синтетические контракты на 200/500 страниц
+    python bench/pdf_rotation.py contract.pdf   # свои файлы
+
+Для замера «до» нужен pdfrw (pip install pdfrw), приложению он больше не требуется.
+"""
+import os
+import sys
+import time
+import shutil
+import tempfile
+
+import pdfplumber
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "app"))
+
+from core.parser.parser_documents import PDFParser  # noqa: E402
+from pdf_samples import build_contract_pdf  # noqa: E402
+
+
+def legacy_rewrite(file_path: str) -> None:
+    """
+    Прежняя нормализация поворота: pdfrw поворачивает страницы и
+    переписывает документ целиком поверх исходного файла.
+    """
+    from pdfrw import PdfReader, PdfWriter
+
+    input_pdf = PdfReader(file_path)
+    output_pdf = PdfWriter()
+    for i in range(0, len(input_pdf.pages) - 1):
+        page = input_pdf.pages[i]
+        next_page = input_pdf.pages[i + 1]
+        if int(next_page.inheritable.Rotate) == 90:
+            if int(page.inheritable.Rotate) == 0:
+                page.Rotate = 90
+        output_pdf.addpage(input_pdf.pages[i])
+    for j in range(i, len(input_pdf.pages)):
+        output_pdf.addpage(input_pdf.pages[j])
+    output_pdf.write(file_path)
+
+
+def legacy_parse(file_path: str) -> str:
+    """
+    Прежняя реализация PDFParser.parse: перезапись через pdfrw, затем pdfplumber.
+    """
+    text = ""
+    legacy_rewrite(file_path)
+    with pdfplumber.open(file_path) as pdf:
+        for page in pdf.pages:
+            page_text = page.extract_text()
+            if page_text:
+                text += page_text + "\n"
+    return text
+
+
+def measure(func, path: str, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        # Старая реализация портит файл, поэтому каждый прогон идёт на свежей копии
+        with tempfile.NamedTemporaryFile(suffix=".pdf") as tmp:
+            shutil.copyfile(path, tmp.name)
+            started = time.perf_counter()
+            func(tmp.name)
+            best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main(paths, repeat: int = 1) -> None:
+    print(
+        f"{'file':<24}{'pages':>7}{'rewrite, s':>12}{'before, s':>12}"
+        f"{'after, s':>12}{'speedup':>10}"
+    )
+    for path in paths:
+        pages = PDFParser().page_count(path)
+        rewrite = measure(legacy_rewrite, path, repeat)
+        before = measure(legacy_parse, path, repeat)
+        after = measure(PDFParser().parse, path, repeat)
+        name = os.path.basename(path)
+        print(
+            f"{name:<24}{pages:>7}{rewrite:>12.2f}{before:>12.2f}"
+            f"{after:>12.2f}{before / after:>9.2f}x",
+            flush=True,
+        )
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        main(sys.argv[1:])
+    else:
+        workdir = tempfile.mkdtemp()
+        try:
+            paths = []
+            for page_count in (200, 500):
+                path = os.path.join(workdir, f"contract_{page_count}.pdf")
+                with open(path, "wb") as f:
+                    f.write(build_contract_pdf(page_count))
+                paths.append(path)
+            main(paths)
+        finally:
+            shutil.rmtree(workdir)
@@ -0,0 +1,86 @@
+"""
+Генерация синтетических PDF-документов для бенчмарков без сторонних библиотек.
+"""
+from typing import Iterable, List, Optional
+
+# Стандартные шрифты PDF без встраивания поддерживают только latin-1
+_PARAGRAPH = (
+    "The Supplier shall deliver the goods according to the specification; "
+    "contract guarantee is {n} percent of the contract price."
+)
+
+
+def _escape(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def build_pdf(pages: List[List[str]], rotations: Optional[Iterable[int]] = None) -> bytes:
+    """
+    Собирает PDF со стандартным шрифтом Helvetica, по строке текста на элемент списка.
+
+    :param pages: Строки текста для каждой страницы (только latin-1).
+    :param rotations: Значение /Rotate для каждой страницы.
+    :return: Содержимое PDF.
+    """
+    rotations = list(rotations) if rotations is not None else [0] * len(pages)
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        None,  # /Pages заполняется после страниц
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    kids = []
+    for lines, rotation in zip(pages, rotations):
+        stream = "BT /F1 10 Tf 12 TL 50 800 Td "
+        stream += " ".join(f"({_escape(line)}) '" for line in lines)
+        stream += " ET"
+        data = stream.encode("latin-1")
+        objects.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(data), data))
+        content_ref = len(objects)
+        objects.append(
+            (
+                "<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] /Rotate %d "
+                "/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>"
+                % (rotation, content_ref)
+            ).encode()
+        )
+        kids.append(len(objects))
+    objects[1] = (
+        "<< /Type /Pages /Kids [%s] /Count %d >>"
+        % (" ".join(f"{ref} 0 R" for ref in kids), len(kids))
+    ).encode()
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    for offset in offsets:
+        out += b"%010d 00000 n \n" % offset
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (
+        len(objects) + 1,
+        xref,
+    )
+    return bytes(out)
+
+
+def build_contract_pdf(
+    page_count: int = 300, lines_per_page: int = 40, rotated_every: int = 25
+) -> bytes:
+    """
+    Многостраничный «контракт»: каждая rotated_every-я страница повёрнута на 90,
+    как альбомные спецификации в реальных контрактах.
+    """
+    pages = [
+        [
+            f"{page}.{line} " + _PARAGRAPH.format(n=(page + line) % 10)
+            for line in range(lines_per_page)
+        ]
+        for page in range(page_count)
+    ]
+    rotations = [
+        90 if rotated_every and page % rotated_every == rotated_every - 1 else 0
+        for page in range(page_count)
+    ]
+    return build_pdf(pages, rotations)
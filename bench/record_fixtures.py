@@ -0,0 +1,78 @@
+"""
+Запись ответов zakupki.mos.ru для офлайн-бенчмарка (bench/run.py --fixtures).
+
+Запуск из корня репозитория:
+    python bench/record_fixtures.py bench/fixtures https://zakupki.mos.ru/auction/9869562 ...
+
+Сохраняет Auction/Get, GetAuctionItemAdditionalInfo каждого товара и все вложения
+в формате, который читает fake_portal.PortalData.from_fixtures.
+"""
+import os
+import re
+import sys
+import json
+import urllib.parse
+
+import requests
+
+API_URL = "https://zakupki.mos.ru/newapi/api"
+HEADERS = {
+    "accept": "application/json, text/plain, */*",
+    "user-agent": (
+        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+        "(KHTML, like Gecko) Chrome/130.0.0.0 Safari/537.36"
+    ),
+}
+
+
+def _save_json(path: str, payload) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(payload, f, ensure_ascii=False)
+
+
+def _filename(response: requests.Response, file_id: int) -> str:
+    disposition = response.headers.get("Content-Disposition", "")
+    match = re.search(r"filename\*\s*=\s*[^']*''([^;]+)", disposition, re.IGNORECASE)
+    if match:
+        return os.path.basename(urllib.parse.unquote(match.group(1)))
+    match = re.search(r"filename\s*=\s*\"?([^\";]+)\"?", disposition, re.IGNORECASE)
+    return os.path.basename(match.group(1)) if match else f"file_{file_id}.bin"
+
+
+def record(directory: str, url: str, session: requests.Session) -> None:
+    auction_id = url.rstrip("/").split("/")[-1]
+    auction = session.get(
+        f"{API_URL}/Auction/Get", params={"auctionId": auction_id}, headers=HEADERS, timeout=10
+    ).json()
+    _save_json(os.path.join(directory, "auctions", f"{auction_id}.json"), auction)
+
+    for item in auction.get("items", []):
+        info = session.get(
+            f"{API_URL}/Auction/GetAuctionItemAdditionalInfo",
+            params={"itemId": item["id"]},
+            headers=HEADERS,
+            timeout=10,
+        ).json()
+        _save_json(os.path.join(directory, "items", f"{item['id']}.json"), info)
+
+    for file in auction.get("files", []):
+        if not file.get("id"):
+            continue
+        response = session.get(
+            f"{API_URL}/FileStorage/Download", params={"id": file["id"]}, headers=HEADERS, timeout=60
+        )
+        response.raise_for_status()
+        file_dir = os.path.join(directory, "files", str(file["id"]))
+        os.makedirs(file_dir, exist_ok=True)
+        with open(os.path.join(file_dir, _filename(response, file["id"])), "wb") as f:
+            f.write(response.content)
+    print(f"{auction_id}: {len(auction.get('items', []))} items, {len(auction.get('files', []))} files")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 3:
+        sys.exit(__doc__)
+    with requests.Session() as session:
+        for auction_url in sys.argv[2:]:
+            record(sys.argv[1], auction_url, session)
@@ -0,0 +1,237 @@
+"""
+Офлайн-бенчмарк обработки аукционов против локальной замены zakupki.mos.ru.
+
+Замеряет по этапам пропускную способность и задержки:
+    AuctionParser.parse_data     — Auction/Get + характеристики товаров;
+    DocumentParser (PDF/DOCX/DOC) — извлечение текста из вложений;
+    DocumentParserFactory.iter_file — задержка до первого фрагмента потокового разбора;
+    LLMProcessingEntity.parse     — конвейер целиком и его этапы (pipeline_stats);
+    LLMClient                     — промпты критериев против заглушки LLM (fake_llm.py)
+                                    с микро-батчами и без них.
+
+Запуск из корня репозитория:
+    python bench/run.py                            # синтетический набор
+    python bench/run.py --fixtures bench/fixtures  # записанные ответы (record_fixtures.py)
+    python bench/run.py --latency 0.05 --json results.json
+
+Кэши документов и аукционов на время замера выключены, чтобы каждый прогон
+скачивал и парсил всё заново.
+"""
+import os
+import io
+import sys
+import json
+import time
+import shutil
+import argparse
+import statistics
+from typing import Any, Callable, Dict, List
+
+from fake_llm import FakeLLM
+from fake_portal import FakePortal, PortalData
+
+APP_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "app")
+
+
+def summarize(name: str, timings: List[float], units: int = 0, unit: str = "") -> Dict[str, Any]:
+    """
+    Сводка по замерам: среднее, p50, p95 (мс) и пропускная способность.
+    """
+    ordered = sorted(timings)
+    total = sum(timings)
+    row = {
+        "name": name,
+        "runs": len(timings),
+        "mean_ms": statistics.mean(timings) * 1000,
+        "p50_ms": ordered[len(ordered) // 2] * 1000,
+        "p95_ms": ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000,
+        "per_sec": len(timings) / total if total else 0.0,
+    }
+    if units:
+        row[f"{unit}_per_sec"] = units / total if total else 0.0
+    return row
+
+
+def measure(func: Callable[[], Any], repeat: int) -> List[float]:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    return timings
+
+
+def bench_auction_parser(portal: FakePortal, repeat: int) -> List[Dict[str, Any]]:
+    from core.parser.parser_site_mos import AuctionParser, create_session
+
+    session = create_session()
+    timings = []
+    items = 0
+    for _ in range(repeat):
+        for auction_id in portal.data.auctions:
+            parser = AuctionParser(f"{portal.url}/auction/{auction_id}", session=session, base_url=portal.url)
+            started = time.perf_counter()
+            parser.parse_data()
+            timings.append(time.perf_counter() - started)
+            items += len(parser.auction_info["specifications"])
+    session.close()
+    return [summarize("AuctionParser.parse_data", timings, items, "items")]
+
+
+def bench_document_parsers(portal: FakePortal, repeat: int) -> List[Dict[str, Any]]:
+    from core.parser.parser_documents import DOCParser, DOCXParser, DocumentParserFactory, PDFParser
+
+    # Каждый уникальный файл один раз, по расширению
+    samples: Dict[bytes, str] = {}
+    for name, content in portal.data.files.values():
+        samples.setdefault(content, name)
+
+    rows = []
+    for content, name in samples.items():
+        extension = os.path.splitext(name)[1].lower()
+        if extension == ".pdf":
+            parser = PDFParser()
+            cases = [("PDFParser.parse", parser.parse), ("PDFParser.parse_with_rotation", parser.parse_with_rotation)]
+            pages = parser.page_count(io.BytesIO(content))
+        elif extension == ".docx":
+            cases, pages = [("DOCXParser.parse", DOCXParser().parse)], 0
+        elif extension == ".doc" and shutil.which("antiword"):
+            cases, pages = [("DOCParser.parse", DOCParser().parse)], 0
+        else:
+            continue
+        for label, method in cases:
+            timings = measure(lambda: method(io.BytesIO(content)), repeat)
+            row = summarize(f"{label} [{name}]", timings, pages * repeat, "pages")
+            row["mb_per_sec"] = len(content) * repeat / sum(timings) / 1024 ** 2
+            rows.append(row)
+
+        # Потоковый разбор: задержка до первого фрагмента (страницы, абзаца), а не до всего текста
+        def first_chunk() -> None:
+            chunks = DocumentParserFactory.iter_file(name, False, io.BytesIO(content))
+            next(chunks, None)
+            chunks.close()
+
+        rows.append(summarize(f"DocumentParserFactory.iter_file, first chunk [{name}]", measure(first_chunk, repeat)))
+    return rows
+
+
+def bench_processing(portal: FakePortal, repeat: int) -> List[Dict[str, Any]]:
+    from core.processing import LLMProcessingEntity
+
+    urls = [f"{portal.url}/auction/{auction_id}" for auction_id in portal.data.auctions]
+    rows = []
+    timings = []
+    stages: Dict[str, Dict[str, float]] = {}
+    for _ in range(repeat):
+        entity = LLMProcessingEntity(urls, [1, 2, 3, 4, 5, 6])
+        started = time.perf_counter()
+        entity.parse()
+        timings.append(time.perf_counter() - started)
+        for name, stats in entity.pipeline_stats.items():
+            total = stages.setdefault(name, {"items": 0, "busy": 0.0})
+            total["items"] += stats["items"]
+            total["busy"] += stats["busy"]
+    rows.append(summarize("LLMProcessingEntity.parse", timings, len(urls) * repeat, "auctions"))
+
+    wall = sum(timings)
+    for name, stats in stages.items():
+        rows.append({
+            "name": f"  stage {name}",
+            "runs": int(stats["items"]),
+            "mean_ms": stats["busy"] / stats["items"] * 1000 if stats["items"] else 0.0,
+            # Доля времени прогона, которую этап суммарно был занят (>1 — параллельная работа)
+            "busy_ratio": stats["busy"] / wall if wall else 0.0,
+            "per_sec": stats["items"] / wall if wall else 0.0,
+        })
+    return rows
+
+
+def bench_llm(portal: FakePortal, repeat: int) -> List[Dict[str, Any]]:
+    from core.llm_client import LLMClient
+
+    # 6 критериев на каждый аукцион набора, как в LLMProcessingEntity.evaluate
+    prompts = [
+        (criterion, f"Аукцион {auction_id}")
+        for auction_id in portal.data.auctions
+        for criterion in range(1, 7)
+    ]
+    rows = []
+    with FakeLLM(latency=0.05, per_prompt=0.005) as llm:
+        for label, batch_size in (("LLMClient unbatched", 1), ("LLMClient batched", 8)):
+            requests_before = llm.requests
+            client = LLMClient(llm.url, max_batch_size=batch_size, max_in_flight=4)
+            timings = measure(lambda: client.complete_many(prompts), repeat)
+            client.close()
+            row = summarize(label, timings, len(prompts) * repeat, "prompts")
+            row["http_requests"] = llm.requests - requests_before
+            rows.append(row)
+    return rows
+
+
+def print_table(rows: List[Dict[str, Any]]) -> None:
+    columns = ["runs", "mean_ms", "p50_ms", "p95_ms", "per_sec"]
+    extra = sorted({key for row in rows for key in row} - set(columns) - {"name"})
+    width = max(len(row["name"]) for row in rows)
+    print(f"{'':{width}}  " + "  ".join(f"{column:>12}" for column in columns + extra))
+    for row in rows:
+        cells = []
+        for column in columns + extra:
+            value = row.get(column)
+            if value is None:
+                cells.append(f"{'':>12}")
+            elif isinstance(value, float):
+                cells.append(f"{value:>12.2f}")
+            else:
+                cells.append(f"{value:>12}")
+        print(f"{row['name']:{width}}  " + "  ".join(cells))
+
+
+def main() -> None:
+    arguments = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arguments.add_argument("--fixtures", help="каталог с записанными ответами портала")
+    arguments.add_argument("--auctions", type=int, default=5, help="аукционов в синтетическом наборе")
+    arguments.add_argument("--items", type=int, default=40, help="товаров на аукцион")
+    arguments.add_argument("--pdf-pages", type=int, default=20, help="страниц в синтетическом контракте")
+    arguments.add_argument("--latency", type=float, default=0.0, help="задержка ответа портала, с")
+    arguments.add_argument("--bandwidth", type=float, help="скорость отдачи файлов, байт/с")
+    arguments.add_argument("--repeat", type=int, default=3)
+    arguments.add_argument("--only", choices=["auction", "documents", "processing", "llm"], action="append")
+    arguments.add_argument("--json", help="сохранить результаты в файл")
+    args = arguments.parse_args()
+
+    if args.fixtures:
+        data = PortalData.from_fixtures(args.fixtures)
+    else:
+        data = PortalData.synthetic(
+            args.auctions, args.items, args.pdf_pages, with_doc=bool(shutil.which("antiword"))
+        )
+
+    with FakePortal(data, latency=args.latency, bandwidth=args.bandwidth) as portal:
+        # Config читает окружение при импорте: настраиваем до импорта core
+        os.environ["ZAKUPKI_URL"] = portal.url
+        os.environ["DOCUMENT_CACHE_ENABLED"] = "0"
+        os.environ["AUCTION_CACHE_ENABLED"] = "0"
+        sys.path.insert(0, APP_DIR)
+
+        suites = {
+            "auction": bench_auction_parser,
+            "documents": bench_document_parsers,
+            "processing": bench_processing,
+            "llm": bench_llm,
+        }
+        rows = []
+        for name, suite in suites.items():
+            if args.only and name not in args.only:
+                continue
+            rows.extend(suite(portal, args.repeat))
+        requests_served = dict(portal.requests)
+
+    print_table(rows)
+    print(f"\nportal requests: {requests_served}")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"results": rows, "portal_requests": requests_served}, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
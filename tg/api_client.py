@@ -0,0 +1,133 @@
+import json
+import asyncio
+import logging
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+import aiohttp
+
+from .config import Config
+
+logger = logging.getLogger(__name__)
+
+
+class ReportAPIClient:
+    """
+    Асинхронный клиент API задач генерации отчётов с общим пулом keep-alive соединений.
+
+    Отчёт ставится в очередь (/api/report_jobs), прогресс читается из потока
+    server-sent events задачи, готовый PDF скачивается после её завершения.
+    Сессия aiohttp создаётся лениво внутри работающего event loop и
+    переиспользуется всеми обработчиками бота.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        pool_size: int = 16,
+        timeout: float = 600,
+        read_timeout: float = 60,
+        reconnects: int = 5,
+    ):
+        self.url = url.rstrip("/")
+        self.pool_size = pool_size
+        # Общий лимит — на одну задачу целиком; поток событий ограничен только
+        # паузой между данными (сервер шлёт keep-alive раз в 15 секунд)
+        self.timeout = timeout
+        self.read_timeout = aiohttp.ClientTimeout(total=None, sock_read=read_timeout)
+        self.reconnects = reconnects
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    async def session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.pool_size),
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+            )
+        return self._session
+
+    async def submit_report(self, urls: List[str], criteria: List[int]) -> str:
+        """
+        Ставит генерацию отчёта в очередь.
+
+        :return: Идентификатор задачи.
+        :raises aiohttp.ClientError: Ошибка соединения или HTTP-статус ошибки.
+        """
+        session = await self.session()
+        async with session.post(
+            f"{self.url}/api/report_jobs", json={"urls": urls, "criterion": criteria}
+        ) as response:
+            response.raise_for_status()
+            return (await response.json())["job_id"]
+
+    async def job_events(self, job_id: str) -> AsyncIterator[Dict[str, Any]]:
+        """
+        События прогресса задачи из потока server-sent events. После обрыва поток
+        переоткрывается с последнего полученного события (не более reconnects раз подряд).
+        Последним отдаётся событие {"stage": "end", "status": итоговый статус}.
+
+        :raises aiohttp.ClientError: Поток не удалось открыть заново.
+        """
+        session = await self.session()
+        last_event_id = 0
+        failures = 0
+        while True:
+            try:
+                async with session.get(
+                    f"{self.url}/api/report_jobs/{job_id}/events",
+                    params={"last_event_id": last_event_id},
+                    timeout=self.read_timeout,
+                ) as response:
+                    response.raise_for_status()
+                    event_type, event_id, data = "message", None, []
+                    async for raw_line in response.content:
+                        line = raw_line.decode("utf-8").rstrip("\r\n")
+                        if line:
+                            field, _, value = line.partition(":")
+                            value = value[1:] if value.startswith(" ") else value
+                            if field == "event":
+                                event_type = value
+                            elif field == "id":
+                                event_id = value
+                            elif field == "data":
+                                data.append(value)
+                            continue
+                        # Пустая строка завершает событие
+                        if data:
+                            failures = 0
+                            payload = json.loads("\n".join(data))
+                            if event_id is not None:
+                                last_event_id = int(event_id)
+                            if event_type == "end":
+                                yield {"stage": "end", **payload}
+                                return
+                            yield payload
+                        event_type, event_id, data = "message", None, []
+            except (aiohttp.ClientPayloadError, aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+                logger.warning(f"Поток событий задачи {job_id} прерван: {e}")
+            failures += 1
+            if failures > self.reconnects:
+                raise aiohttp.ClientError(f"Поток событий задачи {job_id} недоступен")
+            await asyncio.sleep(min(2 ** failures, 30))
+
+    async def get_report(self, job_id: str) -> bytes:
+        """
+        PDF-отчёт завершённой задачи.
+
+        :raises aiohttp.ClientError: Ошибка соединения или HTTP-статус ошибки.
+        """
+        session = await self.session()
+        async with session.get(f"{self.url}/api/report_jobs/{job_id}/report") as response:
+            response.raise_for_status()
+            return await response.read()
+
+    async def close(self) -> None:
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+
+
+api_client = ReportAPIClient(
+    Config.API_URL,
+    pool_size=Config.API_POOL_SIZE,
+    timeout=Config.REPORT_TIMEOUT,
+    read_timeout=Config.API_READ_TIMEOUT,
+)
@@ -1,7 +1,40 @@
 from aiogram import Bot, Dispatcher
 from aiogram.contrib.fsm_storage.memory import MemoryStorage
 from .config import Config
+from .locks import ReportLocks
+
+
+def create_storage():
+    """
+    Хранилище состояний диалогов: в памяти процесса или общее в Redis.
+    С Redis несколько реплик webhook видят одни и те же диалоги и переживают перезапуск.
+    """
+    if Config.FSM_STORAGE == "redis":
+        from aiogram.contrib.fsm_storage.redis import RedisStorage2
+
+        return RedisStorage2(
+            host=Config.REDIS_HOST,
+            port=Config.REDIS_PORT,
+            db=Config.REDIS_DB,
+            state_ttl=Config.FSM_STATE_TTL,
+            data_ttl=Config.FSM_STATE_TTL,
+        )
+    return MemoryStorage()
+
+
+def create_report_locks() -> ReportLocks:
+    """
+    Отметки о генерации отчётов хранятся там же, где состояния диалогов.
+    """
+    if Config.FSM_STORAGE == "redis":
+        from redis.asyncio import Redis
+
+        redis = Redis(host=Config.REDIS_HOST, port=Config.REDIS_PORT, db=Config.REDIS_DB)
+        return ReportLocks(redis, ttl=Config.REPORT_LOCK_TTL)
+    return ReportLocks(ttl=Config.REPORT_LOCK_TTL)
+
 
 bot = Bot(token=Config.BOT_TOKEN)
-storage = MemoryStorage()
+storage = create_storage()
 dp = Dispatcher(bot, storage=storage)
+report_locks = create_report_locks()
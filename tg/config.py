@@ -8,7 +8,27 @@ class Config:
     WEBHOOK_HOST = os.getenv("WEBHOOK_HOST")
     WEBHOOK_PATH = os.getenv("WEBHOOK_PATH", "/webhook/bot")
     WEBHOOK_URL = f"{WEBHOOK_HOST}{WEBHOOK_PATH}"
+    # Адрес API без пути, например http://api:8000
     API_URL = os.getenv("API_URL")
     HOST = os.getenv("HOST", "0.0.0.0")
     PORT = int(os.getenv("PORT", 8443))
+    # Пул соединений к API и максимальное время генерации одного отчёта (секунды)
+    API_POOL_SIZE = int(os.getenv("API_POOL_SIZE", 16))
+    REPORT_TIMEOUT = int(os.getenv("REPORT_TIMEOUT", 600))
+    # Сколько ждать данных в потоке прогресса задачи, прежде чем переподключиться (секунды)
+    API_READ_TIMEOUT = int(os.getenv("API_READ_TIMEOUT", 60))
+    # Как часто обновлять сообщение о ходе генерации (секунды)
+    PROGRESS_INTERVAL = int(os.getenv("PROGRESS_INTERVAL", 15))
+    # Хранилище состояний диалогов: memory (один процесс) или redis (несколько реплик)
+    FSM_STORAGE = os.getenv("FSM_STORAGE", "memory")
+    REDIS_HOST = os.getenv("REDIS_HOST", "localhost")
+    REDIS_PORT = int(os.getenv("REDIS_PORT", 6379))
+    REDIS_DB = int(os.getenv("REDIS_DB", 0))
+    # Незавершённые диалоги удаляются из Redis через сутки
+    FSM_STATE_TTL = int(os.getenv("FSM_STATE_TTL", 24 * 3600))
+    # Отметка «отчёт генерируется» в чате снимается сама, если реплика упала
+    REPORT_LOCK_TTL = int(os.getenv("REPORT_LOCK_TTL", REPORT_TIMEOUT + 60))
+    # Удалять webhook при остановке: только для единственного экземпляра бота,
+    # иначе перезапуск одной реплики отключает webhook у всех
+    WEBHOOK_DELETE_ON_SHUTDOWN = os.getenv("WEBHOOK_DELETE_ON_SHUTDOWN", "0") == "1"
 
@@ -1,17 +1,26 @@
+import io
+import time
+import asyncio
 import logging
+from typing import Dict, List
 from aiogram import types
-from aiogram.types import ReplyKeyboardMarkup, KeyboardButton, ReplyKeyboardRemove
+from aiogram.types import ReplyKeyboardMarkup, KeyboardButton, ReplyKeyboardRemove, InputFile
 from aiogram.dispatcher import FSMContext
-from aiogram.utils.exceptions import Throttled
+from aiogram.utils.exceptions import Throttled, TelegramAPIError
 
-import requests
+import aiohttp
 
-from .bot import dp, bot
+from .bot import dp, bot, report_locks
 from .states import Form
 from .config import Config
+from .api_client import api_client
 
 logger = logging.getLogger(__name__)
 
+# Фоновые задачи генерации отчётов этого процесса: ссылка нужна, чтобы задачу не собрал GC.
+# «Один отчёт на чат» проверяется по report_locks — общим для всех реплик
+report_tasks: Dict[int, asyncio.Task] = {}
+
 # Команда /start
 @dp.message_handler(commands=['start'])
 async def cmd_start(message: types.Message):
@@ -84,32 +93,95 @@ async def process_criteria(message: types.Message, state: FSMContext):
             await message.answer("Пожалуйста, выберите критерии от 1 до 6 или отправьте 'Все'.")
             return
     
-    # Подготовка данных для API запроса
-    payload = {
-        "urls": urls,
-        "criteria": criteria
-    }
-    
-    await message.answer("Генерирую отчет, пожалуйста, подождите...", reply_markup=ReplyKeyboardRemove())
-    
-    try:
-        response = requests.post(Config.API_URL, json=payload)
-        response.raise_for_status()
-        pdf_content = response.content
-        
-        # Отправка PDF пользователю
-        await bot.send_document(
-            chat_id=message.chat.id,
-            document=pdf_content,
-            filename="report.pdf"
-        )
-        await message.answer("Отчет успешно сгенерирован и отправлен.")
-    except requests.exceptions.RequestException as e:
-        logger.error(f"Ошибка при запросе к API: {e}")
-        await message.answer("Произошла ошибка при генерации отчета. Пожалуйста, попробуйте позже.")
-    
     await state.finish()
 
+    # Не более одного отчёта одновременно в чате
+    token = await report_locks.acquire(message.chat.id)
+    if token is None:
+        await message.answer(
+            "Предыдущий отчет еще генерируется, дождитесь его, пожалуйста.",
+            reply_markup=ReplyKeyboardRemove()
+        )
+        return
+
+    status = await message.answer("Генерирую отчет, пожалуйста, подождите...", reply_markup=ReplyKeyboardRemove())
+
+    # Генерация идет в фоне, обработчик сразу освобождает event loop для других чатов
+    task = asyncio.create_task(generate_report(message.chat.id, status, urls, criteria, token))
+    report_tasks[message.chat.id] = task
+    task.add_done_callback(lambda _: report_tasks.pop(message.chat.id, None))
+
+def progress_text(done: int, total: int, evaluating: bool) -> str:
+    """
+    Текст сообщения о ходе генерации отчета.
+    """
+    if evaluating:
+        return "Аукционы обработаны, оцениваю критерии..."
+    return f"Генерирую отчет, пожалуйста, подождите... Обработано аукционов: {done} из {total}"
+
+async def follow_report_job(status: types.Message, job_id: str, total: int) -> str:
+    """
+    Пересказывает прогресс задачи в сообщении о статусе: не чаще раза в
+    PROGRESS_INTERVAL секунд и только при изменении текста.
+
+    :return: Итоговый статус задачи (done, failed или expired).
+    """
+    done, evaluating = 0, False
+    shown = status.text
+    last_edit = time.monotonic()
+    async for event in api_client.job_events(job_id):
+        if event["stage"] == "end":
+            return event["status"]
+        if event["stage"] == "auction" and event.get("status") == "done":
+            done += 1
+        elif event["stage"] == "evaluate" and event.get("status") == "started":
+            evaluating = True
+        text = progress_text(done, total, evaluating)
+        if text == shown or time.monotonic() - last_edit < Config.PROGRESS_INTERVAL:
+            continue
+        try:
+            await status.edit_text(text)
+            shown = text
+        except TelegramAPIError as e:
+            logger.warning(f"Не удалось обновить статус отчета: {e}")
+        last_edit = time.monotonic()
+    return "expired"
+
+async def generate_report(
+    chat_id: int, status: types.Message, urls: List[str], criteria: List[int], token: str
+):
+    """
+    Ставит генерацию отчета в очередь API, показывает ее прогресс и отправляет PDF пользователю.
+    По завершении снимает отметку о генерации отчета в чате.
+    """
+    try:
+        try:
+            job_id = await api_client.submit_report(urls, criteria)
+            job_status = await asyncio.wait_for(
+                follow_report_job(status, job_id, len(urls)), Config.REPORT_TIMEOUT
+            )
+            pdf_content = await api_client.get_report(job_id) if job_status == "done" else None
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            logger.error(f"Ошибка при запросе к API: {e}")
+            pdf_content = None
+        else:
+            if pdf_content is None:
+                logger.error(f"Задача отчета {job_id} завершилась со статусом {job_status}")
+
+        try:
+            if pdf_content is None:
+                await bot.send_message(chat_id, "Произошла ошибка при генерации отчета. Пожалуйста, попробуйте позже.")
+                return
+            await bot.send_document(
+                chat_id=chat_id,
+                document=InputFile(io.BytesIO(pdf_content), filename="report.pdf")
+            )
+            await bot.send_message(chat_id, "Отчет успешно сгенерирован и отправлен.")
+        except TelegramAPIError as e:
+            logger.error(f"Не удалось отправить отчет в чат {chat_id}: {e}")
+    finally:
+        await report_locks.release(chat_id, token)
+
 # Обработка других сообщений
 @dp.message_handler()
 async def default_handler(message: types.Message):
@@ -0,0 +1,51 @@
+import uuid
+from typing import Any, Optional, Set
+
+# Снимает отметку, только если она всё ещё принадлежит этой задаче
+RELEASE_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+
+class ReportLocks:
+    """
+    Отметка «отчёт генерируется» по chat_id: не более одного отчёта в чате.
+
+    С Redis отметка общая для всех реплик webhook (SET NX с TTL: упавшая реплика
+    не блокирует чат дольше ttl секунд), без Redis — в памяти процесса.
+    """
+
+    def __init__(self, redis: Optional[Any] = None, ttl: int = 660, prefix: str = "report_lock"):
+        self.redis = redis
+        self.ttl = ttl
+        self.prefix = prefix
+        self._local: Set[int] = set()
+
+    async def acquire(self, chat_id: int) -> Optional[str]:
+        """
+        :return: Токен отметки или None, если в чате уже генерируется отчёт.
+        """
+        token = uuid.uuid4().hex
+        if self.redis is None:
+            if chat_id in self._local:
+                return None
+            self._local.add(chat_id)
+            return token
+        acquired = await self.redis.set(self.__key(chat_id), token, ex=self.ttl, nx=True)
+        return token if acquired else None
+
+    async def release(self, chat_id: int, token: str) -> None:
+        if self.redis is None:
+            self._local.discard(chat_id)
+            return
+        await self.redis.eval(RELEASE_SCRIPT, 1, self.__key(chat_id), token)
+
+    async def close(self) -> None:
+        if self.redis is not None:
+            await self.redis.close()
+
+    def __key(self, chat_id: int) -> str:
+        return f"{self.prefix}:{chat_id}"
@@ -8,9 +8,10 @@ import asyncio
 from aiogram import Dispatcher
 from aiogram.types import Update
 
-from app.tg.bot import bot, dp
+from app.tg.bot import bot, dp, report_locks
 from app.tg.config import Config
 from app.tg.handlers import *  # Импорт всех обработчиков
+from app.tg.api_client import api_client
 
 # Настройка логирования
 logging.basicConfig(level=logging.INFO)
@@ -37,13 +38,18 @@ async def on_startup():
     await bot.set_webhook(Config.WEBHOOK_URL)
     logger.info(f"Webhook установлен на {Config.WEBHOOK_URL}")
 
-# Удаление webhook при остановке приложения
+# Закрытие соединений при остановке приложения. Webhook общий для всех реплик
+# и удаляется, только если это явно разрешено для единственного экземпляра
 @app.on_event("shutdown")
 async def on_shutdown():
-    await bot.delete_webhook()
+    if Config.WEBHOOK_DELETE_ON_SHUTDOWN:
+        await bot.delete_webhook()
+        logger.info("Webhook удален")
     await dp.storage.close()
     await dp.storage.wait_closed()
-    logger.info("Webhook удален и хранилище закрыто")
+    await report_locks.close()
+    await api_client.close()
+    logger.info("Хранилище закрыто")
 
 # Точка входа
 if __name__ == "__main__":